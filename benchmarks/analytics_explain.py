@@ -0,0 +1,194 @@
+"""
+Analytics Query Plan Benchmark
+==============================
+Compares EXPLAIN plans and timings of the analytics queries before and after
+the sargable rewrite + migrations/001_analytics_indexes.sql.
+
+"Before" runs the legacy SQL with the new indexes ignored (pre-migration state),
+"After" runs the current SQL from data/analytics.py with all indexes available.
+
+Run from the project root: python benchmarks/analytics_explain.py [--runs N]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.database import db
+
+NEW_INDEXES = (
+    "idx_reservation_date",
+    "idx_status_date_start",
+    "idx_status_created",
+    "idx_user_created",
+)
+
+# (name, legacy query, current query) - {hint} marks where IGNORE INDEX goes
+QUERIES = [
+    (
+        "reservations_by_date",
+        """
+            SELECT DATE(reservation_date) as date, COUNT(*) as count
+            FROM reservations {hint}
+            WHERE reservation_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+            GROUP BY DATE(reservation_date)
+            ORDER BY date
+        """,
+        """
+            SELECT reservation_date as date, COUNT(*) as count
+            FROM reservations
+            WHERE reservation_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+            GROUP BY reservation_date
+            ORDER BY date
+        """,
+    ),
+    (
+        "reservations_by_time_slot",
+        """
+            SELECT HOUR(start_time) as hour, COUNT(*) as count
+            FROM reservations {hint}
+            WHERE status = 'approved'
+            GROUP BY HOUR(start_time)
+            ORDER BY hour
+        """,
+        """
+            SELECT HOUR(start_time) as hour, COUNT(*) as count
+            FROM reservations
+            WHERE status = 'approved'
+            GROUP BY HOUR(start_time)
+            ORDER BY hour
+        """,
+    ),
+    (
+        "weekly_comparison",
+        """
+            SELECT
+                SUM(CASE WHEN reservation_date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY) THEN 1 ELSE 0 END) as this_week,
+                SUM(CASE WHEN reservation_date >= DATE_SUB(CURDATE(), INTERVAL 14 DAY)
+                    AND reservation_date < DATE_SUB(CURDATE(), INTERVAL 7 DAY) THEN 1 ELSE 0 END) as last_week
+            FROM reservations {hint}
+        """,
+        """
+            SELECT
+                SUM(CASE WHEN reservation_date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY) THEN 1 ELSE 0 END) as this_week,
+                SUM(CASE WHEN reservation_date < DATE_SUB(CURDATE(), INTERVAL 7 DAY) THEN 1 ELSE 0 END) as last_week
+            FROM reservations
+            WHERE reservation_date >= DATE_SUB(CURDATE(), INTERVAL 14 DAY)
+        """,
+    ),
+    (
+        "busiest_day",
+        """
+            SELECT DAYNAME(reservation_date) as day_name, DAYOFWEEK(reservation_date) as day_num, COUNT(*) as count
+            FROM reservations {hint}
+            WHERE status = 'approved'
+            GROUP BY DAYNAME(reservation_date), DAYOFWEEK(reservation_date)
+            ORDER BY count DESC
+            LIMIT 1
+        """,
+        """
+            SELECT DAYNAME(reservation_date) as day_name, DAYOFWEEK(reservation_date) as day_num, COUNT(*) as count
+            FROM reservations
+            WHERE status = 'approved'
+            GROUP BY DAYNAME(reservation_date), DAYOFWEEK(reservation_date)
+            ORDER BY count DESC
+            LIMIT 1
+        """,
+    ),
+    (
+        "most_active_faculty",
+        """
+            SELECT u.full_name, COUNT(r.id) as reservation_count
+            FROM users u
+            JOIN reservations r {hint} ON u.id = r.user_id
+            WHERE u.role = 'faculty'
+            AND r.created_at >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+            GROUP BY u.id, u.full_name
+            ORDER BY reservation_count DESC
+            LIMIT 1
+        """,
+        """
+            SELECT u.full_name, COUNT(r.id) as reservation_count
+            FROM users u
+            JOIN reservations r ON u.id = r.user_id
+            WHERE u.role = 'faculty'
+            AND r.created_at >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+            GROUP BY u.id, u.full_name
+            ORDER BY reservation_count DESC
+            LIMIT 1
+        """,
+    ),
+    (
+        "pending_bottleneck",
+        """
+            SELECT COUNT(*) as pending_count, AVG(DATEDIFF(CURDATE(), DATE(created_at))) as avg_wait_days
+            FROM reservations {hint}
+            WHERE status = 'pending'
+        """,
+        """
+            SELECT COUNT(*) as pending_count, AVG(DATEDIFF(CURDATE(), created_at)) as avg_wait_days
+            FROM reservations
+            WHERE status = 'pending'
+        """,
+    ),
+]
+
+
+def get_present_indexes():
+    """Return the subset of NEW_INDEXES that exist on reservations"""
+    rows = db.fetch_all("SHOW INDEX FROM reservations")
+    names = {row["Key_name"] for row in rows}
+    return [name for name in NEW_INDEXES if name in names]
+
+
+def explain(query):
+    """Return the EXPLAIN rows for a query"""
+    return db.fetch_all("EXPLAIN " + query)
+
+
+def time_query(query, runs):
+    """Average wall-clock time of a query in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(runs):
+        db.fetch_all(query)
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def print_plan(label, rows):
+    print(f"  {label}:")
+    for row in rows:
+        print(
+            f"    table={row.get('table')} type={row.get('type')} key={row.get('key')} "
+            f"rows={row.get('rows')} extra={row.get('Extra')}"
+        )
+
+
+def main(runs=20):
+    present = get_present_indexes()
+    if present:
+        hint = f"IGNORE INDEX ({', '.join(present)})"
+    else:
+        hint = ""
+        print("⚠️ Analytics indexes not found - apply migrations/001_analytics_indexes.sql first")
+
+    print("=" * 70)
+    print(f"ANALYTICS QUERY PLANS ({runs} runs each)")
+    print("=" * 70)
+
+    for name, legacy, current in QUERIES:
+        before = legacy.format(hint=hint)
+        print(f"\n{name}")
+        print_plan("before", explain(before))
+        print_plan("after", explain(current))
+        before_ms = time_query(before, runs)
+        after_ms = time_query(current, runs)
+        print(f"  time: {before_ms:.2f} ms -> {after_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    runs = 20
+    if "--runs" in sys.argv:
+        runs = int(sys.argv[sys.argv.index("--runs") + 1])
+    main(runs)
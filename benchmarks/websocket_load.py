@@ -0,0 +1,224 @@
+"""
+WebSocket Load Test
+===================
+Opens many subscriber connections to websocket_server.py, publishes events
+at a fixed rate and reports delivery latency percentiles and throughput,
+followed by the server's own /metrics.
+
+Every subscriber joins "all" plus one of --users user topics. Events go to
+everyone (--target all) or to one random user topic each (--target user).
+Latency is measured in this process (send time is carried in the payload),
+so run it on a machine with spare cores or it measures itself.
+
+With WS_TOKEN_SECRET set (same value as the server) subscribers connect as
+signed faculty users and the publisher as the app's service identity.
+
+Start the server first, then run from the project root:
+    python benchmarks/websocket_load.py --clients 2000 --rate 50 --duration 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import websockets
+
+from utils.quantiles import QuantileSketch
+from websocket import auth, protocol
+
+LOAD_EVENT_TYPE = "load_test"
+
+
+def raise_open_file_limit():
+    """Each client is a socket; lift the soft fd limit to the hard limit"""
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+class LoadStats:
+    """Counters and latency sketch shared by all simulated clients"""
+
+    def __init__(self):
+        self.connected = 0
+        self.failed = 0
+        self.sent = 0
+        self.expected = 0
+        self.received = 0
+        self.latency_ms = QuantileSketch()
+
+
+def url_for(args, user_id, role):
+    """Server URL, with a signed token when authentication is enabled"""
+    if not auth.auth_enabled():
+        return args.url
+    return f"{args.url}?token={auth.sign_token(user_id, role)}"
+
+
+def subprotocols_for(wire):
+    return [protocol.BINARY_SUBPROTOCOL] if wire == "binary" else [protocol.JSON_SUBPROTOCOL]
+
+
+def decode(message):
+    data = protocol.decode(message) if isinstance(message, bytes) else json.loads(message)
+    if data.get("type") == "batch":
+        return data.get("events", [])
+    return [data]
+
+
+def encode(message, wire):
+    return protocol.encode(message) if wire == "binary" else json.dumps(message)
+
+
+async def run_subscriber(index, args, stats, connect_slots, stop):
+    """One simulated tab: connect, subscribe, record latency of every event"""
+    async with connect_slots:
+        try:
+            websocket = await websockets.connect(
+                url_for(args, index % args.users, "faculty"), subprotocols=subprotocols_for(args.wire),
+                compression=None, open_timeout=30, max_queue=None,
+            )
+        except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException):
+            stats.failed += 1
+            return
+    stats.connected += 1
+    try:
+        await websocket.send(encode({
+            "type": "subscribe",
+            "payload": {"topics": [f"user:{index % args.users}"]}
+        }, args.wire))
+        receiving = asyncio.ensure_future(websocket.recv())
+        while not stop.is_set():
+            done, _ = await asyncio.wait({receiving}, timeout=0.5)
+            if not done:
+                continue
+            now = time.perf_counter()
+            for event in decode(receiving.result()):
+                if event.get("type") == LOAD_EVENT_TYPE:
+                    stats.received += 1
+                    stats.latency_ms.add((now - event["payload"]["sent_at"]) * 1000)
+            receiving = asyncio.ensure_future(websocket.recv())
+        receiving.cancel()
+    except websockets.exceptions.ConnectionClosed:
+        pass
+    finally:
+        await websocket.close()
+
+
+async def run_publisher(args, stats, subscribers_per_user):
+    """Send events at a steady rate for the test duration"""
+    publisher_url = url_for(args, "load-test", auth.SERVICE_ROLE)
+    async with websockets.connect(publisher_url, subprotocols=subprotocols_for(args.wire), compression=None) as websocket:
+        # The publisher is subscribed to "all" too; keep reading so the
+        # server does not drop it as a slow consumer
+        discard = asyncio.ensure_future(drain(websocket))
+        interval = 1 / args.rate
+        start = time.perf_counter()
+        total = int(args.rate * args.duration)
+        for n in range(total):
+            # Schedule against the start time so slow sends do not drift the rate
+            delay = start + n * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            message = {"type": LOAD_EVENT_TYPE, "payload": {"n": n, "sent_at": time.perf_counter()}}
+            if args.target == "user":
+                user = random.randrange(args.users)
+                message["topics"] = [f"user:{user}"]
+                stats.expected += subscribers_per_user[user]
+            else:
+                stats.expected += stats.connected
+            await websocket.send(encode(message, args.wire))
+            stats.sent += 1
+        discard.cancel()
+
+
+async def drain(websocket):
+    try:
+        async for _ in websocket:
+            pass
+    except websockets.exceptions.ConnectionClosed:
+        pass
+
+
+def fetch_server_metrics(url):
+    """GET /metrics from the server (same host and port as the websocket)"""
+    http_url = url.replace("ws://", "http://", 1).rstrip("/") + "/metrics"
+    try:
+        with urllib.request.urlopen(http_url, timeout=5) as response:
+            return json.loads(response.read())
+    except (OSError, ValueError) as e:
+        return {"error": str(e)}
+
+
+def print_report(args, stats, elapsed, server_metrics):
+    print("=" * 70)
+    print(f"WEBSOCKET LOAD TEST ({args.wire}, target={args.target})")
+    print("=" * 70)
+    print(f"  clients:    {stats.connected} connected, {stats.failed} failed")
+    print(f"  published:  {stats.sent} events at {args.rate}/s")
+    lost = stats.expected - stats.received
+    loss = lost / stats.expected * 100 if stats.expected else 0.0
+    print(f"  delivered:  {stats.received} of {stats.expected} expected ({loss:.2f}% lost)")
+    print(f"  throughput: {stats.received / elapsed:,.0f} deliveries/s")
+    if stats.latency_ms.count:
+        p50, p90, p99 = (stats.latency_ms.quantile(q) for q in (0.5, 0.9, 0.99))
+        print(f"  latency:    p50 {p50:.1f} ms  p90 {p90:.1f} ms  p99 {p99:.1f} ms  max {stats.latency_ms.max:.1f} ms")
+    print("\nserver /metrics (the process that answered):")
+    for key, value in server_metrics.items():
+        print(f"  {key}: {value}")
+
+
+async def main(args):
+    raise_open_file_limit()
+    stats = LoadStats()
+    stop = asyncio.Event()
+    connect_slots = asyncio.Semaphore(args.connect_concurrency)
+    subscribers_per_user = [len(range(user, args.clients, args.users)) for user in range(args.users)]
+
+    subscribers = [
+        asyncio.create_task(run_subscriber(i, args, stats, connect_slots, stop))
+        for i in range(args.clients)
+    ]
+    # Wait for the connection ramp-up before publishing
+    while stats.connected + stats.failed < args.clients:
+        await asyncio.sleep(0.1)
+    print(f"{stats.connected} clients connected ({stats.failed} failed), publishing...")
+    await asyncio.sleep(0.5)  # Let the subscriptions land
+
+    start = time.perf_counter()
+    await run_publisher(args, stats, subscribers_per_user)
+    await asyncio.sleep(args.drain)
+    elapsed = time.perf_counter() - start
+
+    server_metrics = fetch_server_metrics(args.url)
+    stop.set()
+    await asyncio.gather(*subscribers, return_exceptions=True)
+    print_report(args, stats, elapsed, server_metrics)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the EduROOM websocket server")
+    parser.add_argument("--url", default=f"ws://localhost:{os.getenv('WS_PORT', '8765')}")
+    parser.add_argument("--clients", type=int, default=1000, help="subscriber connections")
+    parser.add_argument("--users", type=int, default=100, help="distinct user topics")
+    parser.add_argument("--rate", type=float, default=20, help="events published per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds to publish for")
+    parser.add_argument("--target", choices=("all", "user"), default="all", help="broadcast or one user topic per event")
+    parser.add_argument("--wire", choices=("binary", "json"), default="binary", help="wire protocol")
+    parser.add_argument("--connect-concurrency", type=int, default=200, help="handshakes in flight")
+    parser.add_argument("--drain", type=float, default=2, help="seconds to wait for in-flight events")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
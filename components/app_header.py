@@ -1,5 +1,6 @@
 import flet as ft
 from data.models import NotificationModel
+from utils.tasks import tasks
 
 def create_app_header(page, user_id, role, name, current_page="classrooms"):
     """Create the application header with navigation, notifications, and user drawer"""
@@ -76,20 +77,33 @@ def create_app_header(page, user_id, role, name, current_page="classrooms"):
     # ==================== NOTIFICATIONS ====================
     def go_to_reservations(notif_id=None):
         """Navigate to reservations page and mark notification as read"""
+        def navigate(_=None):
+            if role == "faculty":
+                from views.my_reservations_view import show_my_reservations
+                show_my_reservations(page, user_id, role, name)
+            elif role == "admin":
+                from views.admin_view import show_admin_panel
+                show_admin_panel(page, user_id, role, name)
+        
         if notif_id:
-            NotificationModel.mark_as_read(notif_id)
+            # Navigate once the read is stored, so the next header's badge
+            # already excludes it; navigate anyway if the write fails
+            tasks.run(page, lambda: NotificationModel.mark_as_read(notif_id), navigate, navigate)
+        else:
+            navigate()
+    
+    def mark_all_read(upto_id):
+        """Mark everything up to the newest displayed notification as read"""
+        def on_marked(_):
+            unread_count = NotificationModel.get_unread_count(user_id)
+            notif_badge.visible = unread_count > 0
+            notif_button.items = create_notification_items(unread_count)
         
-        if role == "faculty":
-            from views.my_reservations_view import show_my_reservations
-            show_my_reservations(page, user_id, role, name)
-        elif role == "admin":
-            from views.admin_view import show_admin_panel
-            show_admin_panel(page, user_id, role, name)
+        tasks.run(page, lambda: NotificationModel.mark_all_as_read(user_id, upto_id), on_marked)
     
-    def create_notification_items():
+    def create_notification_items(unread_count):
         """Create notification menu items"""
         notifications = NotificationModel.get_user_notifications(user_id, limit=5)
-        unread_count = NotificationModel.get_unread_count(user_id)
         
         menu_items = []
         
@@ -170,8 +184,22 @@ def create_app_header(page, user_id, role, name, current_page="classrooms"):
                     )
                 )
         
-        # Divider and View All button
+        # Divider, Mark all as read and View All buttons
         menu_items.append(ft.Divider(height=1))
+        if notifications and unread_count > 0:
+            newest_id = max(notif['id'] for notif in notifications)
+            menu_items.append(
+                ft.PopupMenuItem(
+                    content=ft.Container(
+                        content=ft.Row([
+                            ft.Icon(ft.Icons.DONE_ALL, size=18, color="#1E3A8A"),
+                            ft.Text("Mark all as read", size=14, color="#1E3A8A"),
+                        ], alignment=ft.MainAxisAlignment.CENTER, spacing=5),
+                        padding=5,
+                    ),
+                    on_click=lambda e: mark_all_read(newest_id)
+                )
+            )
         menu_items.append(
             ft.PopupMenuItem(
                 content=ft.Container(
@@ -198,7 +226,7 @@ def create_app_header(page, user_id, role, name, current_page="classrooms"):
         right=2,
     )
     
-    # Update badge visibility
+    # Update badge visibility (count and recent list come from the in-memory cache)
     unread_count = NotificationModel.get_unread_count(user_id)
     notif_badge.visible = unread_count > 0
     
@@ -211,7 +239,7 @@ def create_app_header(page, user_id, role, name, current_page="classrooms"):
             ]),
             padding=ft.padding.only(top=5, right=5),  # Add padding so badge isn't cut off
         ),
-        items=create_notification_items(),
+        items=create_notification_items(unread_count),
         tooltip="Notifications",
         menu_position=ft.PopupMenuPosition.UNDER,  # Position menu below the button
     )
@@ -0,0 +1,207 @@
+import threading
+from functools import partial
+
+import flet as ft
+
+from utils.tasks import tasks, TaskRejected
+
+# Start fetching the next page this close (px) to the bottom of the list
+LOAD_MORE_THRESHOLD_PX = 400
+
+
+class PagedList:
+    """
+    A scrolling list that builds its items one keyset page at a time and
+    can be edited in place.
+
+    Only the rows fetched so far exist as controls, so the first render and
+    its update payload stay the same size however long the history is.
+    The next page is fetched in the background (tasks.run) when the list
+    is scrolled near its end (or "Load more" is clicked when a page does
+    not fill the view).
+
+    insert/replace/remove apply one row change to the loaded window without
+    refetching; none of them update the page, so a view can apply a whole
+    delta (e.g. move a card between tabs and fix the counts) and send it
+    with a single page.update().
+
+    Pages arrive on task threads while handlers and realtime events edit
+    the rows, so every change to the rows happens under `lock`. A view
+    passes one lock to all its lists and holds it around deltas that span
+    several lists; it is reentrant.
+    """
+
+    def __init__(self, page, load_page, build_item, empty_content, key_columns, spacing=10, padding=10, lock=None):
+        """
+        Args:
+            page: The Flet page
+            load_page: load_page(after) -> {"items": [...], "next": cursor or None}
+            build_item: Builds the control for one row
+            empty_content: Shown instead of the list when there are no rows
+            key_columns: The columns of the descending ORDER BY / cursor;
+                         the last one (the id) identifies a row
+            lock: The view's lock (threading.RLock) guarding the rows
+        """
+        self.page = page
+        self.load_page = load_page
+        self.build_item = build_item
+        self.empty_content = empty_content
+        self.key_columns = key_columns
+        self.lock = lock or threading.RLock()
+        self.rows = []  # Loaded rows, in list order (parallel to the item controls)
+        self.next = None
+        self.loaded = False
+        self.loading = False  # A page fetch is in flight
+        self.generation = 0  # Bumped by reset() so fetches started before it are dropped
+
+        self.load_more_button = ft.Container(
+            content=ft.TextButton("Load more", icon=ft.Icons.EXPAND_MORE, on_click=self.load_more),
+            alignment=ft.alignment.center,
+            visible=False,
+        )
+        self.list_view = ft.ListView(
+            controls=[self.load_more_button],
+            spacing=spacing,
+            padding=padding,
+            expand=True,
+            on_scroll=self._on_scroll,
+        )
+        self.container = ft.Container(content=self.list_view, expand=True)
+
+    def sort_key(self, row):
+        return tuple(row[column] for column in self.key_columns)
+
+    def row_id(self, row):
+        return row[self.key_columns[-1]]
+
+    def load_first_page(self, background=False):
+        """
+        Fetch and show the first page once; later calls are no-ops.
+        Nothing is fetched before this, so hidden tabs cost nothing.
+
+        Args:
+            background: Fetch on tasks.run, which updates the page (from a
+                        handler); otherwise fetch now and the caller
+                        updates the page afterwards (while building a view)
+        """
+        with self.lock:
+            if self.loaded or self.loading:
+                return
+            self.loading = True
+            generation = self.generation
+        if background:
+            tasks.run(self.page, lambda: self.load_page(None),
+                      partial(self._show_page, generation, True), partial(self._load_failed, generation))
+            return
+        try:
+            result = self.load_page(None)
+        except Exception:
+            self._load_failed(generation, None)
+            raise
+        self._show_page(generation, True, result)
+
+    def reset(self):
+        """
+        Drop the loaded rows (after a realtime resync); no page update.
+        The list loads again on the next load_first_page().
+        """
+        with self.lock:
+            self.generation += 1
+            self.rows = []
+            self.next = None
+            self.loaded = False
+            self.loading = False
+            self.list_view.controls[:] = [self.load_more_button]
+            self._sync()
+
+    def load_more(self, e=None):
+        """Append the next page in the background (ignored while a page is loading)"""
+        with self.lock:
+            if not self.next or self.loading or self.list_view.page is None:
+                return
+            self.loading = True
+            cursor, generation = self.next, self.generation
+        tasks.run(self.page, lambda: self.load_page(cursor),
+                  partial(self._show_page, generation, False), partial(self._load_failed, generation))
+
+    def _show_page(self, generation, first, result):
+        """Show a fetched page: the first one, or the next one appended"""
+        with self.lock:
+            if generation != self.generation:
+                return  # Fetched before a reset
+            self.loading = False
+            self.loaded = True
+            self.next = result["next"]
+            start = 0 if first else len(self.rows)
+            self.rows[start:] = result["items"]
+            self.list_view.controls[start:-1] = [self.build_item(row) for row in result["items"]]
+            self._sync()
+
+    def _load_failed(self, generation, ex):
+        """Let the next scroll or tab switch try again"""
+        with self.lock:
+            if generation == self.generation:
+                self.loading = False
+        if ex is not None and not isinstance(ex, TaskRejected):
+            print(f"Error loading page: {ex}")
+
+    def _on_scroll(self, e):
+        if self.next and e.pixels >= e.max_scroll_extent - LOAD_MORE_THRESHOLD_PX:
+            self.load_more()
+
+    def _sync(self):
+        """Show the empty state or the list, and "Load more" while pages remain"""
+        self.load_more_button.visible = self.next is not None
+        self.container.content = self.list_view if self.rows else self.empty_content
+
+    def index_of(self, row_id):
+        for index, row in enumerate(self.rows):
+            if self.row_id(row) == row_id:
+                return index
+        return None
+
+    def insert(self, row):
+        """
+        Place a row at its sorted position in the loaded window.
+
+        Returns:
+            bool: False when the row sorts below the loaded window (it will
+                  arrive with a later page) or the list is not loaded yet
+        """
+        with self.lock:
+            if not self.loaded:
+                return False
+            key = self.sort_key(row)
+            index = next((i for i, r in enumerate(self.rows) if self.sort_key(r) < key), len(self.rows))
+            if index == len(self.rows) and self.next is not None:
+                return False
+            self.rows.insert(index, row)
+            self.list_view.controls.insert(index, self.build_item(row))
+            self._sync()
+            return True
+
+    def replace(self, row):
+        """Rebuild the card of a loaded row in place (same position)"""
+        with self.lock:
+            index = self.index_of(self.row_id(row))
+            if index is None:
+                return False
+            self.rows[index] = row
+            self.list_view.controls[index] = self.build_item(row)
+            return True
+
+    def remove(self, row_id):
+        """
+        Drop a loaded row.
+
+        Returns:
+            dict: The removed row, or None if it was not loaded
+        """
+        with self.lock:
+            index = self.index_of(row_id)
+            if index is None:
+                return None
+            row = self.rows.pop(index)
+            del self.list_view.controls[index]
+            self._sync()
+            return row
@@ -8,10 +8,201 @@ Features:
 - Classroom utilization metrics
 - User activity analytics
 - Time-based patterns
+- Approval latency percentiles (streaming, per admin and per room)
+- Live reservation counters pushed to open dashboards
 """
 
+import threading
 from data.database import db
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from utils.quantiles import QuantileSketch
+
+
+# Decisions this recent when the history is seeded may still be on their
+# way to record(); their ids are kept so they are not counted twice
+LATENCY_SEED_OVERLAP_SECONDS = 300
+
+
+class ApprovalLatencyTracker:
+    """
+    Streaming approval-latency percentiles.
+
+    Keeps one QuantileSketch overall, per reviewing admin and per room.
+    Seeded once from reservations.approved_at, then updated in O(1) by the
+    approve write path. The wait runs from submitted_at (creation or the
+    last edit) to the approval; rejections are not counted.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.loaded = False
+        self._reset()
+
+    def _reset(self):
+        self.overall = QuantileSketch()
+        self.by_admin = {}
+        self.by_room = {}
+        self.seeded_recent = set()  # Ids of approvals seeded just before loading
+
+    def _add(self, hours, admin_id, classroom_id):
+        self.overall.add(hours)
+        if admin_id is not None:
+            self.by_admin.setdefault(admin_id, QuantileSketch()).add(hours)
+        if classroom_id is not None:
+            self.by_room.setdefault(classroom_id, QuantileSketch()).add(hours)
+
+    def ensure_loaded(self):
+        """Seed the sketches from reservation history (first call only)"""
+        with self.lock:
+            if self.loaded:
+                return
+            query = """
+                SELECT
+                    id,
+                    reviewed_by,
+                    classroom_id,
+                    TIMESTAMPDIFF(SECOND, COALESCE(submitted_at, created_at), approved_at) as wait_seconds,
+                    approved_at >= NOW() - INTERVAL %s SECOND as recent
+                FROM reservations
+                WHERE approved_at IS NOT NULL
+            """
+            try:
+                for rows in db.stream(query, (LATENCY_SEED_OVERLAP_SECONDS,)):
+                    for row in rows:
+                        if row['wait_seconds'] is not None:
+                            self._add(row['wait_seconds'] / 3600, row['reviewed_by'], row['classroom_id'])
+                        if row['recent']:
+                            self.seeded_recent.add(row['id'])
+            except Exception as e:
+                # Start over on the next call rather than keep a partial seed
+                print(f"Error loading approval latency: {e}")
+                self._reset()
+                return
+            self.loaded = True
+
+    def record(self, reservation_id, wait_seconds, admin_id, classroom_id):
+        """
+        Record one approval.
+
+        Skipped until the history is loaded - the seed query will pick the
+        approval up from the database - and for approvals the seed already
+        counted, so none is counted twice.
+        """
+        with self.lock:
+            if not self.loaded or wait_seconds is None:
+                return
+            if reservation_id in self.seeded_recent:
+                self.seeded_recent.discard(reservation_id)
+                return
+            self._add(wait_seconds / 3600, admin_id, classroom_id)
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: overall/by_admin/by_room -> {count, p50, p90, p99} in hours
+        """
+        def summarize(sketch):
+            result = {'count': sketch.count}
+            for key, value in sketch.percentiles().items():
+                result[key] = round(value, 1) if value is not None else None
+            return result
+
+        with self.lock:
+            return {
+                'overall': summarize(self.overall),
+                'by_admin': {k: summarize(v) for k, v in self.by_admin.items()},
+                'by_room': {k: summarize(v) for k, v in self.by_room.items()},
+            }
+
+
+# Global approval latency tracker (updated by ReservationModel)
+approval_latency = ApprovalLatencyTracker()
+
+
+class LiveReservationCounters:
+    """
+    In-memory reservation counters for the live analytics dashboard.
+
+    Seeded with one GROUP BY query, then kept current by the reservation
+    write paths (create, approve/reject, cancel, edit and the status sweep
+    with its affected row counts) so a dashboard update never needs to
+    re-aggregate the table. invalidate() makes the next snapshot() re-seed.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.by_status = {}
+        self.today = None
+        self.today_bookings = 0
+
+    def load(self, rows):
+        """Replace the counters with seed rows of {status, count, today}"""
+        self.by_status = {row['status']: int(row['count']) for row in rows}
+        self.today = date.today()
+        self.today_bookings = sum(int(row['today'] or 0) for row in rows)
+        self.loaded = True
+
+    def _ensure_loaded(self):
+        if self.loaded:
+            return
+        query = """
+            SELECT
+                status,
+                COUNT(*) as count,
+                SUM(CASE WHEN created_at >= CURDATE() THEN 1 ELSE 0 END) as today
+            FROM reservations
+            GROUP BY status
+        """
+        self.load(db.fetch_all(query))
+
+    def _roll_day(self):
+        if self.today != date.today():
+            self.today = date.today()
+            self.today_bookings = 0
+
+    def invalidate(self):
+        """Drop the counters; the next snapshot() re-seeds from the database"""
+        with self.lock:
+            self.loaded = False
+
+    def record_created(self, status='pending'):
+        """Count a newly created reservation"""
+        with self.lock:
+            if not self.loaded:
+                return
+            self._roll_day()
+            self.by_status[status] = self.by_status.get(status, 0) + 1
+            self.today_bookings += 1
+
+    def record_transition(self, old_status, new_status, count=1):
+        """Move `count` reservations from old_status to new_status"""
+        with self.lock:
+            if not self.loaded or old_status == new_status or count <= 0:
+                return
+            self.by_status[old_status] = max(self.by_status.get(old_status, 0) - count, 0)
+            self.by_status[new_status] = self.by_status.get(new_status, 0) + count
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: total, pending, approved, rejected and today_bookings counts
+        """
+        with self.lock:
+            self._ensure_loaded()
+            self._roll_day()
+            return {
+                'total': sum(self.by_status.values()),
+                'pending': self.by_status.get('pending', 0),
+                'approved': self.by_status.get('approved', 0),
+                'rejected': self.by_status.get('rejected', 0),
+                'today_bookings': self.today_bookings,
+            }
+
+
+# Global live counters (updated by ReservationModel, pushed over realtime)
+live_counters = LiveReservationCounters()
+
 
 class AnalyticsModel:
     """Analytics model for dashboard data"""
@@ -22,7 +213,8 @@ class AnalyticsModel:
         Get overall reservation statistics
         
         Returns:
-            dict: Summary statistics including total, pending, approved, rejected counts
+            dict: Summary statistics including total, pending, approved, rejected
+                  and today's booking counts
         """
         db.connect()
         query = """
@@ -30,12 +222,13 @@ class AnalyticsModel:
                 COUNT(*) as total,
                 SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending,
                 SUM(CASE WHEN status = 'approved' THEN 1 ELSE 0 END) as approved,
-                SUM(CASE WHEN status = 'rejected' THEN 1 ELSE 0 END) as rejected
+                SUM(CASE WHEN status = 'rejected' THEN 1 ELSE 0 END) as rejected,
+                SUM(CASE WHEN created_at >= CURDATE() THEN 1 ELSE 0 END) as today_bookings
             FROM reservations
         """
         result = db.fetch_one(query)
         db.disconnect()
-        return result or {"total": 0, "pending": 0, "approved": 0, "rejected": 0}
+        return result or {"total": 0, "pending": 0, "approved": 0, "rejected": 0, "today_bookings": 0}
     
     @staticmethod
     def get_reservations_by_status():
@@ -98,11 +291,11 @@ class AnalyticsModel:
         db.connect()
         query = """
             SELECT 
-                DATE(reservation_date) as date,
+                reservation_date as date,
                 COUNT(*) as count
             FROM reservations
             WHERE reservation_date >= DATE_SUB(CURDATE(), INTERVAL %s DAY)
-            GROUP BY DATE(reservation_date)
+            GROUP BY reservation_date
             ORDER BY date
         """
         results = db.fetch_all(query, (days,))
@@ -227,7 +420,8 @@ class AnalyticsModel:
         """
         results = db.fetch_all(query)
         db.disconnect()
-        return 
+        return results
+    
     @staticmethod
     def get_weekly_comparison():
         """
@@ -240,9 +434,9 @@ class AnalyticsModel:
         query = """
             SELECT 
                 SUM(CASE WHEN reservation_date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY) THEN 1 ELSE 0 END) as this_week,
-                SUM(CASE WHEN reservation_date >= DATE_SUB(CURDATE(), INTERVAL 14 DAY) 
-                    AND reservation_date < DATE_SUB(CURDATE(), INTERVAL 7 DAY) THEN 1 ELSE 0 END) as last_week
+                SUM(CASE WHEN reservation_date < DATE_SUB(CURDATE(), INTERVAL 7 DAY) THEN 1 ELSE 0 END) as last_week
             FROM reservations
+            WHERE reservation_date >= DATE_SUB(CURDATE(), INTERVAL 14 DAY)
         """
         result = db.fetch_one(query)
         db.disconnect()
@@ -382,7 +576,7 @@ class AnalyticsModel:
         query = """
             SELECT 
                 COUNT(*) as pending_count,
-                AVG(DATEDIFF(CURDATE(), DATE(created_at))) as avg_wait_days
+                AVG(DATEDIFF(CURDATE(), created_at)) as avg_wait_days
             FROM reservations
             WHERE status = 'pending'
         """
@@ -409,4 +603,40 @@ class AnalyticsModel:
                 'status': status,
                 'message': message
             }
-        return {'pending_count': 0, 'status': 'good', 'message': 'No pending reservations'}
\ No newline at end of file
+        return {'pending_count': 0, 'status': 'good', 'message': 'No pending reservations'}
+
+    @staticmethod
+    def get_approval_latency():
+        """
+        Get approval latency percentiles (time from the last submission to approval)
+        
+        Returns:
+            dict: overall stats plus lists of per-admin and per-room stats
+                  (count, p50, p90, p99 in hours)
+        """
+        approval_latency.ensure_loaded()
+        snapshot = approval_latency.snapshot()
+        
+        db.connect()
+        admins = db.fetch_all("SELECT id, full_name FROM users WHERE role = 'admin'")
+        rooms = db.fetch_all("SELECT id, room_name FROM classrooms")
+        db.disconnect()
+        admin_names = {a['id']: a['full_name'] for a in admins}
+        room_names = {r['id']: r['room_name'] for r in rooms}
+        
+        by_admin = [
+            dict(stats, name=admin_names.get(admin_id, f"User {admin_id}"))
+            for admin_id, stats in snapshot['by_admin'].items()
+        ]
+        by_room = [
+            dict(stats, name=room_names.get(room_id, f"Room {room_id}"))
+            for room_id, stats in snapshot['by_room'].items()
+        ]
+        by_admin.sort(key=lambda item: item['count'], reverse=True)
+        by_room.sort(key=lambda item: item['count'], reverse=True)
+        
+        return {
+            'overall': snapshot['overall'],
+            'by_admin': by_admin,
+            'by_room': by_room,
+        }
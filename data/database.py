@@ -82,6 +82,27 @@ class Database:
             cursor.close()
             conn.close()
 
+    def execute_update(self, query, params=None):
+        """Execute UPDATE/DELETE queries, returning the number of affected rows"""
+        conn = self._get_connection()
+        if not conn:
+            return None
+        cursor = conn.cursor()
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            conn.commit()
+            return cursor.rowcount
+        except Error as e:
+            print(f"Error executing query: {e}")
+            conn.rollback()
+            return None
+        finally:
+            cursor.close()
+            conn.close()
+
     def fetch_one(self, query, params=None):
         """Fetch single record"""
         conn = self._get_connection()
@@ -120,5 +141,48 @@ class Database:
             cursor.close()
             conn.close()
 
+    def stream(self, query, params=None, batch_size=1000):
+        """Yield records in batches from an unbuffered (server-side) cursor.
+
+        Only one batch is held in memory at a time, so this is safe for
+        exports over the whole reservations/activity history. Unlike the
+        fetch methods, errors are raised: a failure part-way through must
+        not look like the end of the data to the consumer. Closing the
+        generator early disconnects rather than draining the result.
+        """
+        conn = self._get_connection()
+        if not conn:
+            raise Error(msg="No database connection")
+        cursor = conn.cursor(dictionary=True, buffered=False)
+        finished = False
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+            finished = True
+        except Error as e:
+            print(f"Error streaming data: {e}")
+            raise
+        finally:
+            if finished:
+                cursor.close()
+                conn.close()
+            else:
+                # Stopped early (consumer gave up or the read failed): drop
+                # the connection instead of reading the rest of the result
+                # off the wire; the server abandons the query and the pool
+                # reconnects it on next use
+                for release in (conn.disconnect, cursor.close, conn.close):
+                    try:
+                        release()
+                    except Error:
+                        pass
+
 # Singleton instance
 db = Database()
\ No newline at end of file
@@ -0,0 +1,284 @@
+"""
+Export Module
+=============
+Streams reservations, activity logs and analytics aggregates to disk
+
+Features:
+- CSV export (always available)
+- Parquet export (requires pyarrow)
+- Optional date-range filters
+- Constant memory: rows are read from a server-side cursor and written
+  one batch at a time
+- Files are written under the Flet assets directory so the browser can
+  download them, and are deleted after EXPORT_RETENTION_SECONDS
+"""
+
+import csv
+import os
+import secrets
+import shutil
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from data.database import db
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_ENABLED = True
+except ImportError:
+    PARQUET_ENABLED = False
+
+# Directory to store generated export files. It lives under the app's
+# assets_dir, so Flet serves each file at EXPORTS_URL/<token>/<file>
+EXPORTS_DIR = "assets/exports"
+EXPORTS_URL = "/exports"
+
+# Export files older than this are deleted on the next export
+EXPORT_RETENTION_SECONDS = 30 * 60
+
+# Rows fetched from the cursor / written to disk per chunk
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = ("csv", "parquet")
+
+
+def _normalize_value(value):
+    """Convert DB values that CSV/Parquet can't represent cleanly (TIME, DECIMAL)"""
+    if isinstance(value, Decimal):
+        # Aggregates like SUM(...)/3600 come back as DECIMAL whose precision
+        # varies per batch - Parquet would fix the first batch's as the schema
+        return float(value)
+    if isinstance(value, timedelta):
+        total_seconds = int(value.total_seconds())
+        hours, remainder = divmod(total_seconds, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+    return value
+
+
+def _normalize_batch(rows):
+    return [{k: _normalize_value(v) for k, v in row.items()} for row in rows]
+
+
+def _date_range_clause(column, start_date, end_date):
+    """
+    Build a sargable range predicate for an optional date filter.
+
+    Returns:
+        tuple: (sql fragment starting with AND, params list)
+    """
+    clause = ""
+    params = []
+    if start_date:
+        clause += f" AND {column} >= %s"
+        params.append(start_date)
+    if end_date:
+        # Inclusive end date, expressed as an open upper bound
+        clause += f" AND {column} < DATE_ADD(%s, INTERVAL 1 DAY)"
+        params.append(end_date)
+    return clause, params
+
+
+def write_csv(path, batches):
+    """
+    Write batches of dict rows to a CSV file.
+
+    Returns:
+        int: Number of rows written
+    """
+    count = 0
+    writer = None
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for rows in batches:
+            rows = _normalize_batch(rows)
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+                writer.writeheader()
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def write_parquet(path, batches):
+    """
+    Write batches of dict rows to a Parquet file, one row group per batch.
+
+    Returns:
+        int: Number of rows written
+    """
+    count = 0
+    writer = None
+    try:
+        for rows in batches:
+            rows = _normalize_batch(rows)
+            if writer is None:
+                table = pa.Table.from_pylist(rows)
+                # Columns that are all NULL in the first batch would be typed
+                # as null and reject later values - store them as strings
+                schema = pa.schema([
+                    pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field
+                    for field in table.schema
+                ])
+                table = table.cast(schema)
+                writer = pq.ParquetWriter(path, schema)
+            else:
+                table = pa.Table.from_pylist(rows, schema=writer.schema)
+            writer.write_table(table)
+            count += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+def download_url(path):
+    """URL the browser can fetch an export file from"""
+    relative = os.path.relpath(path, EXPORTS_DIR).replace(os.sep, "/")
+    return f"{EXPORTS_URL}/{relative}"
+
+
+def purge_old_exports(max_age=EXPORT_RETENTION_SECONDS):
+    """
+    Delete export directories older than max_age seconds.
+
+    Returns:
+        int: Number of exports removed
+    """
+    if not os.path.isdir(EXPORTS_DIR):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for entry in os.scandir(EXPORTS_DIR):
+        try:
+            if entry.stat().st_mtime >= cutoff:
+                continue
+            if entry.is_dir():
+                shutil.rmtree(entry.path)
+            else:
+                os.remove(entry.path)
+            removed += 1
+        except OSError as e:
+            print(f"Could not remove old export {entry.path}: {e}")
+    return removed
+
+
+class ExportModel:
+    """Export model for streaming data out of the database"""
+
+    @staticmethod
+    def _export(name, query, params, fmt):
+        """
+        Stream a query into EXPORTS_DIR/<token>/<name>_<timestamp>.<fmt>
+
+        Each export gets its own unguessable directory, since everything
+        under the assets directory is served without a login check.
+
+        Returns:
+            tuple: (success: bool, path or error message, rows written)
+        """
+        if fmt not in EXPORT_FORMATS:
+            return False, f"Unsupported format: {fmt}", 0
+        if fmt == "parquet" and not PARQUET_ENABLED:
+            return False, "Parquet export requires pyarrow (pip install pyarrow)", 0
+
+        purge_old_exports()
+        directory = os.path.join(EXPORTS_DIR, secrets.token_urlsafe(16))
+        os.makedirs(directory)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(directory, f"{name}_{timestamp}.{fmt}")
+
+        batches = db.stream(query, tuple(params), batch_size=EXPORT_BATCH_SIZE)
+        try:
+            if fmt == "parquet":
+                count = write_parquet(path, batches)
+            else:
+                count = write_csv(path, batches)
+        except Exception as e:
+            shutil.rmtree(directory, ignore_errors=True)
+            return False, f"Export failed: {e}", 0
+        finally:
+            # Release the cursor now if the writer stopped early, rather
+            # than when the generator is garbage collected
+            close = getattr(batches, "close", None)
+            if close is not None:
+                close()
+
+        if count == 0:
+            shutil.rmtree(directory, ignore_errors=True)
+            return False, "No rows to export for the selected range", 0
+
+        return True, path, count
+
+    @staticmethod
+    def export_reservations(start_date=None, end_date=None, fmt="csv"):
+        """
+        Export reservations (with room and requester) in a reservation date range
+
+        Args:
+            start_date: First reservation date to include (inclusive), or None
+            end_date: Last reservation date to include (inclusive), or None
+            fmt (str): "csv" or "parquet"
+        """
+        range_clause, params = _date_range_clause("r.reservation_date", start_date, end_date)
+        query = f"""
+            SELECT
+                r.id,
+                r.reservation_date,
+                r.start_time,
+                r.end_time,
+                c.room_name,
+                c.building,
+                u.full_name AS reserved_by,
+                u.email,
+                r.purpose,
+                r.status,
+                r.created_at,
+                r.updated_at
+            FROM reservations r
+            JOIN classrooms c ON r.classroom_id = c.id
+            JOIN users u ON r.user_id = u.id
+            WHERE 1 = 1 {range_clause}
+            ORDER BY r.reservation_date, r.start_time
+        """
+        return ExportModel._export("reservations", query, params, fmt)
+
+    @staticmethod
+    def export_activity_logs(start_date=None, end_date=None, fmt="csv"):
+        """Export activity logs created in a date range"""
+        range_clause, params = _date_range_clause("l.created_at", start_date, end_date)
+        query = f"""
+            SELECT
+                l.id,
+                l.created_at,
+                u.full_name,
+                u.role,
+                l.action,
+                l.details,
+                l.ip_address
+            FROM activity_logs l
+            LEFT JOIN users u ON l.user_id = u.id
+            WHERE 1 = 1 {range_clause}
+            ORDER BY l.created_at
+        """
+        return ExportModel._export("activity_logs", query, params, fmt)
+
+    @staticmethod
+    def export_analytics(start_date=None, end_date=None, fmt="csv"):
+        """Export daily reservation counts per room and status in a date range"""
+        range_clause, params = _date_range_clause("r.reservation_date", start_date, end_date)
+        query = f"""
+            SELECT
+                r.reservation_date,
+                c.room_name,
+                c.building,
+                r.status,
+                COUNT(*) AS reservation_count,
+                SUM(TIME_TO_SEC(TIMEDIFF(r.end_time, r.start_time))) / 3600 AS booked_hours
+            FROM reservations r
+            JOIN classrooms c ON r.classroom_id = c.id
+            WHERE 1 = 1 {range_clause}
+            GROUP BY r.reservation_date, c.id, c.room_name, c.building, r.status
+            ORDER BY r.reservation_date, c.room_name, r.status
+        """
+        return ExportModel._export("analytics", query, params, fmt)
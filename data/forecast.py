@@ -0,0 +1,221 @@
+"""
+Forecast Module
+===============
+Predicts room demand per classroom and hour for the coming weeks
+
+Features:
+- Weekly-seasonal exponential smoothing per (room, weekday, hour) slot
+- NumPy only, no external forecasting libraries
+- Incremental: each refresh only folds in days completed since the last one
+- Background refresh job feeding the analytics dashboard
+"""
+
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+
+from data.database import db
+
+# Smoothing factor: weight of the newest week vs. the accumulated level
+FORECAST_ALPHA = 0.3
+# How far back the first fit looks
+FORECAST_HISTORY_DAYS = 182
+# Background refresh interval
+FORECAST_REFRESH_SECONDS = 3600
+
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+class SeasonalDemandModel:
+    """
+    Exponentially smoothed demand per (room, weekday, hour).
+
+    Each weekday/hour slot is smoothed independently across weeks, so the
+    forecast for "next Tuesday 10:00" is the smoothed history of past
+    Tuesdays at 10:00. Demand is measured in booked hours: a 09:00-11:00
+    reservation adds 1 to the 9 and 10 o'clock slots.
+    """
+
+    def __init__(self, alpha=FORECAST_ALPHA):
+        self.alpha = alpha
+        self.room_ids = []
+        self._room_index = {}
+        self.levels = np.zeros((0, 7, 24))
+        self.seen = np.zeros((0, 7), dtype=np.int64)
+        self.last_date = None
+
+    def add_room(self, room_id):
+        """Register a room and return its row index"""
+        if room_id in self._room_index:
+            return self._room_index[room_id]
+        index = len(self.room_ids)
+        self.room_ids.append(room_id)
+        self._room_index[room_id] = index
+        self.levels = np.concatenate([self.levels, np.zeros((1, 7, 24))])
+        self.seen = np.concatenate([self.seen, np.zeros((1, 7), dtype=np.int64)])
+        return index
+
+    @staticmethod
+    def hours_vector(start_hour, end_hour):
+        """24-slot vector with 1 for every hour a reservation occupies"""
+        vec = np.zeros(24)
+        vec[start_hour:end_hour + 1] = 1
+        return vec
+
+    def update_day(self, day, room_hours):
+        """
+        Fold one completed day into the model.
+
+        Args:
+            day (date): The day being observed (must be after last_date)
+            room_hours (dict): room_id -> 24-slot array of booked hours.
+                Registered rooms missing from the dict observed zero demand.
+        """
+        if self.last_date is not None and day <= self.last_date:
+            return
+
+        for room_id in room_hours:
+            self.add_room(room_id)
+
+        weekday = day.weekday()
+        observed = np.zeros((len(self.room_ids), 24))
+        for room_id, hours in room_hours.items():
+            observed[self._room_index[room_id]] += hours
+
+        # First observation of a slot seeds the level instead of decaying from 0
+        first = self.seen[:, weekday] == 0
+        self.levels[first, weekday] = observed[first]
+        rest = ~first
+        self.levels[rest, weekday] += self.alpha * (observed[rest] - self.levels[rest, weekday])
+        self.seen[:, weekday] += 1
+        self.last_date = day
+
+    def predict(self, start_date, days):
+        """
+        Predicted booked hours per room, day and hour.
+
+        Returns:
+            np.ndarray: shape (rooms, days, 24)
+        """
+        weekdays = [(start_date + timedelta(days=i)).weekday() for i in range(days)]
+        return self.levels[:, weekdays, :]
+
+    def summarize(self, start_date, weeks=2):
+        """
+        Per-room forecast summary for the dashboard.
+
+        Returns:
+            list: dicts with room_id, weekly predicted hours and peak slot,
+                  busiest rooms first
+        """
+        days = weeks * 7
+        prediction = self.predict(start_date, days)
+        summary = []
+        for index, room_id in enumerate(self.room_ids):
+            room_prediction = prediction[index]
+            weekly_hours = room_prediction.reshape(weeks, 7 * 24).sum(axis=1)
+            peak_day, peak_hour = np.unravel_index(np.argmax(room_prediction), room_prediction.shape)
+            peak_date = start_date + timedelta(days=int(peak_day))
+            summary.append({
+                'room_id': room_id,
+                'weekly_hours': [round(float(h), 1) for h in weekly_hours],
+                'total_hours': round(float(weekly_hours.sum()), 1),
+                'peak_day': DAY_NAMES[peak_date.weekday()],
+                'peak_hour': int(peak_hour),
+                'peak_load': round(float(room_prediction[peak_day, peak_hour]), 2),
+            })
+        summary.sort(key=lambda item: item['total_hours'], reverse=True)
+        return summary
+
+
+class ForecastService:
+    """Keeps a SeasonalDemandModel fitted in a background thread"""
+
+    def __init__(self, interval_seconds=FORECAST_REFRESH_SECONDS):
+        self.interval_seconds = interval_seconds
+        self.model = SeasonalDemandModel()
+        self.room_names = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """Start the background refresh job (no-op if already running)"""
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the background refresh job"""
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"❌ Forecast refresh failed: {e}")
+            self._stop_event.wait(self.interval_seconds)
+
+    def refresh(self):
+        """Fold every completed day since the last refresh into the model"""
+        yesterday = date.today() - timedelta(days=1)
+        with self.lock:
+            last_date = self.model.last_date
+        start = last_date + timedelta(days=1) if last_date else date.today() - timedelta(days=FORECAST_HISTORY_DAYS)
+        if start > yesterday:
+            return
+
+        rooms = db.fetch_all("SELECT id, room_name FROM classrooms")
+        query = """
+            SELECT
+                classroom_id,
+                reservation_date,
+                HOUR(start_time) as start_hour,
+                HOUR(SUBTIME(end_time, '00:00:01')) as end_hour
+            FROM reservations
+            WHERE reservation_date >= %s
+            AND reservation_date <= %s
+            AND status IN ('approved', 'ongoing', 'done', 'pending')
+        """
+        rows = db.fetch_all(query, (start, yesterday))
+
+        by_day = {}
+        for row in rows:
+            day_hours = by_day.setdefault(row['reservation_date'], {})
+            hours = SeasonalDemandModel.hours_vector(row['start_hour'], row['end_hour'])
+            if row['classroom_id'] in day_hours:
+                day_hours[row['classroom_id']] += hours
+            else:
+                day_hours[row['classroom_id']] = hours
+
+        with self.lock:
+            for room in rooms:
+                self.room_names[room['id']] = room['room_name']
+                self.model.add_room(room['id'])
+            day = start
+            while day <= yesterday:
+                self.model.update_day(day, by_day.get(day, {}))
+                day += timedelta(days=1)
+
+    def get_forecast(self, weeks=2):
+        """
+        Predicted load per room for the coming weeks, starting today
+
+        Returns:
+            list: Summary dicts (see SeasonalDemandModel.summarize) with room_name
+        """
+        with self.lock:
+            if self.model.last_date is None:
+                return []
+            summary = self.model.summarize(date.today(), weeks)
+            for item in summary:
+                item['room_name'] = self.room_names.get(item['room_id'], f"Room {item['room_id']}")
+        return summary
+
+
+# Global forecast service
+forecast_service = ForecastService()
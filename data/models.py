@@ -1,4 +1,5 @@
 from data.database import db
+from data.notification_cache import notification_cache
 from utils.auth import hash_password, verify_password
 from datetime import datetime, timedelta
 
@@ -9,6 +10,166 @@ try:
 except ImportError:
     REALTIME_ENABLED = False
 
+
+def publish_live_counters():
+    """Push the live reservation counters to open analytics dashboards"""
+    if REALTIME_ENABLED:
+        from data.analytics import live_counters
+        realtime.send("analytics_counters", live_counters.snapshot(), topics=["role:admin"])
+
+
+# Rows per page of the admin user directory (keyset paginated)
+USER_DIRECTORY_PAGE_SIZE = 50
+USER_DIRECTORY_FILTERS = ("all", "active", "inactive", "admin", "faculty", "student")
+USER_DIRECTORY_COLUMNS = "id, email, id_number, role, full_name, is_active, created_at, photo"
+# Columns the directory search matches by prefix (each has its own index)
+USER_SEARCH_COLUMNS = ("full_name", "email", "id_number")
+# Rows per page of the reservation tabs (keyset paginated)
+RESERVATION_PAGE_SIZE = 20
+
+
+def keyset_condition(columns, cursor):
+    """
+    WHERE condition for the rows after `cursor` in a descending ORDER BY
+    `columns` (the last column must be unique, e.g. the id).
+
+    Returns:
+        tuple: (condition, params)
+    """
+    column, value = columns[0], cursor[0]
+    if len(columns) == 1:
+        return f"{column} < %s", [value]
+    rest, rest_params = keyset_condition(columns[1:], cursor[1:])
+    return f"({column} < %s OR ({column} = %s AND {rest}))", [value, value] + rest_params
+
+
+def keyset_page(rows, page_size, columns):
+    """
+    Split a page fetched with LIMIT page_size + 1.
+
+    Returns:
+        dict: {"items": the page, "next": cursor of its last row or None}
+    """
+    rows = rows or []
+    items = rows[:page_size]
+    next_cursor = None
+    if len(rows) > page_size:
+        next_cursor = tuple(items[-1][column] for column in columns)
+    return {"items": items, "next": next_cursor}
+
+
+def build_directory_query(filter="all", search="", after=None, limit=USER_DIRECTORY_PAGE_SIZE):
+    """
+    SQL for one page of the user directory, newest first.
+
+    Args:
+        filter: One of USER_DIRECTORY_FILTERS (role or active/inactive)
+        search: Prefix of the full name, email or ID number (index friendly)
+        after: (created_at, id) of the last row of the previous page
+        limit: Rows to fetch
+
+    Returns:
+        tuple: (query, params)
+    """
+    conditions = []
+    params = []
+    if filter in ("admin", "faculty", "student"):
+        conditions.append("role = %s")
+        params.append(filter)
+    elif filter in ("active", "inactive"):
+        conditions.append("is_active = %s")
+        params.append(filter == "active")
+    if after:
+        condition, after_params = keyset_condition(("created_at", "id"), after)
+        conditions.append(condition)
+        params.extend(after_params)
+
+    if not search:
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+            SELECT {USER_DIRECTORY_COLUMNS}
+            FROM users
+            {where}
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s
+        """
+        return query, tuple(params + [limit])
+
+    # One prefix query per column, each a range on that column's index (an
+    # OR across the columns can only scan the table); UNION drops a user
+    # matched by more than one column. LIKE wildcards typed by the admin are
+    # escaped so the input is matched literally
+    prefix = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    branches = []
+    branch_params = []
+    for column in USER_SEARCH_COLUMNS:
+        where = " AND ".join([f"{column} LIKE %s"] + conditions)
+        branches.append(f"""(
+                SELECT {USER_DIRECTORY_COLUMNS}
+                FROM users
+                WHERE {where}
+                ORDER BY created_at DESC, id DESC
+                LIMIT %s
+            )""")
+        branch_params.extend([prefix] + params + [limit])
+    query = f"""
+            {" UNION ".join(branches)}
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s
+        """
+    return query, tuple(branch_params + [limit])
+
+
+def user_matches_directory(user, filter="all", search=""):
+    """Whether a user row belongs on a directory page (Python twin of build_directory_query)"""
+    if filter in ("admin", "faculty", "student") and user['role'] != filter:
+        return False
+    if filter in ("active", "inactive") and bool(user['is_active']) != (filter == "active"):
+        return False
+    search = search.strip().lower()
+    if search:
+        fields = (user['full_name'], user['email'], user['id_number'])
+        return any(str(field or "").lower().startswith(search) for field in fields)
+    return True
+
+
+def fold_user_counts(rows):
+    """Fold GROUP BY role, is_active rows into the directory filter counts"""
+    counts = dict.fromkeys(USER_DIRECTORY_FILTERS, 0)
+    for row in rows or []:
+        count = int(row['count'])
+        counts['all'] += count
+        counts['active' if row['is_active'] else 'inactive'] += count
+        if row['role'] in counts:
+            counts[row['role']] += count
+    return counts
+
+
+def reservation_is_past(reservation, now):
+    """
+    Whether a reservation has ended by `now` - the same rule as the
+    upcoming/past split in ReservationModel.get_user_reservations_page.
+    Accepts the DATE/TIME values as returned by the driver (date,
+    timedelta) or as strings.
+    """
+    res_date = reservation["reservation_date"]
+    if isinstance(res_date, str):
+        res_date = datetime.strptime(res_date, '%Y-%m-%d').date()
+    elif isinstance(res_date, datetime):
+        res_date = res_date.date()
+
+    end_time = reservation["end_time"]
+    if isinstance(end_time, timedelta):
+        end_time = (datetime.min + end_time).time()
+    elif isinstance(end_time, str):
+        end_time = datetime.strptime(end_time, '%H:%M:%S' if end_time.count(':') == 2 else '%H:%M').time()
+    elif isinstance(end_time, datetime):
+        end_time = end_time.time()
+
+    today = now.date()
+    return res_date < today or (res_date == today and end_time < now.time().replace(microsecond=0))
+
+
 class UserModel:
     @staticmethod
     def authenticate(id_number, password):
@@ -215,6 +376,53 @@ class UserModel:
         db.disconnect()
         return users if users else []
     
+    @staticmethod
+    def directory(filter="all", search="", after=None, page_size=USER_DIRECTORY_PAGE_SIZE):
+        """
+        One page of the admin user directory, filtered and searched in SQL.
+
+        Args:
+            filter: One of USER_DIRECTORY_FILTERS
+            search: Name, email or ID number prefix
+            after: The previous page's "next" cursor (None for the first page)
+            page_size: Users per page
+
+        Returns:
+            dict: {"users": [...], "next": cursor or None}, plus "counts" per
+                  filter on the first page
+        """
+        db.connect()
+        # One extra row tells whether another page exists
+        query, params = build_directory_query(filter, search.strip(), after, page_size + 1)
+        users = keyset_page(db.fetch_all(query, params), page_size, ("created_at", "id"))
+        result = {"users": users["items"], "next": users["next"]}
+        if after is None:
+            result["counts"] = UserModel.get_directory_counts()
+        db.disconnect()
+        return result
+    
+    @staticmethod
+    def get_directory_user(user_id):
+        """One user with the directory columns (to update a single card)"""
+        db.connect()
+        query = f"SELECT {USER_DIRECTORY_COLUMNS} FROM users WHERE id = %s"
+        user = db.fetch_one(query, (user_id,))
+        db.disconnect()
+        return user
+    
+    @staticmethod
+    def get_directory_counts():
+        """Users per filter (all/active/inactive/role) from one grouped query"""
+        db.connect()
+        query = """
+            SELECT role, is_active, COUNT(*) AS count
+            FROM users
+            GROUP BY role, is_active
+        """
+        rows = db.fetch_all(query)
+        db.disconnect()
+        return fold_user_counts(rows)
+    
     @staticmethod
     def toggle_user_status(user_id):
         """Toggle user active/inactive status"""
@@ -441,22 +649,109 @@ class ReservationModel:
         return reservations
     
     @staticmethod
-    def approve_reservation(reservation_id):
-        """Approve a reservation"""
+    def get_status_counts():
+        """Reservations per status from one grouped query (admin tabs)"""
         db.connect()
-        query = "UPDATE reservations SET status = 'approved' WHERE id = %s"
-        db.execute_query(query, (reservation_id,))
+        query = "SELECT status, COUNT(*) AS count FROM reservations GROUP BY status"
+        rows = db.fetch_all(query)
         db.disconnect()
-        return True
+        return {row['status']: int(row['count']) for row in rows or []}
     
     @staticmethod
-    def reject_reservation(reservation_id):
-        """Reject a reservation"""
+    def get_reservations_page(status, after=None, page_size=RESERVATION_PAGE_SIZE):
+        """
+        One page of all reservations with a status, newest first (admin).
+
+        Args:
+            after: The previous page's "next" cursor (created_at, id)
+
+        Returns:
+            dict: {"items": [...], "next": cursor or None}
+        """
         db.connect()
-        query = "UPDATE reservations SET status = 'rejected' WHERE id = %s"
-        db.execute_query(query, (reservation_id,))
+        conditions = ["r.status = %s"]
+        params = [status]
+        if after:
+            condition, after_params = keyset_condition(("r.created_at", "r.id"), after)
+            conditions.append(condition)
+            params.extend(after_params)
+        # idx_status_created (+ the implicit id) serves the WHERE and ORDER BY
+        query = f"""
+            SELECT r.*, c.room_name, c.building, c.image_url, u.full_name, u.email
+            FROM reservations r
+            JOIN classrooms c ON r.classroom_id = c.id
+            JOIN users u ON r.user_id = u.id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY r.created_at DESC, r.id DESC
+            LIMIT %s
+        """
+        params.append(page_size + 1)
+        rows = db.fetch_all(query, tuple(params))
         db.disconnect()
-        return True
+        return keyset_page(rows, page_size, ("created_at", "id"))
+    
+    @staticmethod
+    def get_user_reservation_counts(user_id, now=None):
+        """
+        Upcoming and past reservation counts of a user in one query.
+
+        A reservation is past once its end time today (or its date) has gone by.
+        """
+        now = now or datetime.now()
+        db.connect()
+        query = """
+            SELECT
+                SUM(CASE WHEN reservation_date < %s OR (reservation_date = %s AND end_time < %s)
+                         THEN 1 ELSE 0 END) AS past,
+                COUNT(*) AS total
+            FROM reservations
+            WHERE user_id = %s
+        """
+        today, time_now = now.date(), now.time().replace(microsecond=0)
+        row = db.fetch_one(query, (today, today, time_now, user_id))
+        db.disconnect()
+        past = int((row or {}).get('past') or 0)
+        total = int((row or {}).get('total') or 0)
+        return {"upcoming": total - past, "past": past}
+    
+    @staticmethod
+    def get_user_reservations_page(user_id, when="upcoming", after=None, page_size=RESERVATION_PAGE_SIZE, now=None):
+        """
+        One page of a user's upcoming or past reservations, latest date first.
+
+        Args:
+            when: "upcoming" or "past"
+            after: The previous page's "next" cursor (reservation_date, start_time, id)
+
+        Returns:
+            dict: {"items": [...], "next": cursor or None}
+        """
+        now = now or datetime.now()
+        today, time_now = now.date(), now.time().replace(microsecond=0)
+        db.connect()
+        conditions = ["r.user_id = %s"]
+        params = [user_id]
+        is_past = "(r.reservation_date < %s OR (r.reservation_date = %s AND r.end_time < %s))"
+        conditions.append(is_past if when == "past" else f"NOT {is_past}")
+        params.extend([today, today, time_now])
+        if after:
+            condition, after_params = keyset_condition(
+                ("r.reservation_date", "r.start_time", "r.id"), after
+            )
+            conditions.append(condition)
+            params.extend(after_params)
+        query = f"""
+            SELECT r.*, c.room_name, c.building, c.image_url
+            FROM reservations r
+            JOIN classrooms c ON r.classroom_id = c.id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY r.reservation_date DESC, r.start_time DESC, r.id DESC
+            LIMIT %s
+        """
+        params.append(page_size + 1)
+        rows = db.fetch_all(query, tuple(params))
+        db.disconnect()
+        return keyset_page(rows, page_size, ("reservation_date", "start_time", "id"))
     
     @staticmethod
     def check_availability(classroom_id, reservation_date, start_time, end_time, exclude_reservation_id=None):
@@ -513,26 +808,55 @@ class ReservationModel:
         db.disconnect()
         return reservation
     
+    @staticmethod
+    def get_reservation_details(reservation_id):
+        """Get one reservation with the columns of the reservation cards"""
+        db.connect()
+        query = """
+            SELECT r.*, c.room_name, c.building, c.image_url, u.full_name, u.email
+            FROM reservations r
+            JOIN classrooms c ON r.classroom_id = c.id
+            JOIN users u ON r.user_id = u.id
+            WHERE r.id = %s
+        """
+        reservation = db.fetch_one(query, (reservation_id,))
+        db.disconnect()
+        return reservation
+    
     @staticmethod
     def update_reservation(reservation_id, reservation_date, start_time, end_time, purpose):
         """Update an existing reservation"""
         db.connect()
+        previous = db.fetch_one("SELECT status FROM reservations WHERE id = %s", (reservation_id,))
         query = """
             UPDATE reservations 
-            SET reservation_date = %s, start_time = %s, end_time = %s, purpose = %s, status = 'pending'
+            SET reservation_date = %s, start_time = %s, end_time = %s, purpose = %s,
+                status = 'pending', submitted_at = NOW()
             WHERE id = %s
         """
-        result = db.execute_query(query, (reservation_date, start_time, end_time, purpose, reservation_id))
+        result = db.execute_update(query, (reservation_date, start_time, end_time, purpose, reservation_id))
         db.disconnect()
+        
+        # An edit sends the reservation back for review
+        if result and previous and previous['status'] != 'pending':
+            from data.analytics import live_counters
+            live_counters.record_transition(previous['status'], 'pending')
+            publish_live_counters()
         return result is not None
     
     @staticmethod
     def cancel_reservation(reservation_id):
         """Cancel a reservation"""
         db.connect()
+        previous = db.fetch_one("SELECT status FROM reservations WHERE id = %s", (reservation_id,))
         query = "UPDATE reservations SET status = 'cancelled' WHERE id = %s"
-        result = db.execute_query(query, (reservation_id,))
+        result = db.execute_update(query, (reservation_id,))
         db.disconnect()
+        
+        if result and previous:
+            from data.analytics import live_counters
+            live_counters.record_transition(previous['status'], 'cancelled')
+            publish_live_counters()
         return result is not None
     
     @staticmethod
@@ -540,8 +864,13 @@ class ReservationModel:
         """Set reservation status to ongoing"""
         db.connect()
         query = "UPDATE reservations SET status = 'ongoing' WHERE id = %s AND status = 'approved'"
-        result = db.execute_query(query, (reservation_id,))
+        result = db.execute_update(query, (reservation_id,))
         db.disconnect()
+        
+        if result:
+            from data.analytics import live_counters
+            live_counters.record_transition('approved', 'ongoing')
+            publish_live_counters()
         return result is not None
     
     @staticmethod
@@ -549,8 +878,13 @@ class ReservationModel:
         """Set reservation status to done"""
         db.connect()
         query = "UPDATE reservations SET status = 'done' WHERE id = %s AND status = 'ongoing'"
-        result = db.execute_query(query, (reservation_id,))
+        result = db.execute_update(query, (reservation_id,))
         db.disconnect()
+        
+        if result:
+            from data.analytics import live_counters
+            live_counters.record_transition('ongoing', 'done')
+            publish_live_counters()
         return result is not None
     
     @staticmethod
@@ -572,7 +906,7 @@ class ReservationModel:
             AND start_time <= CURTIME()
             AND end_time > CURTIME()
         """
-        db.execute_query(ongoing_query)
+        started = db.execute_update(ongoing_query) or 0
         
         # Set ongoing reservations to done if current time is past end_time
         done_query = """
@@ -584,7 +918,7 @@ class ReservationModel:
                 OR (reservation_date = CURDATE() AND end_time <= CURTIME())
             )
         """
-        db.execute_query(done_query)
+        finished = db.execute_update(done_query) or 0
         
         # Also mark approved reservations from past dates as done
         past_done_query = """
@@ -593,9 +927,17 @@ class ReservationModel:
             WHERE status = 'approved'
             AND reservation_date < CURDATE()
         """
-        db.execute_query(past_done_query)
+        expired = db.execute_update(past_done_query) or 0
         
         db.disconnect()
+        
+        # Apply the sweep's moves to the live counters; push only if any moved
+        if started or finished or expired:
+            from data.analytics import live_counters
+            live_counters.record_transition('approved', 'ongoing', started)
+            live_counters.record_transition('ongoing', 'done', finished)
+            live_counters.record_transition('approved', 'done', expired)
+            publish_live_counters()
         return True
     
     @staticmethod
@@ -675,41 +1017,70 @@ class ReservationModel:
         
         db.disconnect()
         
+        if reservation_id:
+            from data.analytics import live_counters
+            live_counters.record_created()
+            publish_live_counters()
+        
         # Notify admins about new reservation
         if room and reservation_id:
             from data.models import NotificationModel
             NotificationModel.notify_new_reservation(reservation_id, room['room_name'])
         
-            if REALTIME_ENABLED and realtime.connected:
+            if REALTIME_ENABLED:
                 realtime.send("new_reservation", {
                     "reservation_id": reservation_id,
                     "room_name": room['room_name'],
                     "message": f"New reservation for {room['room_name']}"
-                })
+                }, topics=["role:admin", f"classroom:{classroom_id}"])
         
         return reservation_id
 
     @staticmethod
-    def approve_reservation(reservation_id):
-        """Approve a reservation and notify the faculty member"""
+    def approve_reservation(reservation_id, admin_id=None):
+        """
+        Approve a pending reservation, record who reviewed it and notify the
+        faculty member.
+
+        Returns:
+            bool: False if it was no longer pending (or the update failed)
+        """
         db.connect()
         
         # Get reservation details before updating
         query = """
-            SELECT r.user_id, c.room_name 
+            SELECT r.user_id, r.classroom_id, r.status, c.room_name,
+                   TIMESTAMPDIFF(SECOND, r.submitted_at, NOW()) as wait_seconds
             FROM reservations r
             JOIN classrooms c ON r.classroom_id = c.id
             WHERE r.id = %s
         """
         reservation = db.fetch_one(query, (reservation_id,))
         
-        # Update status
-        update_query = "UPDATE reservations SET status = 'approved' WHERE id = %s"
-        db.execute_query(update_query, (reservation_id,))
+        # Only a pending reservation can be decided: a double click or a
+        # second admin deciding at the same time changes no row
+        update_query = """
+            UPDATE reservations
+            SET status = 'approved', approved_at = NOW(), reviewed_by = %s
+            WHERE id = %s AND status = 'pending'
+        """
+        changed = db.execute_update(update_query, (admin_id, reservation_id))
         db.disconnect()
+        if changed != 1:
+            return False
         
-        # Notify faculty member
         if reservation:
+            # Track approval latency (last submission -> approval); only
+            # reached when this call moved the reservation out of pending
+            from data.analytics import approval_latency
+            approval_latency.record(reservation_id, reservation['wait_seconds'], admin_id, reservation['classroom_id'])
+            
+            # Update live dashboard counters
+            from data.analytics import live_counters
+            live_counters.record_transition('pending', 'approved')
+            publish_live_counters()
+            
+            # Notify faculty member
             from data.models import NotificationModel
             NotificationModel.notify_reservation_approved(
                 reservation['user_id'], 
@@ -717,43 +1088,69 @@ class ReservationModel:
                 reservation['room_name']
             )
             
-            if REALTIME_ENABLED and realtime.connected:
+            if REALTIME_ENABLED:
                 realtime.send("reservation_approved", {
                     "reservation_id": reservation_id,
                     "user_id": reservation['user_id'],
                     "room_name": reservation['room_name'],
                     "message": f"Reservation for {reservation['room_name']} approved"
-                })              
+                }, topics=[f"user:{reservation['user_id']}", f"classroom:{reservation['classroom_id']}"])
         
         return True
 
     @staticmethod
-    def reject_reservation(reservation_id):
-        """Reject a reservation and notify the faculty member"""
+    def reject_reservation(reservation_id, admin_id=None):
+        """
+        Reject a pending reservation, record who reviewed it and notify the
+        faculty member.
+
+        Returns:
+            bool: False if it was no longer pending (or the update failed)
+        """
         db.connect()
         
         # Get reservation details before updating
         query = """
-            SELECT r.user_id, c.room_name 
+            SELECT r.user_id, r.classroom_id, r.status, c.room_name
             FROM reservations r
             JOIN classrooms c ON r.classroom_id = c.id
             WHERE r.id = %s
         """
         reservation = db.fetch_one(query, (reservation_id,))
         
-        # Update status
-        update_query = "UPDATE reservations SET status = 'rejected' WHERE id = %s"
-        db.execute_query(update_query, (reservation_id,))
+        # Only a pending reservation can be decided: a double click or a
+        # second admin deciding at the same time changes no row
+        update_query = """
+            UPDATE reservations
+            SET status = 'rejected', rejected_at = NOW(), reviewed_by = %s
+            WHERE id = %s AND status = 'pending'
+        """
+        changed = db.execute_update(update_query, (admin_id, reservation_id))
         db.disconnect()
+        if changed != 1:
+            return False
         
-        # Notify faculty member
         if reservation:
+            # Update live dashboard counters
+            from data.analytics import live_counters
+            live_counters.record_transition('pending', 'rejected')
+            publish_live_counters()
+            
+            # Notify faculty member
             from data.models import NotificationModel
             NotificationModel.notify_reservation_rejected(
                 reservation['user_id'], 
                 reservation_id, 
                 reservation['room_name']
             )
+            
+            if REALTIME_ENABLED:
+                realtime.send("reservation_rejected", {
+                    "reservation_id": reservation_id,
+                    "user_id": reservation['user_id'],
+                    "room_name": reservation['room_name'],
+                    "message": f"Reservation for {reservation['room_name']} rejected"
+                }, topics=[f"user:{reservation['user_id']}"])
         
         return True
 class ActivityLogModel:
@@ -769,6 +1166,12 @@ class ActivityLogModel:
         db.disconnect()
 
 class NotificationModel:
+    # Bursts of the same notification within this window are merged into one row (0 disables)
+    COALESCE_MINUTES = 10
+    # Read notifications older than this are purged by the retention job
+    RETENTION_DAYS = 90
+    RETENTION_BATCH_SIZE = 1000
+    
     @staticmethod
     def create_notification(user_id, message, reservation_id=None):
         """Create a new notification for a user"""
@@ -779,25 +1182,82 @@ class NotificationModel:
         """
         notification_id = db.execute_query(query, (user_id, message, reservation_id))
         db.disconnect()
+        
+        if notification_id:
+            notification_cache.add(user_id, {
+                'id': notification_id,
+                'user_id': user_id,
+                'message': message,
+                'reservation_id': reservation_id,
+                'group_key': None,
+                'group_count': 1,
+                'is_read': False,
+                'created_at': datetime.now(),
+            })
         return notification_id
     
+    @staticmethod
+    def _load_cached(user_id):
+        """Return (unread_count, recent notifications), seeding the cache on a miss"""
+        cached = notification_cache.get(user_id)
+        if cached is not None:
+            return cached
+        
+        db.connect()
+        # Unread = not individually read and newer than the user's read watermark
+        count_query = """
+            SELECT COUNT(*) as count 
+            FROM notifications n
+            JOIN users u ON u.id = n.user_id
+            WHERE n.user_id = %s AND n.is_read = FALSE
+            AND n.id > u.notifications_read_upto
+        """
+        result = db.fetch_one(count_query, (user_id,))
+        recent_query = """
+            SELECT n.id, n.user_id, n.message, n.reservation_id, n.group_key, n.group_count, n.created_at,
+                   (n.is_read OR n.id <= u.notifications_read_upto) as is_read
+            FROM notifications n
+            JOIN users u ON u.id = n.user_id
+            WHERE n.user_id = %s
+            ORDER BY n.created_at DESC, n.id DESC
+            LIMIT %s
+        """
+        recent = db.fetch_all(recent_query, (user_id, notification_cache.recent_limit))
+        db.disconnect()
+        
+        unread = result['count'] if result else 0
+        recent = recent if recent else []
+        notification_cache.seed(user_id, unread, recent)
+        return unread, recent
+    
     @staticmethod
     def get_user_notifications(user_id, limit=5, unread_only=False):
-        """Get notifications for a user"""
+        """Get notifications for a user (recent ones are served from memory)"""
+        if not unread_only and limit <= notification_cache.recent_limit:
+            _, recent = NotificationModel._load_cached(user_id)
+            return recent[:limit]
+        
         db.connect()
         
         if unread_only:
             query = """
-                SELECT * FROM notifications
-                WHERE user_id = %s AND is_read = FALSE
-                ORDER BY created_at DESC
+                SELECT n.id, n.user_id, n.message, n.reservation_id, n.group_key, n.group_count, n.created_at,
+                       FALSE as is_read
+                FROM notifications n
+                JOIN users u ON u.id = n.user_id
+                WHERE n.user_id = %s AND n.is_read = FALSE
+                AND n.id > u.notifications_read_upto
+                ORDER BY n.created_at DESC
                 LIMIT %s
             """
         else:
             query = """
-                SELECT * FROM notifications
-                WHERE user_id = %s
-                ORDER BY created_at DESC
+                SELECT n.id, n.user_id, n.message, n.reservation_id, n.group_key, n.group_count, n.created_at,
+                       (n.is_read OR n.id <= u.notifications_read_upto) as is_read
+                FROM notifications n
+                JOIN users u ON u.id = n.user_id
+                WHERE n.user_id = %s
+                ORDER BY n.created_at DESC
                 LIMIT %s
             """
         
@@ -807,16 +1267,9 @@ class NotificationModel:
     
     @staticmethod
     def get_unread_count(user_id):
-        """Get count of unread notifications for a user"""
-        db.connect()
-        query = """
-            SELECT COUNT(*) as count 
-            FROM notifications
-            WHERE user_id = %s AND is_read = FALSE
-        """
-        result = db.fetch_one(query, (user_id,))
-        db.disconnect()
-        return result['count'] if result else 0
+        """Get count of unread notifications for a user (served from memory)"""
+        unread, _ = NotificationModel._load_cached(user_id)
+        return unread
     
     @staticmethod
     def mark_as_read(notification_id):
@@ -824,42 +1277,170 @@ class NotificationModel:
         db.connect()
         query = "UPDATE notifications SET is_read = TRUE WHERE id = %s"
         db.execute_query(query, (notification_id,))
+        
+        # Older notifications are not in the recent buffer - re-seed the owner
+        if not notification_cache.mark_read(notification_id):
+            owner = db.fetch_one("SELECT user_id FROM notifications WHERE id = %s", (notification_id,))
+            if owner:
+                notification_cache.invalidate(owner['user_id'])
         db.disconnect()
         return True
     
     @staticmethod
-    def mark_all_as_read(user_id):
-        """Mark all notifications as read for a user"""
+    def mark_all_as_read(user_id, upto_id):
+        """
+        Mark all notifications up to upto_id as read for a user.
+        
+        upto_id is the newest notification the client displayed, so one that
+        arrived after the list was shown stays unread. Moves the user's read
+        watermark instead of updating every historical row - a single-row update.
+        """
         db.connect()
-        query = "UPDATE notifications SET is_read = TRUE WHERE user_id = %s"
-        db.execute_query(query, (user_id,))
+        query = """
+            UPDATE users
+            SET notifications_read_upto = GREATEST(notifications_read_upto, %s)
+            WHERE id = %s
+        """
+        db.execute_query(query, (upto_id, user_id))
         db.disconnect()
+        notification_cache.mark_all_read(user_id, upto_id)
         return True
     
     @staticmethod
     def delete_notification(notification_id):
         """Delete a notification"""
         db.connect()
+        owner = db.fetch_one("SELECT user_id FROM notifications WHERE id = %s", (notification_id,))
         query = "DELETE FROM notifications WHERE id = %s"
         db.execute_query(query, (notification_id,))
         db.disconnect()
+        if owner:
+            notification_cache.invalidate(owner['user_id'])
         return True
     
+    @staticmethod
+    def purge_read_notifications(days=None, batch_size=None):
+        """
+        Delete read notifications older than `days`, in bounded batches.
+        
+        Unread notifications are kept regardless of age. Each batch deletes
+        at most `batch_size` rows by primary key, so the job never holds
+        long locks on the table.
+        
+        Returns:
+            int: Number of notifications deleted
+        """
+        days = days if days is not None else NotificationModel.RETENTION_DAYS
+        batch_size = batch_size or NotificationModel.RETENTION_BATCH_SIZE
+        
+        select_query = """
+            SELECT n.id, n.user_id
+            FROM notifications n
+            JOIN users u ON u.id = n.user_id
+            WHERE n.created_at < DATE_SUB(NOW(), INTERVAL %s DAY)
+            AND (n.is_read = TRUE OR n.id <= u.notifications_read_upto)
+            ORDER BY n.created_at
+            LIMIT %s
+        """
+        deleted = 0
+        affected_users = set()
+        
+        db.connect()
+        while True:
+            rows = db.fetch_all(select_query, (days, batch_size))
+            if not rows:
+                break
+            
+            ids = [row['id'] for row in rows]
+            placeholders = ", ".join(["%s"] * len(ids))
+            db.execute_query(f"DELETE FROM notifications WHERE id IN ({placeholders})", tuple(ids))
+            deleted += len(ids)
+            affected_users.update(row['user_id'] for row in rows)
+            
+            if len(rows) < batch_size:
+                break
+        db.disconnect()
+        
+        for affected_user in affected_users:
+            notification_cache.invalidate(affected_user)
+        return deleted
+    
     @staticmethod
     def notify_new_reservation(reservation_id, room_name):
-        """Notify all admins about a new reservation"""
+        """
+        Notify all active admins about a new reservation.
+        
+        Within COALESCE_MINUTES, further reservations for the same room
+        update the admin's unread notification ("3 new reservations for
+        CS Lab") instead of adding a row each. The merged row keeps the
+        reservation of its first notification.
+        """
         db.connect()
+        message = f"New Reservation for {room_name}"
+        group_key = f"new_reservation:{room_name}"
         
-        # Get all admin users
-        admin_query = "SELECT id FROM users WHERE role = 'admin' AND is_active = TRUE"
-        admins = db.fetch_all(admin_query)
+        # Merge into recent unread notifications of the same burst
+        if NotificationModel.COALESCE_MINUTES > 0:
+            coalesce_query = """
+                UPDATE notifications
+                SET message = CONCAT(group_count + 1, ' new reservations for ', %s),
+                    group_count = group_count + 1,
+                    created_at = NOW()
+                WHERE group_key = %s
+                AND is_read = FALSE
+                AND created_at >= DATE_SUB(NOW(), INTERVAL %s MINUTE)
+                AND id > (SELECT notifications_read_upto FROM users WHERE users.id = notifications.user_id)
+            """
+            db.execute_query(coalesce_query, (room_name, group_key, NotificationModel.COALESCE_MINUTES))
+            
+            # Admins whose burst row was just merged into; read back the same
+            # rows (plus the new ones) for delivery
+            open_burst = """
+                n.group_key = %s
+                AND n.is_read = FALSE
+                AND n.created_at >= DATE_SUB(NOW(), INTERVAL %s MINUTE)
+                AND n.id > u.notifications_read_upto
+            """
+            burst_params = (group_key, NotificationModel.COALESCE_MINUTES)
+        else:
+            open_burst = "n.reservation_id = %s AND n.group_key = %s"
+            burst_params = (reservation_id, group_key)
         
-        if admins:
-            message = f"New Reservation for {room_name}"
-            for admin in admins:
-                NotificationModel.create_notification(admin['id'], message, reservation_id)
+        # Fan out in the database to every admin not covered above:
+        # one statement regardless of admin count
+        fanout_query = f"""
+            INSERT INTO notifications (user_id, message, reservation_id, group_key)
+            SELECT u.id, %s, %s, %s
+            FROM users u
+            WHERE u.role = 'admin' AND u.is_active = TRUE
+            AND NOT EXISTS (
+                SELECT 1 FROM notifications n
+                WHERE n.user_id = u.id AND {open_burst}
+            )
+        """
+        db.execute_query(fanout_query, (message, reservation_id, group_key) + burst_params)
         
+        # Read back the rows just written for per-recipient delivery
+        delivered_query = f"""
+            SELECT n.id, n.user_id, n.message, n.reservation_id, n.group_key, n.group_count, n.created_at,
+                   FALSE as is_read
+            FROM notifications n
+            JOIN users u ON u.id = n.user_id
+            WHERE {open_burst}
+        """
+        notifications = db.fetch_all(delivered_query, burst_params)
         db.disconnect()
+        
+        for notification in notifications:
+            notification_cache.add(notification['user_id'], notification)
+            
+            if REALTIME_ENABLED:
+                realtime.send("notification", {
+                    "user_id": notification['user_id'],
+                    "notification_id": notification['id'],
+                    "reservation_id": notification['reservation_id'],
+                    "message": notification['message']
+                }, topics=[f"user:{notification['user_id']}"])
     
     @staticmethod
     def notify_reservation_approved(user_id, reservation_id, room_name):
@@ -0,0 +1,123 @@
+"""
+Notification Cache
+==================
+Per-user unread counters and recent notifications kept in process memory
+
+Features:
+- Lazily seeded from the database on first use per user
+- Updated in place by NotificationModel writes (create / mark read)
+- LRU-bounded number of cached users, fixed-size recent buffer per user
+- Entries expire after a TTL so writes from other processes are picked up
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Maximum number of users kept in memory (least recently used are evicted)
+NOTIFICATION_CACHE_MAX_USERS = 1000
+# Recent notifications kept per user (header shows 5)
+NOTIFICATION_RECENT_LIMIT = 10
+# Re-seed an entry after this long, in case another process wrote to it
+NOTIFICATION_CACHE_TTL_SECONDS = 300
+
+
+class NotificationCache:
+    """LRU map of user_id -> {unread count, ring buffer of recent notifications}"""
+
+    def __init__(self, max_users=NOTIFICATION_CACHE_MAX_USERS,
+                 recent_limit=NOTIFICATION_RECENT_LIMIT,
+                 ttl_seconds=NOTIFICATION_CACHE_TTL_SECONDS):
+        self.max_users = max_users
+        self.recent_limit = recent_limit
+        self.ttl_seconds = ttl_seconds
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, user_id):
+        """
+        Returns:
+            tuple: (unread_count, list of recent notifications newest first),
+                   or None if the user is not cached (caller should seed)
+        """
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry['loaded_at'] > self.ttl_seconds:
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+            return entry['unread'], [dict(n) for n in entry['recent']]
+
+    def seed(self, user_id, unread, recent):
+        """Store a freshly loaded entry (recent: newest first)"""
+        with self.lock:
+            self.entries[user_id] = {
+                'unread': unread,
+                'recent': deque((dict(n) for n in recent[:self.recent_limit]), maxlen=self.recent_limit),
+                'loaded_at': time.monotonic(),
+            }
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_users:
+                self.entries.popitem(last=False)
+
+    def add(self, user_id, notification):
+        """
+        Record a new or coalesced notification (no-op if the user is not cached).
+
+        A notification already in the buffer (same id) is moved to the front
+        and only counted as unread once. A coalesced one (group_count > 1)
+        that has left the buffer was merged into a row that was already
+        unread, so it is listed again without being counted again.
+        """
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return
+            counted = notification.get('group_count', 1) > 1
+            for existing in list(entry['recent']):
+                if existing['id'] == notification['id']:
+                    entry['recent'].remove(existing)
+                    counted = not existing['is_read']
+            entry['recent'].appendleft(dict(notification))
+            if not notification.get('is_read') and not counted:
+                entry['unread'] += 1
+
+    def mark_read(self, notification_id):
+        """
+        Mark one notification as read.
+
+        Returns:
+            bool: True if the notification was found in a cached buffer.
+                  False means the caller must invalidate its owner.
+        """
+        with self.lock:
+            for entry in self.entries.values():
+                for notification in entry['recent']:
+                    if notification['id'] == notification_id:
+                        if not notification['is_read']:
+                            notification['is_read'] = True
+                            entry['unread'] = max(0, entry['unread'] - 1)
+                        return True
+            return False
+
+    def mark_all_read(self, user_id, upto_id):
+        """Mark a user's notifications up to upto_id as read (newer ones stay unread)"""
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return
+            for notification in entry['recent']:
+                if notification['id'] <= upto_id:
+                    notification['is_read'] = True
+            entry['unread'] = sum(1 for n in entry['recent'] if not n['is_read'])
+
+    def invalidate(self, user_id):
+        """Drop a user's entry; the next read re-seeds it"""
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+
+# Global notification cache (used by NotificationModel)
+notification_cache = NotificationCache()
@@ -0,0 +1,62 @@
+"""
+Retention Module
+================
+Background housekeeping for tables that would otherwise grow without bound
+
+Features:
+- Purges read notifications older than NotificationModel.RETENTION_DAYS
+- Deletes in bounded batches (see NotificationModel.purge_read_notifications)
+- Runs once per interval in a daemon thread, or once from the command line:
+  python -m data.retention
+"""
+
+import threading
+
+from data.models import NotificationModel
+
+# How often the retention job runs
+RETENTION_INTERVAL_SECONDS = 24 * 3600
+
+
+class RetentionService:
+    """Runs the notification retention job in a background thread"""
+
+    def __init__(self, interval_seconds=RETENTION_INTERVAL_SECONDS):
+        self.interval_seconds = interval_seconds
+        self.thread = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """Start the background retention job (no-op if already running)"""
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the background retention job"""
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"❌ Notification retention failed: {e}")
+            self._stop_event.wait(self.interval_seconds)
+
+    def run_once(self):
+        """Purge expired read notifications and return how many were deleted"""
+        deleted = NotificationModel.purge_read_notifications()
+        if deleted:
+            print(f"🧹 Purged {deleted} read notification(s) older than {NotificationModel.RETENTION_DAYS} days")
+        return deleted
+
+
+# Global retention service
+retention_service = RetentionService()
+
+
+if __name__ == "__main__":
+    retention_service.run_once()
@@ -78,9 +78,14 @@ CREATE TABLE users (
     is_active BOOLEAN DEFAULT TRUE,
     failed_attempts INT NOT NULL DEFAULT 0,
     last_failed_at DATETIME NULL,
-    INDEX idx_email (email),
-    INDEX idx_id_number (id_number),
-    INDEX idx_role (role)
+    notifications_read_upto INT NOT NULL DEFAULT 0,
+    -- Directory search: one prefix range per column (email and id_number
+    -- use their UNIQUE keys)
+    INDEX idx_full_name (full_name),
+    -- Keyset pages of the user directory, newest first, per filter
+    INDEX idx_created (created_at, id),
+    INDEX idx_role_created (role, created_at, id),
+    INDEX idx_active_created (is_active, created_at, id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 -- Create Classrooms Table
@@ -106,12 +111,24 @@ CREATE TABLE reservations (
     purpose TEXT NOT NULL,
     status ENUM('pending', 'approved', 'rejected', 'cancelled', 'ongoing', 'done') DEFAULT 'pending',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Last time it went (back) to pending: creation or an edit
+    submitted_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    approved_at DATETIME NULL,
+    rejected_at DATETIME NULL,
+    reviewed_by INT NULL,
     FOREIGN KEY (classroom_id) REFERENCES classrooms(id) ON DELETE CASCADE,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (reviewed_by) REFERENCES users(id) ON DELETE SET NULL,
     INDEX idx_classroom_date (classroom_id, reservation_date),
     INDEX idx_user (user_id),
-    INDEX idx_status (status)
+    INDEX idx_status (status),
+    INDEX idx_reservation_date (reservation_date),
+    INDEX idx_status_date_start (status, reservation_date, start_time),
+    INDEX idx_status_created (status, created_at),
+    INDEX idx_user_created (user_id, created_at),
+    -- Keyset pages of "My Reservations", latest date first
+    INDEX idx_user_date_start (user_id, reservation_date, start_time)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 -- Create Activity Logs Table
@@ -134,11 +151,14 @@ CREATE TABLE IF NOT EXISTS notifications (
     message TEXT NOT NULL,
     reservation_id INT,
     is_read BOOLEAN DEFAULT FALSE,
+    group_key VARCHAR(150) NULL,
+    group_count INT NOT NULL DEFAULT 1,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (reservation_id) REFERENCES reservations(id) ON DELETE CASCADE,
     INDEX idx_user_read (user_id, is_read),
-    INDEX idx_created_at (created_at)
+    INDEX idx_created_at (created_at),
+    INDEX idx_group_unread (group_key, is_read, created_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 -- =====================================================
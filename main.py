@@ -1,6 +1,7 @@
 import flet as ft
 import os
 from views.login_view import show_login
+from utils.security import exit_view
 
 # Connect to WebSocket server on app start
 try:
@@ -10,6 +11,20 @@ try:
 except Exception as e:
     print(f"⚠️ WebSocket not available: {e}")
 
+# Fit the room demand forecast in the background
+try:
+    from data.forecast import forecast_service
+    forecast_service.start()
+except Exception as e:
+    print(f"⚠️ Demand forecast not available: {e}")
+
+# Purge old read notifications in the background
+try:
+    from data.retention import retention_service
+    retention_service.start()
+except Exception as e:
+    print(f"⚠️ Notification retention not available: {e}")
+
 def main(page: ft.Page):
     page.title = "Classroom Reservation System"
     try:
@@ -30,6 +45,18 @@ def main(page: ft.Page):
 
     page.theme_mode = ft.ThemeMode.LIGHT
 
+    # Release the open view's state and drop this session's realtime
+    # listeners and topics once it ends
+    def on_session_close(e):
+        exit_view(page)
+        try:
+            from utils.websocket_client import realtime
+            realtime.end_session(page.session_id)
+        except ImportError:
+            pass
+
+    page.on_close = on_session_close
+
     # Start with login page
     show_login(page)
 
@@ -0,0 +1,30 @@
+-- =====================================================
+-- Migration 001: Analytics Indexes
+-- =====================================================
+-- Description: Adds composite/covering indexes used by the
+--              analytics dashboard queries (data/analytics.py)
+-- Usage: Run once against an existing classroom_reservation_db.
+--        Fresh installs from eduroom_schema.sql already include them.
+-- =====================================================
+
+USE classroom_reservation_db;
+
+-- Date-range scans: trends, weekly comparison, daily average
+ALTER TABLE reservations
+    ADD INDEX idx_reservation_date (reservation_date);
+
+-- Status filter + time-of-day / day-of-week grouping
+-- (covers get_reservations_by_time_slot, get_peak_hours, get_busiest_day)
+ALTER TABLE reservations
+    ADD INDEX idx_status_date_start (status, reservation_date, start_time);
+
+-- Pending queue age (covers get_pending_bottleneck)
+ALTER TABLE reservations
+    ADD INDEX idx_status_created (status, created_at);
+
+-- Recent activity per faculty (covers get_most_active_faculty)
+ALTER TABLE reservations
+    ADD INDEX idx_user_created (user_id, created_at);
+
+-- Verify
+SHOW INDEX FROM reservations;
@@ -0,0 +1,20 @@
+-- =====================================================
+-- Migration 002: Reservation Review Timestamps
+-- =====================================================
+-- Description: Records when a reservation was approved/rejected
+--              and by which admin, for approval-latency analytics
+--              (data/analytics.py - ApprovalLatencyTracker)
+-- Usage: Run once against an existing classroom_reservation_db.
+--        Fresh installs from eduroom_schema.sql already include them.
+-- =====================================================
+
+USE classroom_reservation_db;
+
+ALTER TABLE reservations
+    ADD COLUMN approved_at DATETIME NULL,
+    ADD COLUMN rejected_at DATETIME NULL,
+    ADD COLUMN reviewed_by INT NULL,
+    ADD FOREIGN KEY (reviewed_by) REFERENCES users(id) ON DELETE SET NULL;
+
+-- Verify
+DESCRIBE reservations;
@@ -0,0 +1,26 @@
+-- =====================================================
+-- Migration 003: Notification Retention & Coalescing
+-- =====================================================
+-- Description: Per-user read watermark (O(1) "mark all read"),
+--              group columns for coalescing notification bursts,
+--              and an index for the coalescing lookup
+--              (data/models.py - NotificationModel)
+-- Usage: Run once against an existing classroom_reservation_db.
+--        Fresh installs from eduroom_schema.sql already include them.
+-- =====================================================
+
+USE classroom_reservation_db;
+
+-- Notifications with id <= watermark count as read
+ALTER TABLE users
+    ADD COLUMN notifications_read_upto INT NOT NULL DEFAULT 0;
+
+-- "3 new reservations for CS Lab" instead of three rows
+ALTER TABLE notifications
+    ADD COLUMN group_key VARCHAR(150) NULL,
+    ADD COLUMN group_count INT NOT NULL DEFAULT 1,
+    ADD INDEX idx_group_unread (group_key, is_read, created_at);
+
+-- Verify
+DESCRIBE users;
+DESCRIBE notifications;
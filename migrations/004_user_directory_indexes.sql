@@ -0,0 +1,24 @@
+-- =====================================================
+-- Migration 004: User Directory Indexes
+-- =====================================================
+-- Description: Indexes behind the admin user directory
+--              (data/models.py - UserModel.directory):
+--              prefix search on full name, and keyset pages
+--              (created_at, id) per role / active filter
+-- Usage: Run once against an existing classroom_reservation_db.
+--        Fresh installs from eduroom_schema.sql already include them.
+-- =====================================================
+
+USE classroom_reservation_db;
+
+-- email and id_number are already indexed; full_name was not
+-- idx_role is a prefix of idx_role_created, so it is replaced
+ALTER TABLE users
+    ADD INDEX idx_full_name (full_name),
+    ADD INDEX idx_created (created_at, id),
+    ADD INDEX idx_role_created (role, created_at, id),
+    ADD INDEX idx_active_created (is_active, created_at, id),
+    DROP INDEX idx_role;
+
+-- Verify
+SHOW INDEX FROM users;
@@ -0,0 +1,18 @@
+-- =====================================================
+-- Migration 005: Reservation Paging Index
+-- =====================================================
+-- Description: Index behind the keyset-paged "My Reservations" tabs
+--              (data/models.py - ReservationModel.get_user_reservations_page).
+--              The admin tabs page on the existing idx_status_created.
+-- Usage: Run once against an existing classroom_reservation_db.
+--        Fresh installs from eduroom_schema.sql already include it.
+-- =====================================================
+
+USE classroom_reservation_db;
+
+-- WHERE user_id = ? ORDER BY reservation_date DESC, start_time DESC, id DESC
+ALTER TABLE reservations
+    ADD INDEX idx_user_date_start (user_id, reservation_date, start_time);
+
+-- Verify
+SHOW INDEX FROM reservations;
@@ -0,0 +1,24 @@
+-- =====================================================
+-- Migration 006: User Search Indexes
+-- =====================================================
+-- Description: The user directory search runs one prefix query per
+--              column (full_name, email, id_number) joined by UNION
+--              (data/models.py - build_directory_query). Each branch
+--              ranges over that column's own index:
+--                full_name  -> idx_full_name (migration 004)
+--                email      -> email        (UNIQUE key)
+--                id_number  -> id_number    (UNIQUE key)
+--              idx_email and idx_id_number duplicate the UNIQUE keys,
+--              so they only cost writes and are dropped.
+-- Usage: Run once against an existing classroom_reservation_db.
+--        Fresh installs from eduroom_schema.sql already match.
+-- =====================================================
+
+USE classroom_reservation_db;
+
+ALTER TABLE users
+    DROP INDEX idx_email,
+    DROP INDEX idx_id_number;
+
+-- Verify: email, id_number and idx_full_name remain
+SHOW INDEX FROM users;
@@ -0,0 +1,21 @@
+-- =====================================================
+-- Migration 007: Reservation Submission Time
+-- =====================================================
+-- Description: When a reservation last went (back) to pending: set
+--              on create and on every edit. Approval latency is
+--              measured from it, so time before an edit is not
+--              counted (data/analytics.py - ApprovalLatencyTracker).
+-- Usage: Run once against an existing classroom_reservation_db.
+--        Fresh installs from eduroom_schema.sql already include it.
+-- =====================================================
+
+USE classroom_reservation_db;
+
+ALTER TABLE reservations
+    ADD COLUMN submitted_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP AFTER created_at;
+
+-- Existing rows: the best known submission time is the creation time
+UPDATE reservations SET submitted_at = created_at;
+
+-- Verify
+DESCRIBE reservations;
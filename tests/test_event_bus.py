@@ -0,0 +1,228 @@
+"""
+Unit Tests for the WebSocket Event Bus
+======================================
+Tests the local and Unix-socket bus backends used for multi-process fan-out
+"""
+
+import unittest
+import asyncio
+import os
+import sys
+import tempfile
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from websocket import bus as bus_module
+from websocket.bus import LocalBus, UnixSocketBus, create_bus
+
+
+class TestLocalBus(unittest.TestCase):
+    """Test cases for the single-process bus"""
+
+    def test_publish_loops_back(self):
+        """Test a published frame is handed straight back"""
+        async def scenario():
+            received = []
+
+            async def on_message(frame, seq):
+                received.append((seq, frame))
+
+            bus = LocalBus()
+            await bus.start(on_message, last_seq=41)
+            await bus.publish('{"type": "x"}')
+            return received
+
+        self.assertEqual(asyncio.run(scenario()), [(42, '{"type": "x"}')])
+
+    def test_unsequenced_publish(self):
+        """Test sequenced=False loops back without a number or using one"""
+        async def scenario():
+            received = []
+
+            async def on_message(frame, seq):
+                received.append(seq)
+
+            bus = LocalBus()
+            await bus.start(on_message, last_seq=41)
+            await bus.publish('{"type": "presence"}', sequenced=False)
+            await bus.publish('{"type": "x"}')
+            return received
+
+        self.assertEqual(asyncio.run(scenario()), [None, 42])
+
+    def test_unknown_backend(self):
+        """Test an unknown WS_BUS name is rejected"""
+        with self.assertRaises(ValueError):
+            create_bus("carrier-pigeon")
+
+
+class TestUnixSocketBus(unittest.TestCase):
+    """Test cases for the broker-free Unix socket bus"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "bus.sock")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_fan_out_to_every_process(self):
+        """Test a frame published by one member reaches all members once, in order"""
+        async def scenario():
+            received = {0: [], 1: [], 2: []}
+            buses = []
+            for index in received:
+                async def on_message(frame, seq, index=index):
+                    received[index].append((seq, frame))
+                bus = UnixSocketBus(self.path)
+                await bus.start(on_message)
+                buses.append(bus)
+
+            await buses[2].publish('{"type": "a"}')
+            await buses[0].publish('{"type": "b"}')
+            await asyncio.sleep(0.1)
+            hubs = [bus.is_hub for bus in buses]
+            epochs = {bus.epoch for bus in buses}
+            for bus in buses:
+                await bus.close()
+            return received, hubs, epochs
+
+        received, hubs, epochs = asyncio.run(scenario())
+        self.assertEqual(hubs.count(True), 1)
+        # One numbering, one epoch
+        self.assertEqual(len(epochs), 1)
+        self.assertIsNotNone(epochs.pop())
+        # Every member sees the same frames with the same sequence numbers
+        self.assertEqual(received[0], received[1])
+        self.assertEqual(received[0], received[2])
+        self.assertEqual([seq for seq, _ in received[0]], [1, 2])
+        self.assertEqual(sorted(frame for _, frame in received[0]), ['{"type": "a"}', '{"type": "b"}'])
+
+    def test_hub_failover(self):
+        """Test the remaining members elect a new hub when the hub closes"""
+        async def scenario():
+            received = []
+
+            async def ignore(frame, seq):
+                pass
+
+            async def on_message(frame, seq):
+                received.append((seq, frame))
+
+            hub = UnixSocketBus(self.path)
+            await hub.start(ignore)
+            member = UnixSocketBus(self.path)
+            await member.start(on_message)
+            epoch = hub.epoch
+            await hub.publish('{"type": "before"}')
+            await asyncio.sleep(0.1)
+            await hub.close()
+            await asyncio.sleep(0.8)
+            await member.publish('{"type": "after"}')
+            await asyncio.sleep(0.1)
+            was_hub = member.is_hub
+            same_epoch = member.epoch == epoch
+            await member.close()
+            return received, was_hub, same_epoch
+
+        received, was_hub, same_epoch = asyncio.run(scenario())
+        self.assertTrue(was_hub)
+        self.assertTrue(same_epoch)
+        # The new hub continues the sequence
+        self.assertEqual(received, [(1, '{"type": "before"}'), (2, '{"type": "after"}')])
+
+    def test_frames_with_newlines_and_bad_frames(self):
+        """Test multi-line frames arrive intact and a failing frame does not stop delivery"""
+        async def scenario():
+            received = []
+
+            async def on_message(frame, seq):
+                if frame == "boom":
+                    raise ValueError("bad frame")
+                received.append((seq, frame))
+
+            bus = UnixSocketBus(self.path)
+            await bus.start(on_message)
+            await bus.publish('{\n  "type": "pretty"\n}')
+            await bus.publish("boom")
+            await bus.publish('{"type": "after"}')
+            await asyncio.sleep(0.1)
+            await bus.close()
+            return received
+
+        received = asyncio.run(scenario())
+        self.assertEqual(received, [(1, '{\n  "type": "pretty"\n}'), (3, '{"type": "after"}')])
+
+    def test_oversized_frame_skipped(self):
+        """Test a frame over the limit is dropped and the stream stays usable"""
+        async def scenario():
+            received = []
+
+            async def on_message(frame, seq):
+                received.append((seq, frame))
+
+            bus = UnixSocketBus(self.path)
+            await bus.start(on_message)
+            # Bypass publish()'s own check to exercise the hub's
+            big = b"x" * (bus_module.BUS_FRAME_LIMIT + 1)
+            bus.writer.write(bus_module.PUBLISH_HEADER.pack(len(big), True) + big)
+            await bus.publish('{"type": "after"}')
+            await asyncio.sleep(0.2)
+            await bus.close()
+            return received
+
+        self.assertEqual(asyncio.run(scenario()), [(1, '{"type": "after"}')])
+
+    def test_unsequenced_frames_keep_numbering(self):
+        """Test frames published with sequenced=False reach everyone without using a number"""
+        async def scenario():
+            received = {0: [], 1: []}
+            buses = []
+            for index in received:
+                async def on_message(frame, seq, index=index):
+                    received[index].append((seq, frame))
+                bus = UnixSocketBus(self.path)
+                await bus.start(on_message)
+                buses.append(bus)
+
+            await buses[0].publish('{"type": "a"}')
+            await buses[1].publish('{"type": "presence"}', sequenced=False)
+            await asyncio.sleep(0.05)
+            await buses[0].publish('{"type": "b"}')
+            await asyncio.sleep(0.1)
+            last_seqs = [bus.last_seq for bus in buses]
+            for bus in buses:
+                await bus.close()
+            return received, last_seqs
+
+        received, last_seqs = asyncio.run(scenario())
+        expected = [(1, '{"type": "a"}'), (None, '{"type": "presence"}'), (2, '{"type": "b"}')]
+        self.assertEqual(received[0], expected)
+        self.assertEqual(received[1], expected)
+        self.assertEqual(last_seqs, [2, 2])
+
+    def test_no_hub_publishes_unsequenced(self):
+        """Test an event published without a hub is delivered locally with no seq"""
+        async def scenario():
+            received = []
+
+            async def on_message(frame, seq):
+                received.append((seq, frame))
+
+            bus = UnixSocketBus(self.path)
+            await bus.start(on_message, last_seq=7)
+            bus.writer.close()
+            bus.writer = None
+            await bus.publish('{"type": "x"}')
+            last_seq = bus.last_seq
+            await bus.close()
+            return received, last_seq
+
+        received, last_seq = asyncio.run(scenario())
+        self.assertEqual(received, [(None, '{"type": "x"}')])
+        self.assertEqual(last_seq, 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+"""
+Unit Tests for the WebSocket Event Log
+======================================
+Tests sequence stamping, the replay ring buffer and the append-only spill file
+"""
+
+import unittest
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from websocket.event_log import EventLog, with_seq
+from websocket import websocket_server as server
+from tests.websocket_fakes import FakeSocket
+
+
+class TestWithSeq(unittest.TestCase):
+    """Test cases for stamping serialized frames"""
+
+    def test_stamps_object(self):
+        """Test seq is added to an existing object"""
+        frame = with_seq('{"type": "x", "payload": {}}', 7)
+        self.assertEqual(json.loads(frame), {"seq": 7, "type": "x", "payload": {}})
+
+    def test_stamps_empty_object(self):
+        """Test an empty object stays valid JSON"""
+        self.assertEqual(json.loads(with_seq("{}", 1)), {"seq": 1})
+
+
+class TestEventLog(unittest.TestCase):
+    """Test cases for the replay buffer"""
+
+    def make_log(self, capacity=10):
+        log = EventLog(capacity=capacity, path="")
+        log.append(1, ["user:1"], '{"seq": 1}')
+        log.append(2, None, '{"seq": 2}')
+        log.append(3, ["user:2"], '{"seq": 3}')
+        return log
+
+    def test_since_filters_by_topic(self):
+        """Test replay only includes missed events the client may see"""
+        log = self.make_log()
+        self.assertEqual(log.since(0, {"all", "user:1"}), ['{"seq": 1}', '{"seq": 2}'])
+        self.assertEqual(log.since(2, {"all", "user:2"}), ['{"seq": 3}'])
+
+    def test_can_replay(self):
+        """Test a gap older than the buffer requires a resync"""
+        log = EventLog(capacity=2, path="")
+        for seq in (1, 2, 3):
+            log.append(seq, None, "{}")
+        self.assertTrue(log.can_replay(2))
+        self.assertTrue(log.can_replay(1))
+        self.assertFalse(log.can_replay(0))
+
+    def test_cannot_replay_unknown_numbers(self):
+        """Test a last_seq beyond the log or from another epoch requires a resync"""
+        log = self.make_log()
+        log.set_epoch("a")
+        self.assertTrue(log.can_replay(3, "a"))
+        self.assertFalse(log.can_replay(500, "a"))
+        self.assertFalse(log.can_replay(1, "b"))
+        self.assertFalse(EventLog(capacity=5, path="").can_replay(500))
+
+    def test_new_epoch_drops_events(self):
+        """Test adopting another epoch starts numbering over"""
+        log = self.make_log()
+        log.set_epoch("a")
+        self.assertEqual(log.last_seq, 3)
+        log.set_epoch("b")
+        self.assertEqual((log.last_seq, log.since(0, {"all"})), (0, []))
+
+    def test_spill_file_reloads(self):
+        """Test numbering and the buffer survive a restart via the file"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "events.log")
+            log = EventLog(capacity=10, path=path)
+            log.append(1, ["user:1"], '{"seq": 1, "topics": ["user:1"]}')
+            log.append(2, None, '{"seq": 2}')
+            log.close()
+
+            reloaded = EventLog(capacity=10, path=path)
+            self.assertEqual(reloaded.last_seq, 2)
+            self.assertEqual(reloaded.since(0, {"user:1"}), ['{"seq": 1, "topics": ["user:1"]}', '{"seq": 2}'])
+            reloaded.close()
+
+    def test_spill_file_keeps_epoch(self):
+        """Test the epoch is restored and only owners write the file"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "events.log")
+            log = EventLog(capacity=10, path=path)
+            log.set_epoch("a")
+            log.append(1, None, '{"seq": 1}')
+            log.append(2, None, '{"seq": 2}', persist=False)
+            log.close()
+
+            reloaded = EventLog(capacity=10, path=path)
+            self.assertEqual((reloaded.epoch, reloaded.last_seq), ("a", 1))
+            reloaded.close()
+
+    def test_spill_file_is_compacted(self):
+        """Test the file is cut back to the ring once it wraps twice over"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "events.log")
+            log = EventLog(capacity=3, path=path)
+            log.set_epoch("a")
+            for seq in range(1, 8):
+                log.append(seq, None, f'{{"seq": {seq}}}')
+            log.close()
+            with open(path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            self.assertEqual(lines, ["epoch\ta", '4\t{"seq": 4}', '5\t{"seq": 5}', '6\t{"seq": 6}', '7\t{"seq": 7}'])
+
+            reloaded = EventLog(capacity=3, path=path)
+            self.assertEqual((reloaded.epoch, reloaded.first_seq, reloaded.last_seq), ("a", 5, 7))
+            reloaded.close()
+
+
+class TestReplayOnReconnect(unittest.TestCase):
+    """Test cases for the server replaying missed events"""
+
+    def setUp(self):
+        server.connected_clients.clear()
+        server.topic_subscribers.clear()
+        server.client_topics.clear()
+        server.event_log = EventLog(capacity=5, path="")
+        for seq in (1, 2, 3):
+            message = {"type": "reservation_approved", "payload": {"n": seq}, "topics": ["user:5"]}
+            asyncio.run(server.publish(message, json.dumps(message), seq))
+
+    def reconnect(self, last_seq, epoch=None):
+        client = server.ClientConnection(FakeSocket())
+        server.subscribe(client, [server.BROADCAST_TOPIC, "user:5"])
+        server.replay(client, last_seq, epoch)
+        return [json.loads(frame) for _, frame in client.queue]
+
+    def test_published_events_carry_seq(self):
+        """Test sequenced publishes are stamped and logged"""
+        self.assertEqual(server.event_log.last_seq, 3)
+
+    def test_replays_only_missed_events(self):
+        """Test a client that saw seq 1 gets 2 and 3"""
+        frames = self.reconnect(1)
+        self.assertEqual([f["seq"] for f in frames], [2, 3])
+
+    def test_up_to_date_client_gets_nothing(self):
+        """Test a client that saw everything gets no replay"""
+        self.assertEqual(self.reconnect(3), [])
+
+    def test_resync_when_too_far_behind(self):
+        """Test a gap larger than the buffer asks for a full reload"""
+        for seq in range(4, 10):
+            asyncio.run(server.publish({"type": "x", "payload": {}}, None, seq))
+        frames = self.reconnect(1)
+        self.assertEqual(frames[0]["type"], "resync_required")
+
+    def test_resync_after_restart(self):
+        """Test a client ahead of the log (server restarted) is told to reload"""
+        frames = self.reconnect(500)
+        self.assertEqual(frames, [{"type": "resync_required", "payload": {"last_seq": 3, "epoch": None}}])
+
+    def test_resync_for_another_epoch(self):
+        """Test numbers from another epoch are never replayed"""
+        frames = self.reconnect(1, epoch="old")
+        self.assertEqual([f["type"] for f in frames], ["resync_required"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+"""
+Unit Tests for Streaming Exports
+================================
+Tests Database.stream error handling and ExportModel results (without database dependency)
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import time
+from decimal import Decimal
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mysql.connector import Error
+
+import data.export as export
+from data.database import Database
+from data.export import ExportModel
+
+
+class FakeCursor:
+    """Server-side cursor that fails after `fail_after` batches"""
+
+    def __init__(self, batches, fail_after=None):
+        self.batches = list(batches)
+        self.fail_after = fail_after
+        self.fetched = 0
+        self.closed = False
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchmany(self, size):
+        if self.fail_after is not None and self.fetched >= self.fail_after:
+            raise Error(msg="Lost connection to MySQL server during query")
+        self.fetched += 1
+        return self.batches.pop(0) if self.batches else []
+
+    def __iter__(self):
+        raise AssertionError("an abandoned stream must not drain the cursor")
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.closed = False
+        self.disconnected = False
+
+    def cursor(self, **kwargs):
+        return self._cursor
+
+    def disconnect(self):
+        self.disconnected = True
+
+    def close(self):
+        self.closed = True
+
+
+def make_database(cursor):
+    database = Database.__new__(Database)
+    connection = FakeConnection(cursor)
+    database._get_connection = lambda: connection
+    return database, connection
+
+
+class TestDatabaseStream(unittest.TestCase):
+    """Test cases for Database.stream"""
+
+    def test_yields_batches(self):
+        """All batches are yielded, then the connection is returned"""
+        cursor = FakeCursor([[{"id": 1}, {"id": 2}], [{"id": 3}]])
+        database, connection = make_database(cursor)
+        batches = list(database.stream("SELECT id FROM reservations"))
+        self.assertEqual([len(b) for b in batches], [2, 1])
+        self.assertTrue(cursor.closed and connection.closed)
+        self.assertFalse(connection.disconnected)
+
+    def test_error_mid_stream_is_raised(self):
+        """A failure after some batches raises instead of ending quietly"""
+        cursor = FakeCursor([[{"id": 1}], [{"id": 2}]], fail_after=1)
+        database, connection = make_database(cursor)
+        batches = database.stream("SELECT id FROM reservations")
+        self.assertEqual(next(batches), [{"id": 1}])
+        with self.assertRaises(Error):
+            next(batches)
+        self.assertTrue(connection.disconnected and connection.closed)
+
+    def test_abandoned_stream_disconnects(self):
+        """Closing the generator early drops the connection without draining"""
+        cursor = FakeCursor([[{"id": 1}], [{"id": 2}], [{"id": 3}]])
+        database, connection = make_database(cursor)
+        batches = database.stream("SELECT id FROM reservations")
+        next(batches)
+        batches.close()
+        self.assertEqual(cursor.fetched, 1)
+        self.assertTrue(connection.disconnected and connection.closed)
+
+    def test_no_connection_is_raised(self):
+        """No pooled connection is an error, not an empty result"""
+        database = Database.__new__(Database)
+        database._get_connection = lambda: None
+        with self.assertRaises(Error):
+            list(database.stream("SELECT id FROM reservations"))
+
+
+class TestExport(unittest.TestCase):
+    """Test cases for ExportModel results"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.saved = (export.EXPORTS_DIR, export.db.stream)
+        export.EXPORTS_DIR = self.directory
+
+    def tearDown(self):
+        export.EXPORTS_DIR, export.db.stream = self.saved
+        shutil.rmtree(self.directory)
+
+    def test_export_writes_all_rows(self):
+        """A complete stream is reported with its row count"""
+        export.db.stream = lambda query, params, batch_size: iter([[{"id": 1}, {"id": 2}], [{"id": 3}]])
+        success, path, count = ExportModel.export_reservations()
+        self.assertTrue(success)
+        self.assertEqual(count, 3)
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(f.read().split(), ["id", "1", "2", "3"])
+        url = export.download_url(path)
+        self.assertTrue(url.startswith(export.EXPORTS_URL + "/"))
+        self.assertTrue(url.endswith("/" + os.path.basename(path)))
+
+    def test_failed_stream_is_not_a_success(self):
+        """A stream failing part-way reports failure and leaves no partial file"""
+        def stream(query, params, batch_size):
+            yield [{"id": 1}, {"id": 2}]
+            raise Error(msg="Lost connection to MySQL server during query")
+
+        export.db.stream = stream
+        success, message, count = ExportModel.export_reservations()
+        self.assertFalse(success)
+        self.assertIn("Lost connection", message)
+        self.assertEqual(count, 0)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_failed_write_closes_the_stream(self):
+        """A writer error closes the stream instead of leaving it open"""
+        closed = []
+
+        def stream(query, params, batch_size):
+            try:
+                yield [{"id": 1}]
+                yield [{"id": 2, "extra": "column"}]
+                yield [{"id": 3}]
+            finally:
+                closed.append(True)
+
+        export.db.stream = stream
+        success, message, count = ExportModel.export_reservations()
+        self.assertFalse(success)
+        self.assertEqual(closed, [True])
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_decimals_are_floats(self):
+        """DECIMAL aggregates are written as floats"""
+        self.assertEqual(export._normalize_value(Decimal("1.5000")), 1.5)
+        self.assertIsInstance(export._normalize_value(Decimal("2")), float)
+
+    def test_old_exports_are_purged(self):
+        """Export directories past the retention period are deleted"""
+        old = os.path.join(self.directory, "old")
+        new = os.path.join(self.directory, "new")
+        os.makedirs(old)
+        os.makedirs(new)
+        stale = time.time() - export.EXPORT_RETENTION_SECONDS - 60
+        os.utime(old, (stale, stale))
+        self.assertEqual(export.purge_old_exports(), 1)
+        self.assertEqual(os.listdir(self.directory), ["new"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Unit Tests for Demand Forecasting
+=================================
+Tests the seasonal exponential smoothing model (without database dependency)
+"""
+
+import unittest
+import sys
+import os
+from datetime import date, timedelta
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.forecast import SeasonalDemandModel
+
+
+class TestHoursVector(unittest.TestCase):
+    """Test cases for converting a reservation into occupied hour slots"""
+
+    def test_two_hour_reservation(self):
+        """Test 09:00-11:00 occupies the 9 and 10 o'clock slots"""
+        vec = SeasonalDemandModel.hours_vector(9, 10)
+        self.assertEqual(vec.sum(), 2)
+        self.assertEqual(vec[9], 1)
+        self.assertEqual(vec[10], 1)
+        self.assertEqual(vec[11], 0)
+
+    def test_single_hour(self):
+        """Test a reservation inside one hour"""
+        vec = SeasonalDemandModel.hours_vector(14, 14)
+        self.assertEqual(vec.sum(), 1)
+
+
+class TestSeasonalDemandModel(unittest.TestCase):
+    """Test cases for fitting and predicting room demand"""
+
+    MONDAY = date(2025, 12, 1)
+
+    def test_first_observation_seeds_level(self):
+        """Test the first observation of a slot becomes its level"""
+        model = SeasonalDemandModel(alpha=0.5)
+        model.update_day(self.MONDAY, {1: SeasonalDemandModel.hours_vector(8, 9)})
+        self.assertEqual(model.levels[0, 0, 8], 1)
+        self.assertEqual(model.levels[0, 0, 12], 0)
+
+    def test_smoothing_across_weeks(self):
+        """Test later weeks are blended with the smoothing factor"""
+        model = SeasonalDemandModel(alpha=0.5)
+        model.update_day(self.MONDAY, {1: SeasonalDemandModel.hours_vector(8, 8)})
+        model.update_day(self.MONDAY + timedelta(days=7), {})
+        self.assertAlmostEqual(model.levels[0, 0, 8], 0.5)
+
+    def test_weekdays_are_independent(self):
+        """Test a Tuesday observation does not affect Monday's forecast"""
+        model = SeasonalDemandModel(alpha=0.5)
+        model.update_day(self.MONDAY, {1: SeasonalDemandModel.hours_vector(8, 8)})
+        model.update_day(self.MONDAY + timedelta(days=1), {1: SeasonalDemandModel.hours_vector(15, 15)})
+        self.assertEqual(model.levels[0, 0, 8], 1)
+        self.assertEqual(model.levels[0, 0, 15], 0)
+        self.assertEqual(model.levels[0, 1, 15], 1)
+
+    def test_old_days_are_ignored(self):
+        """Test incremental updates skip days already folded in"""
+        model = SeasonalDemandModel(alpha=0.5)
+        model.update_day(self.MONDAY, {1: SeasonalDemandModel.hours_vector(8, 8)})
+        model.update_day(self.MONDAY, {1: SeasonalDemandModel.hours_vector(8, 8)})
+        self.assertEqual(model.seen[0, 0], 1)
+
+    def test_predict_shape(self):
+        """Test prediction covers every room, day and hour"""
+        model = SeasonalDemandModel()
+        model.add_room(1)
+        model.add_room(2)
+        prediction = model.predict(self.MONDAY, 14)
+        self.assertEqual(prediction.shape, (2, 14, 24))
+
+    def test_summary_peak_slot(self):
+        """Test the summary reports the busiest predicted slot and sorts rooms"""
+        model = SeasonalDemandModel()
+        model.update_day(self.MONDAY, {
+            1: SeasonalDemandModel.hours_vector(10, 10),
+            2: SeasonalDemandModel.hours_vector(8, 11),
+        })
+        summary = model.summarize(self.MONDAY, weeks=2)
+        self.assertEqual(summary[0]['room_id'], 2)
+        self.assertEqual(summary[0]['weekly_hours'], [4.0, 4.0])
+        self.assertEqual(summary[1]['peak_day'], "Monday")
+        self.assertEqual(summary[1]['peak_hour'], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Unit Tests for Keyset Paging
+============================
+Tests the cursor conditions and page splitting used by the paged lists,
+and the upcoming/past rule used to place edited reservations
+(without database dependency)
+"""
+
+import unittest
+import sys
+import os
+from datetime import date, datetime, timedelta
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.models import keyset_condition, keyset_page, reservation_is_past
+
+
+class TestKeysetCondition(unittest.TestCase):
+    """Test cases for the "rows after the cursor" condition"""
+
+    def test_single_column(self):
+        """One unique column is a plain comparison"""
+        self.assertEqual(keyset_condition(("id",), (7,)), ("id < %s", [7]))
+
+    def test_two_columns(self):
+        """Ties on the first column are broken by the second"""
+        condition, params = keyset_condition(("r.created_at", "r.id"), ("2025-01-01", 9))
+        self.assertEqual(condition, "(r.created_at < %s OR (r.created_at = %s AND r.id < %s))")
+        self.assertEqual(params, ["2025-01-01", "2025-01-01", 9])
+
+    def test_three_columns(self):
+        """Each further column nests one more tie-break"""
+        cursor = (date(2025, 3, 1), timedelta(hours=9), 4)
+        condition, params = keyset_condition(("d", "s", "id"), cursor)
+        self.assertEqual(condition, "(d < %s OR (d = %s AND (s < %s OR (s = %s AND id < %s))))")
+        self.assertEqual(params, [cursor[0], cursor[0], cursor[1], cursor[1], 4])
+
+
+class TestKeysetPage(unittest.TestCase):
+    """Test cases for splitting a LIMIT n + 1 fetch"""
+
+    rows = [{"created_at": n, "id": 100 + n} for n in (5, 4, 3)]
+
+    def test_more_rows(self):
+        """An extra row means another page, starting after the last item"""
+        result = keyset_page(self.rows, 2, ("created_at", "id"))
+        self.assertEqual(result["items"], self.rows[:2])
+        self.assertEqual(result["next"], (4, 104))
+
+    def test_last_page(self):
+        """No extra row means no next cursor"""
+        result = keyset_page(self.rows, 3, ("created_at", "id"))
+        self.assertEqual(len(result["items"]), 3)
+        self.assertIsNone(result["next"])
+
+    def test_no_rows(self):
+        """A failed or empty fetch is an empty last page"""
+        self.assertEqual(keyset_page(None, 20, ("id",)), {"items": [], "next": None})
+
+
+class TestReservationIsPast(unittest.TestCase):
+    """Test cases for the upcoming/past split"""
+
+    now = datetime(2025, 3, 10, 14, 30, 15, 500)
+
+    def test_earlier_and_later_dates(self):
+        """Any earlier date is past, any later date upcoming"""
+        self.assertTrue(reservation_is_past({"reservation_date": date(2025, 3, 9), "end_time": timedelta(hours=23)}, self.now))
+        self.assertFalse(reservation_is_past({"reservation_date": date(2025, 3, 11), "end_time": timedelta(hours=1)}, self.now))
+
+    def test_today_by_end_time(self):
+        """Today is past once the end time has gone by"""
+        res = {"reservation_date": date(2025, 3, 10), "end_time": timedelta(hours=14)}
+        self.assertTrue(reservation_is_past(res, self.now))
+        res["end_time"] = timedelta(hours=15)
+        self.assertFalse(reservation_is_past(res, self.now))
+
+    def test_string_values(self):
+        """Dates and times given as strings are parsed"""
+        self.assertTrue(reservation_is_past({"reservation_date": "2025-03-10", "end_time": "14:00"}, self.now))
+        self.assertFalse(reservation_is_past({"reservation_date": "2025-03-10", "end_time": "14:30:15"}, self.now))
+
+
+if __name__ == '__main__':
+    unittest.main()
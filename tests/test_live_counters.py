@@ -0,0 +1,153 @@
+"""
+Unit Tests for Live Analytics Counters
+======================================
+Tests the incremental reservation counters (without database dependency)
+"""
+
+import unittest
+import sys
+import os
+from datetime import date, timedelta
+from unittest.mock import patch
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data import analytics, models
+from data.analytics import LiveReservationCounters, ApprovalLatencyTracker
+
+
+def make_counters():
+    counters = LiveReservationCounters()
+    counters.load([
+        {'status': 'pending', 'count': 3, 'today': 2},
+        {'status': 'approved', 'count': 5, 'today': 0},
+        {'status': 'cancelled', 'count': 1, 'today': 1},
+    ])
+    return counters
+
+
+class TestLiveReservationCounters(unittest.TestCase):
+    """Test cases for seeding and incrementally updating counters"""
+
+    def test_seed_snapshot(self):
+        """Test the seed rows produce dashboard totals"""
+        snapshot = make_counters().snapshot()
+        self.assertEqual(snapshot['total'], 9)
+        self.assertEqual(snapshot['pending'], 3)
+        self.assertEqual(snapshot['approved'], 5)
+        self.assertEqual(snapshot['rejected'], 0)
+        self.assertEqual(snapshot['today_bookings'], 3)
+
+    def test_record_created(self):
+        """Test a new reservation increments pending, total and today"""
+        counters = make_counters()
+        counters.record_created()
+        snapshot = counters.snapshot()
+        self.assertEqual(snapshot['pending'], 4)
+        self.assertEqual(snapshot['total'], 10)
+        self.assertEqual(snapshot['today_bookings'], 4)
+
+    def test_record_transition(self):
+        """Test approving moves one reservation out of the pending queue"""
+        counters = make_counters()
+        counters.record_transition('pending', 'approved')
+        snapshot = counters.snapshot()
+        self.assertEqual(snapshot['pending'], 2)
+        self.assertEqual(snapshot['approved'], 6)
+        self.assertEqual(snapshot['total'], 9)
+
+    def test_bulk_transition(self):
+        """Test a status sweep moves its affected row count at once"""
+        counters = make_counters()
+        counters.record_transition('approved', 'done', 4)
+        counters.record_transition('approved', 'ongoing', 0)
+        snapshot = counters.snapshot()
+        self.assertEqual(snapshot['approved'], 1)
+        self.assertEqual(counters.by_status['done'], 4)
+        self.assertNotIn('ongoing', counters.by_status)
+        self.assertEqual(snapshot['total'], 9)
+
+    def test_transition_never_negative(self):
+        """Test a transition from an empty status does not go below zero"""
+        counters = make_counters()
+        counters.record_transition('rejected', 'pending')
+        self.assertEqual(counters.snapshot()['rejected'], 0)
+
+    def test_updates_skipped_until_loaded(self):
+        """Test writes before seeding are left to the seed query"""
+        counters = LiveReservationCounters()
+        counters.record_created()
+        counters.record_transition('pending', 'approved')
+        self.assertEqual(counters.by_status, {})
+
+    def test_today_rolls_over(self):
+        """Test today's bookings reset when the date changes"""
+        counters = make_counters()
+        counters.today = date.today() - timedelta(days=1)
+        self.assertEqual(counters.snapshot()['today_bookings'], 0)
+
+    def test_invalidate(self):
+        """Test invalidate() forces a re-seed"""
+        counters = make_counters()
+        counters.invalidate()
+        self.assertFalse(counters.loaded)
+
+
+class FakeDecisionDatabase:
+    """Returns one pending reservation and a fixed UPDATE row count"""
+
+    def __init__(self, changed):
+        self.changed = changed
+
+    def connect(self):
+        pass
+
+    def disconnect(self):
+        pass
+
+    def fetch_one(self, query, params=None):
+        return {'user_id': 5, 'classroom_id': 3, 'status': 'pending', 'room_name': 'Room 301', 'wait_seconds': 7200}
+
+    def execute_update(self, query, params=None):
+        return self.changed
+
+
+class TestReservationDecisions(unittest.TestCase):
+    """Test cases for approve/reject moving the live counters"""
+
+    def decide(self, method, changed):
+        counters = make_counters()
+        latency = ApprovalLatencyTracker()
+        latency.loaded = True
+        with patch.object(models, "db", FakeDecisionDatabase(changed)), \
+                patch.object(models, "REALTIME_ENABLED", False), \
+                patch.object(models, "publish_live_counters"), \
+                patch.object(analytics, "live_counters", counters), \
+                patch.object(analytics, "approval_latency", latency), \
+                patch.object(models.NotificationModel, "notify_reservation_approved") as approved, \
+                patch.object(models.NotificationModel, "notify_reservation_rejected") as rejected:
+            result = getattr(models.ReservationModel, method)(42, admin_id=1)
+        return result, counters.snapshot(), approved.called or rejected.called, latency
+
+    def test_decision_moves_counters(self):
+        """Test a pending -> approved update moves one reservation"""
+        result, by_status, notified, latency = self.decide("approve_reservation", 1)
+        self.assertTrue(result)
+        self.assertEqual((by_status['pending'], by_status['approved']), (2, 6))
+        self.assertTrue(notified)
+        self.assertEqual(latency.overall.count, 1)
+
+    def test_no_change_no_side_effects(self):
+        """Test an update that changed nothing (already decided, or failed) counts nothing"""
+        for method in ("approve_reservation", "reject_reservation"):
+            for changed in (0, None):
+                result, by_status, notified, latency = self.decide(method, changed)
+                self.assertFalse(result)
+                self.assertEqual((by_status['pending'], by_status['approved']), (3, 5))
+                self.assertFalse(notified)
+                self.assertEqual(latency.overall.count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
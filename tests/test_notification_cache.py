@@ -0,0 +1,124 @@
+"""
+Unit Tests for Notification Cache
+=================================
+Tests the in-memory unread counters and recent buffers (without database dependency)
+"""
+
+import unittest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.notification_cache import NotificationCache
+
+
+def make_notification(notification_id, is_read=False):
+    return {'id': notification_id, 'message': f"Notification {notification_id}", 'is_read': is_read}
+
+
+class TestNotificationCache(unittest.TestCase):
+    """Test cases for seeding, updating and evicting cached users"""
+
+    def setUp(self):
+        self.cache = NotificationCache(max_users=2, recent_limit=3)
+        self.cache.seed(1, 1, [make_notification(2), make_notification(1, is_read=True)])
+
+    def test_miss_returns_none(self):
+        """Test an unseeded user must be loaded by the caller"""
+        self.assertIsNone(self.cache.get(99))
+
+    def test_add_increments_unread(self):
+        """Test a new notification is counted and listed first"""
+        self.cache.add(1, make_notification(3))
+        unread, recent = self.cache.get(1)
+        self.assertEqual(unread, 2)
+        self.assertEqual([n['id'] for n in recent], [3, 2, 1])
+
+    def test_ring_buffer_is_bounded(self):
+        """Test the recent buffer keeps only the newest entries"""
+        for notification_id in range(3, 7):
+            self.cache.add(1, make_notification(notification_id))
+        _, recent = self.cache.get(1)
+        self.assertEqual([n['id'] for n in recent], [6, 5, 4])
+
+    def test_coalesced_notification_replaces_entry(self):
+        """Test re-adding a coalesced notification moves it up without recounting"""
+        self.cache.add(1, make_notification(3))
+        coalesced = make_notification(2)
+        coalesced['message'] = "2 new reservations for CS Lab"
+        self.cache.add(1, coalesced)
+        unread, recent = self.cache.get(1)
+        self.assertEqual(unread, 2)
+        self.assertEqual([n['id'] for n in recent], [2, 3, 1])
+        self.assertEqual(recent[0]['message'], "2 new reservations for CS Lab")
+
+    def test_coalesced_notification_outside_buffer(self):
+        """Test a merge into a row that left the buffer does not recount it"""
+        for notification_id in range(3, 6):
+            self.cache.add(1, make_notification(notification_id))
+        coalesced = make_notification(2)
+        coalesced['group_count'] = 2
+        self.cache.add(1, coalesced)
+        unread, recent = self.cache.get(1)
+        self.assertEqual(unread, 4)
+        self.assertEqual([n['id'] for n in recent], [2, 5, 4])
+
+    def test_add_for_uncached_user_is_ignored(self):
+        """Test writes for users not in memory wait for the next seed"""
+        self.cache.add(5, make_notification(10))
+        self.assertIsNone(self.cache.get(5))
+
+    def test_mark_read(self):
+        """Test marking a buffered notification read decrements once"""
+        self.assertTrue(self.cache.mark_read(2))
+        self.assertTrue(self.cache.mark_read(2))
+        unread, recent = self.cache.get(1)
+        self.assertEqual(unread, 0)
+        self.assertTrue(recent[0]['is_read'])
+
+    def test_mark_read_unknown(self):
+        """Test an unbuffered notification asks the caller to invalidate"""
+        self.assertFalse(self.cache.mark_read(42))
+
+    def test_mark_all_read(self):
+        """Test mark all read zeroes the counter"""
+        self.cache.add(1, make_notification(3))
+        self.cache.mark_all_read(1, 3)
+        unread, recent = self.cache.get(1)
+        self.assertEqual(unread, 0)
+        self.assertTrue(all(n['is_read'] for n in recent))
+
+    def test_mark_all_read_keeps_newer(self):
+        """Test a notification newer than the displayed ones stays unread"""
+        self.cache.add(1, make_notification(3))
+        self.cache.mark_all_read(1, 2)
+        unread, recent = self.cache.get(1)
+        self.assertEqual(unread, 1)
+        self.assertEqual([n['id'] for n in recent if not n['is_read']], [3])
+
+    def test_lru_eviction(self):
+        """Test the least recently used user is evicted first"""
+        self.cache.seed(2, 0, [])
+        self.cache.get(1)
+        self.cache.seed(3, 0, [])
+        self.assertIsNone(self.cache.get(2))
+        self.assertIsNotNone(self.cache.get(1))
+
+    def test_ttl_expiry(self):
+        """Test expired entries are treated as misses"""
+        cache = NotificationCache(ttl_seconds=-1)
+        cache.seed(1, 0, [])
+        self.assertIsNone(cache.get(1))
+
+    def test_returned_lists_are_copies(self):
+        """Test callers cannot mutate the cached buffer"""
+        _, recent = self.cache.get(1)
+        recent[0]['is_read'] = True
+        unread, recent = self.cache.get(1)
+        self.assertFalse(recent[0]['is_read'])
+
+
+if __name__ == "__main__":
+    unittest.main()
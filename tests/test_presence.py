@@ -0,0 +1,148 @@
+"""
+Unit Tests for Presence and Slot Holds
+======================================
+Tests the expiring viewer/hold maps and the presence_update push
+"""
+
+import unittest
+import asyncio
+import json
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from websocket.presence import PresenceTracker
+from websocket.event_log import EventLog
+from websocket import websocket_server as server
+from utils import security
+from tests.websocket_fakes import FakeSocket
+
+KEY = (3, "2026-10-20")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def report(action, viewer, **extra):
+    payload = {"action": action, "classroom_id": KEY[0], "date": KEY[1],
+               "viewer_id": viewer, "user_id": viewer, "name": f"User {viewer}"}
+    payload.update(extra)
+    return payload
+
+
+class TestPresenceTracker(unittest.TestCase):
+    """Test cases for the expiring maps"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.tracker = PresenceTracker(presence_ttl=30, hold_ttl=120, clock=self.clock)
+
+    def test_viewers_and_holds_in_snapshot(self):
+        self.tracker.apply(report("view", "a"))
+        self.tracker.apply(report("hold", "b", start_time="10:00", end_time="11:00"))
+        snapshot = self.tracker.snapshot(KEY)
+        self.assertEqual({v["viewer_id"] for v in snapshot["viewers"]}, {"a", "b"})
+        self.assertEqual(snapshot["holds"][0]["start_time"], "10:00")
+
+    def test_hold_moves_instead_of_stacking(self):
+        """Test a viewer has at most one hold per room/date"""
+        self.tracker.apply(report("hold", "a", start_time="08:00", end_time="09:00"))
+        self.tracker.apply(report("hold", "a", start_time="10:00", end_time="11:00"))
+        holds = self.tracker.snapshot(KEY)["holds"]
+        self.assertEqual([(h["start_time"], h["end_time"]) for h in holds], [("10:00", "11:00")])
+
+    def test_leave_drops_everything(self):
+        self.tracker.apply(report("hold", "a", start_time="10:00", end_time="11:00"))
+        self.tracker.apply(report("leave", "a"))
+        self.assertEqual(self.tracker.snapshot(KEY), {"classroom_id": 3, "date": KEY[1], "viewers": [], "holds": []})
+        self.assertEqual(self.tracker.viewers, {})
+
+    def test_entries_expire(self):
+        """Test silent viewers lapse after the TTL and holds after theirs"""
+        self.tracker.apply(report("hold", "a", start_time="10:00", end_time="11:00"))
+        self.clock.now = 31
+        self.assertEqual(self.tracker.expire(), {KEY})
+        snapshot = self.tracker.snapshot(KEY)
+        self.assertEqual(snapshot["viewers"], [])
+        self.assertEqual(len(snapshot["holds"]), 1)
+        self.clock.now = 121
+        self.tracker.expire()
+        self.assertEqual(self.tracker.snapshot(KEY)["holds"], [])
+
+    def test_renewal_keeps_entry(self):
+        self.tracker.apply(report("view", "a"))
+        self.clock.now = 20
+        self.tracker.apply(report("view", "a"))
+        self.clock.now = 40
+        self.assertEqual(self.tracker.expire(), set())
+
+
+class TestPresencePush(unittest.TestCase):
+    """Test cases for the server side"""
+
+    def setUp(self):
+        server.connected_clients.clear()
+        server.topic_subscribers.clear()
+        server.client_topics.clear()
+        server.event_log = EventLog(capacity=10, path="")
+        server.presence = PresenceTracker()
+
+    def test_presence_pushed_to_classroom_viewers(self):
+        """Test a report becomes a snapshot on the classroom topic, not a logged event"""
+        viewer = server.ClientConnection(FakeSocket())
+        elsewhere = server.ClientConnection(FakeSocket())
+        server.subscribe(viewer, [server.BROADCAST_TOPIC, "classroom:3"])
+        server.subscribe(elsewhere, [server.BROADCAST_TOPIC, "classroom:4"])
+
+        message = {"type": "presence", "payload": report("view", "a"), "topics": ["classroom:3"]}
+        asyncio.run(server.publish(message, json.dumps(message), seq=1))
+
+        frames = [json.loads(frame) for _, frame in viewer.queue]
+        self.assertEqual(frames[0]["type"], "presence_update")
+        self.assertEqual(frames[0]["payload"]["viewers"][0]["viewer_id"], "a")
+        self.assertEqual(len(elsewhere.queue), 0)
+        self.assertEqual(server.event_log.since(0, {"classroom:3"}), [])
+
+
+class FakePage:
+    def __init__(self, session_id):
+        self.session_id = session_id
+
+
+class TestViewExit(unittest.TestCase):
+    """Test cases for releasing a view's holds when the session leaves it"""
+
+    def test_exit_runs_once(self):
+        """Test the registered callback runs on the next exit only"""
+        page = FakePage("session-1")
+        released = []
+        security.on_view_exit(page, lambda: released.append(True))
+        security.exit_view(page)
+        security.exit_view(page)
+        self.assertEqual(released, [True])
+
+    def test_sessions_are_separate(self):
+        """Test leaving a view in one session leaves other sessions' views alone"""
+        released = []
+        security.on_view_exit(FakePage("session-1"), lambda: released.append(1))
+        security.on_view_exit(FakePage("session-2"), lambda: released.append(2))
+        security.exit_view(FakePage("session-2"))
+        self.assertEqual(released, [2])
+        security.exit_view(FakePage("session-1"))
+        self.assertEqual(released, [2, 1])
+
+    def test_failing_callback_does_not_block_navigation(self):
+        """Test an error while releasing is reported, not raised"""
+        page = FakePage("session-3")
+        security.on_view_exit(page, lambda: 1 / 0)
+        security.exit_view(page)
+
+if __name__ == "__main__":
+    unittest.main()
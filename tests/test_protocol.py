@@ -0,0 +1,185 @@
+"""
+Unit Tests for the Realtime Wire Protocol
+=========================================
+Tests the binary encoding, batching, compression and mixed-format delivery
+"""
+
+import unittest
+import asyncio
+import json
+import os
+import sys
+import zlib
+from unittest.mock import patch
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from websocket import protocol
+from websocket import websocket_server as server
+from tests.websocket_fakes import FakeSocket
+from websocket.event_log import EventLog
+
+
+SAMPLE = {
+    "type": "reservation_approved",
+    "payload": {
+        "reservation_id": 42,
+        "user_id": 5,
+        "room_name": "Room 301",
+        "ratio": 0.25,
+        "flags": [True, False, None],
+    },
+    "topics": ["user:5"],
+    "origin": "abc123",
+}
+
+
+class TestBinaryEncoding(unittest.TestCase):
+    """Test cases for encode / decode"""
+
+    def test_round_trip(self):
+        """Test an event survives encoding unchanged"""
+        self.assertEqual(protocol.decode(protocol.encode(SAMPLE)), SAMPLE)
+
+    def test_seq_in_header(self):
+        """Test seq travels in the fixed header"""
+        decoded = protocol.decode(protocol.encode(SAMPLE, seq=17))
+        self.assertEqual(decoded["seq"], 17)
+
+    def test_unknown_type_keeps_name(self):
+        """Test types without a code are still delivered"""
+        message = {"type": "room_maintenance", "payload": {"room": 3}}
+        self.assertEqual(protocol.decode(protocol.encode(message)), message)
+
+    def test_smaller_than_json(self):
+        """Test the binary frame is more compact than the JSON frame"""
+        self.assertLess(len(protocol.encode(SAMPLE)), len(json.dumps(SAMPLE)))
+
+    def test_large_body_is_deflated(self):
+        """Test big payloads are compressed and still decode"""
+        message = {"type": "notification", "payload": {"message": "x" * 5000}}
+        frame = protocol.encode(message)
+        self.assertTrue(frame[1] & protocol.FLAG_DEFLATE)
+        self.assertLess(len(frame), 1000)
+        self.assertEqual(protocol.decode(frame), message)
+
+    def test_batch(self):
+        """Test a batch wraps already-encoded frames"""
+        frames = [protocol.encode(SAMPLE, seq=1), protocol.encode(SAMPLE, seq=2)]
+        decoded = protocol.decode(protocol.encode_batch(frames))
+        self.assertEqual(decoded["type"], "batch")
+        self.assertEqual([e["seq"] for e in decoded["events"]], [1, 2])
+
+    def test_rejects_other_versions(self):
+        """Test frames from a future protocol version are refused"""
+        frame = bytearray(protocol.encode(SAMPLE))
+        frame[0] = protocol.PROTOCOL_VERSION + 1
+        with self.assertRaises(ValueError):
+            protocol.decode(bytes(frame))
+
+    def test_malformed_frames_raise_value_error(self):
+        """Test truncated or garbage frames fail as ValueError only"""
+        frame = protocol.encode(SAMPLE)
+        deflated = protocol.HEADER.pack(protocol.PROTOCOL_VERSION, protocol.FLAG_DEFLATE, 5, 0) + b"not zlib"
+        not_a_map = protocol._frame(5, None, [1, 2])
+        for bad in (b"", frame[:3], frame[:-4], frame[:7] + b"Z", deflated, not_a_map):
+            with self.assertRaises(ValueError):
+                protocol.decode(bad)
+
+    def test_rejects_decompression_bomb(self):
+        """Test a small frame that inflates past the limit is refused"""
+        body = zlib.compress(b"s" + b"\0" * (protocol.MAX_DECODED + 1))
+        frame = protocol.HEADER.pack(protocol.PROTOCOL_VERSION, protocol.FLAG_DEFLATE, 5, 0) + body
+        self.assertLess(len(frame), 10000)
+        with self.assertRaises(ValueError):
+            protocol.decode(frame)
+
+    def test_batch_shares_the_limit(self):
+        """Test the inflate limit covers a batch as a whole"""
+        big = {"type": "notification", "payload": {"message": "x" * (protocol.MAX_DECODED // 3)}}
+        frame = protocol.encode_batch([protocol.encode(big)] * 4)
+        with self.assertRaises(ValueError):
+            protocol.decode(frame)
+
+
+class TestSubprotocolSelection(unittest.TestCase):
+    """Test cases for negotiation"""
+
+    def test_client_preference_wins(self):
+        self.assertEqual(
+            protocol.select_subprotocol(None, [protocol.BINARY_SUBPROTOCOL, protocol.JSON_SUBPROTOCOL]),
+            protocol.BINARY_SUBPROTOCOL,
+        )
+
+    def test_no_subprotocol_means_json(self):
+        """Test plain clients (and debugging tools) are still accepted"""
+        self.assertIsNone(protocol.select_subprotocol(None, []))
+
+
+class TestMixedDelivery(unittest.TestCase):
+    """Test cases for publishing to binary and JSON clients together"""
+
+    def setUp(self):
+        server.connected_clients.clear()
+        server.topic_subscribers.clear()
+        server.client_topics.clear()
+        server.batching_clients.clear()
+        server.event_log = EventLog(capacity=10, path="")
+
+    def connect(self, subprotocol=None):
+        client = server.ClientConnection(FakeSocket(subprotocol=subprotocol))
+        server.subscribe(client, [server.BROADCAST_TOPIC, "user:5"])
+        return client
+
+    def test_each_format_encoded_once_and_shared(self):
+        """Test recipients of the same format share one frame"""
+        binary = [self.connect(protocol.BINARY_SUBPROTOCOL) for _ in range(2)]
+        text = self.connect()
+        asyncio.run(server.publish(dict(SAMPLE), None, 3))
+
+        frame_a, frame_b = binary[0].queue[0][1], binary[1].queue[0][1]
+        self.assertIs(frame_a, frame_b)
+        self.assertEqual(protocol.decode(frame_a)["seq"], 3)
+        self.assertEqual(json.loads(text.queue[0][1])["seq"], 3)
+
+    def test_binary_batch(self):
+        """Test micro-batches for binary clients are binary batch frames"""
+        client = self.connect(protocol.BINARY_SUBPROTOCOL)
+        for n in range(2):
+            message = {"type": "notification", "payload": {"n": n}, "topics": ["user:5"]}
+            asyncio.run(server.publish(message))
+        server.flush_batches()
+        decoded = protocol.decode(client.queue[0][1])
+        self.assertEqual([e["payload"]["n"] for e in decoded["events"]], [0, 1])
+
+    def test_publish_rejected_before_decoding(self):
+        """Test a binary publish from a user connection is refused on its header"""
+        original = server.auth.auth_enabled
+        server.auth.auth_enabled = lambda: True
+        self.addCleanup(setattr, server.auth, "auth_enabled", original)
+        client = server.ClientConnection(FakeSocket({"sub": 5, "role": "admin"}, protocol.BINARY_SUBPROTOCOL))
+        bomb = protocol.HEADER.pack(protocol.PROTOCOL_VERSION, protocol.FLAG_DEFLATE, 5, 0) + b"never inflated"
+        with patch.object(server.protocol, "decode") as decode:
+            self.assertIsNone(server.read_frame(client, bomb))
+        decode.assert_not_called()
+
+        subscribe = protocol.encode({"type": "subscribe", "payload": {"topics": ["classroom:3"]}})
+        self.assertEqual(server.read_frame(client, subscribe)[0]["type"], "subscribe")
+
+    def test_invalid_frames_are_dropped(self):
+        """Test bad frames are skipped without ending the connection"""
+        client = self.connect(protocol.BINARY_SUBPROTOCOL)
+        for bad in (b"\x01", "{not json", "[1, 2]"):
+            self.assertIsNone(server.read_frame(client, bad))
+
+    def test_binary_replay(self):
+        """Test replayed events are sent in the client's format"""
+        asyncio.run(server.publish(dict(SAMPLE), None, 1))
+        client = self.connect(protocol.BINARY_SUBPROTOCOL)
+        server.replay(client, 0)
+        self.assertEqual(protocol.decode(client.queue[0][1])["payload"]["reservation_id"], 42)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+Unit Tests for Streaming Quantiles
+==================================
+Tests the QuantileSketch and the approval-latency tracker built on it
+"""
+
+import unittest
+import sys
+import os
+import random
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.quantiles import QuantileSketch
+import data.analytics as analytics
+from data.analytics import ApprovalLatencyTracker
+
+
+class TestQuantileSketch(unittest.TestCase):
+    """Test cases for quantile estimates"""
+
+    def assertWithinAccuracy(self, estimate, expected, accuracy=0.01):
+        self.assertLessEqual(abs(estimate - expected), expected * accuracy + 1e-9)
+
+    def test_empty_sketch(self):
+        """Test an empty sketch has no quantiles"""
+        sketch = QuantileSketch()
+        self.assertIsNone(sketch.quantile(0.5))
+        self.assertEqual(sketch.percentiles(), {"p50": None, "p90": None, "p99": None})
+
+    def test_single_value(self):
+        """Test a single value is every quantile"""
+        sketch = QuantileSketch()
+        sketch.add(3.5)
+        self.assertEqual(sketch.quantile(0.0), 3.5)
+        self.assertEqual(sketch.quantile(0.99), 3.5)
+
+    def test_relative_accuracy(self):
+        """Test estimates stay within the configured relative error"""
+        rng = random.Random(42)
+        values = [rng.expovariate(1 / 12) for _ in range(5000)]
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        ordered = sorted(values)
+        for q in (0.5, 0.9, 0.99):
+            expected = ordered[int(q * (len(ordered) - 1))]
+            self.assertWithinAccuracy(sketch.quantile(q), expected)
+
+    def test_zero_values(self):
+        """Test zero waits (instant decisions) are counted"""
+        sketch = QuantileSketch()
+        for _ in range(9):
+            sketch.add(0)
+        sketch.add(10)
+        self.assertEqual(sketch.quantile(0.5), 0.0)
+        self.assertEqual(sketch.count, 10)
+
+    def test_merge(self):
+        """Test merging two sketches matches one sketch over all values"""
+        left, right, combined = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        for value in range(1, 101):
+            (left if value % 2 else right).add(value)
+            combined.add(value)
+        left.merge(right)
+        self.assertEqual(left.count, 100)
+        self.assertEqual(left.percentiles(), combined.percentiles())
+
+    def test_percentile_keys(self):
+        """Test percentiles() labels its keys p50/p90/p99"""
+        sketch = QuantileSketch()
+        sketch.add(1)
+        self.assertEqual(set(sketch.percentiles()), {"p50", "p90", "p99"})
+
+
+class TestApprovalLatencyTracker(unittest.TestCase):
+    """Test cases for seeding and recording approval latency"""
+
+    seed = [
+        {"id": 1, "reviewed_by": 9, "classroom_id": 3, "wait_seconds": 3600, "recent": 0},
+        {"id": 2, "reviewed_by": 9, "classroom_id": 4, "wait_seconds": 7200, "recent": 1},
+    ]
+
+    def setUp(self):
+        self.saved_stream = analytics.db.stream
+        analytics.db.stream = lambda query, params=None: iter([self.seed])
+        self.tracker = ApprovalLatencyTracker()
+
+    def tearDown(self):
+        analytics.db.stream = self.saved_stream
+
+    def test_record_before_load_is_skipped(self):
+        """Approvals before the seed are left to the seed query"""
+        self.tracker.record(5, 60, 9, 3)
+        self.tracker.ensure_loaded()
+        self.assertEqual(self.tracker.snapshot()["overall"]["count"], 2)
+
+    def test_seeded_approval_is_not_counted_twice(self):
+        """A record() racing the seed for the same reservation is dropped"""
+        self.tracker.ensure_loaded()
+        self.tracker.record(2, 7200, 9, 4)
+        self.tracker.record(7, 60, 9, 4)
+        snapshot = self.tracker.snapshot()
+        self.assertEqual(snapshot["overall"]["count"], 3)
+        self.assertEqual(snapshot["by_room"][4]["count"], 2)
+
+    def test_failed_seed_retries(self):
+        """A seed that fails part-way keeps nothing and loads on the next call"""
+        def failing(query, params=None):
+            yield self.seed[:1]
+            raise OSError("lost connection")
+
+        analytics.db.stream = failing
+        self.tracker.ensure_loaded()
+        self.assertFalse(self.tracker.loaded)
+        self.assertEqual(self.tracker.snapshot()["overall"]["count"], 0)
+        analytics.db.stream = lambda query, params=None: iter([self.seed])
+        self.tracker.ensure_loaded()
+        self.assertEqual(self.tracker.snapshot()["overall"]["count"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
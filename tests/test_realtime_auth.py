@@ -0,0 +1,173 @@
+"""
+Unit Tests for Realtime Connection Tokens
+=========================================
+Tests token signing/verification and identity-based routing on the server
+"""
+
+import unittest
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import websockets
+
+from websocket import auth
+from websocket import websocket_server as server
+from utils import security
+from tests.websocket_fakes import FakeSocket
+
+
+class TestTokens(unittest.TestCase):
+    """Test cases for sign_token / verify_token"""
+
+    SECRET = "test-secret"
+
+    def test_round_trip(self):
+        """Test a fresh token yields its claims"""
+        claims = auth.verify_token(auth.sign_token(5, "faculty", secret=self.SECRET), secret=self.SECRET)
+        self.assertEqual((claims["sub"], claims["role"]), (5, "faculty"))
+
+    def test_wrong_secret_rejected(self):
+        token = auth.sign_token(5, "faculty", secret=self.SECRET)
+        self.assertIsNone(auth.verify_token(token, secret="other"))
+
+    def test_tampered_claims_rejected(self):
+        """Test changing the role invalidates the signature"""
+        token = auth.sign_token(5, "faculty", secret=self.SECRET)
+        _, signature = token.split(".")
+        forged_body = auth._b64encode(json.dumps({"sub": 5, "role": "admin", "exp": 2 ** 40}).encode())
+        self.assertIsNone(auth.verify_token(f"{forged_body}.{signature}", secret=self.SECRET))
+
+    def test_expired_rejected(self):
+        token = auth.sign_token(5, "faculty", ttl_seconds=-1, secret=self.SECRET)
+        self.assertIsNone(auth.verify_token(token, secret=self.SECRET))
+
+    def test_garbage_rejected(self):
+        for token in ("", "abc", "a.b.c", None):
+            self.assertIsNone(auth.verify_token(token, secret=self.SECRET))
+
+
+class TestIdentityRouting(unittest.TestCase):
+    """Test cases for what an authenticated connection may do"""
+
+    def setUp(self):
+        self.saved_secret = auth.WS_TOKEN_SECRET
+        auth.WS_TOKEN_SECRET = "test-secret"
+
+    def tearDown(self):
+        auth.WS_TOKEN_SECRET = self.saved_secret
+
+    def test_user_limited_to_own_topics(self):
+        """Test a user cannot subscribe to someone else's events"""
+        client = server.ClientConnection(FakeSocket({"sub": 5, "role": "faculty"}))
+        allowed = server.allowed_topics(client, ["user:5", "user:6", "role:admin", "role:faculty", "classroom:3"])
+        self.assertEqual(allowed, ["user:5", "role:faculty", "classroom:3"])
+
+    def test_only_service_publishes(self):
+        user = server.ClientConnection(FakeSocket({"sub": 5, "role": "admin"}))
+        service = server.ClientConnection(FakeSocket({"sub": "app", "role": auth.SERVICE_ROLE}))
+        self.assertFalse(server.may_publish(user))
+        self.assertTrue(server.may_publish(service))
+
+    def test_handshake(self):
+        """Test tokens are checked at connect and users are routed by identity"""
+        async def scenario():
+            server.connected_clients.clear()
+            server.topic_subscribers.clear()
+            server.client_topics.clear()
+            async with websockets.serve(server.handler, "localhost", 0, process_request=server.process_request) as ws_server:
+                url = f"ws://localhost:{ws_server.sockets[0].getsockname()[1]}"
+                with self.assertRaises(websockets.exceptions.InvalidStatus):
+                    async with websockets.connect(url):
+                        pass
+                async with websockets.connect(f"{url}?token={auth.sign_token(7, 'faculty')}"):
+                    await asyncio.sleep(0.05)
+                    client = next(iter(server.connected_clients))
+                    return set(server.client_topics[client])
+
+        topics = asyncio.run(scenario())
+        self.assertEqual(topics, {server.BROADCAST_TOPIC, "user:7", "role:faculty"})
+
+
+class TestWithoutSecret(unittest.TestCase):
+    """Test cases for a server started without WS_TOKEN_SECRET"""
+
+    def setUp(self):
+        self.saved = (auth.WS_TOKEN_SECRET, auth.WS_AUTH_DISABLED)
+        auth.WS_TOKEN_SECRET = ""
+
+    def tearDown(self):
+        auth.WS_TOKEN_SECRET, auth.WS_AUTH_DISABLED = self.saved
+
+    def test_fails_closed(self):
+        """Test nobody may publish and the server will not start"""
+        auth.WS_AUTH_DISABLED = False
+        client = server.ClientConnection(FakeSocket())
+        self.assertFalse(server.may_publish(client))
+        with self.assertRaises(SystemExit):
+            server.main()
+
+    def test_development_opt_out(self):
+        """Test WS_AUTH_DISABLED explicitly opens publishing"""
+        auth.WS_AUTH_DISABLED = True
+        client = server.ClientConnection(FakeSocket())
+        self.assertTrue(server.may_publish(client))
+
+class FakeSession:
+    def __init__(self, values):
+        self.values = dict(values)
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+
+class FakePage:
+    def __init__(self, values):
+        self.session = FakeSession(values)
+
+
+class TestSessionToken(unittest.TestCase):
+    """Test cases for the realtime token kept in a logged-in session"""
+
+    def setUp(self):
+        self.saved_secret = auth.WS_TOKEN_SECRET
+        auth.WS_TOKEN_SECRET = "test-secret"
+        self.page = FakePage({"user_id": 5, "user_role": "faculty"})
+
+    def tearDown(self):
+        auth.WS_TOKEN_SECRET = self.saved_secret
+
+    def test_issued_for_the_user(self):
+        """Test the login token carries the session's identity"""
+        token = security.issue_realtime_token(self.page)
+        self.assertEqual(self.page.session.get("realtime_token"), token)
+        claims = auth.verify_token(token)
+        self.assertEqual((claims["sub"], claims["role"]), (5, "faculty"))
+
+    def test_refreshed_with_the_session(self):
+        """Test activity renews a token close to expiry and keeps a fresh one"""
+        fresh = security.issue_realtime_token(self.page)
+        security.touch_session(self.page)
+        self.assertEqual(self.page.session.get("realtime_token"), fresh)
+
+        soon = datetime.now() + timedelta(seconds=security.REALTIME_TOKEN_REFRESH_SECONDS - 1)
+        self.page.session.set("realtime_token", "stale")
+        self.page.session.set("realtime_token_expires", soon.isoformat())
+        security.touch_session(self.page)
+        self.assertIsNotNone(auth.verify_token(self.page.session.get("realtime_token")))
+
+    def test_not_issued_before_login(self):
+        """Test touching a session without a token does not create one"""
+        security.touch_session(self.page)
+        self.assertIsNone(self.page.session.get("realtime_token"))
+
+if __name__ == "__main__":
+    unittest.main()
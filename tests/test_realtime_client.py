@@ -0,0 +1,282 @@
+"""
+Unit Tests for the Realtime Client
+==================================
+Tests reconnect backoff, the outbound queue, connection-state callbacks,
+per-session listener dispatch and same-process delivery
+"""
+
+import unittest
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import websockets
+
+from utils import websocket_client
+from utils.websocket_client import (
+    RealtimeClient, ListenerRegistry, STATE_CONNECTED, STATE_DISCONNECTED
+)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+class EchoServer:
+    """Minimal server in its own thread that records every received message"""
+
+    def __init__(self, port):
+        self.port = port
+        self.received = []
+        self.loop = asyncio.new_event_loop()
+        self.server = None
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    async def _handler(self, websocket):
+        async for message in websocket:
+            self.received.append(json.loads(message))
+
+    def start(self):
+        async def _start():
+            self.server = await websockets.serve(self._handler, "localhost", self.port)
+        asyncio.run_coroutine_threadsafe(_start(), self.loop).result(5)
+
+    def stop(self):
+        async def _stop():
+            self.server.close()
+            await self.server.wait_closed()
+        asyncio.run_coroutine_threadsafe(_stop(), self.loop).result(5)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestBackoff(unittest.TestCase):
+    """Test cases for the reconnect delay"""
+
+    def test_delay_grows_and_is_capped(self):
+        """Test jittered delays stay within the exponential cap"""
+        for attempt in range(12):
+            cap = min(websocket_client.RECONNECT_MAX_DELAY,
+                      websocket_client.RECONNECT_BASE_DELAY * 2 ** attempt)
+            for _ in range(20):
+                self.assertTrue(0 <= RealtimeClient._backoff_delay(attempt) <= cap)
+
+
+class TestOutboundQueue(unittest.TestCase):
+    """Test cases for sends while disconnected"""
+
+    def test_send_while_disconnected_is_queued(self):
+        """Test messages are buffered instead of dropped"""
+        client = RealtimeClient("ws://localhost:1")
+        client.send("new_reservation", {"id": 1}, topics=["role:admin"])
+        self.assertEqual(client.outbound[0]["topics"], ["role:admin"])
+
+    def test_queue_is_bounded(self):
+        """Test the oldest queued messages are dropped past the limit"""
+        client = RealtimeClient("ws://localhost:1")
+        for i in range(websocket_client.OUTBOUND_QUEUE_LIMIT + 5):
+            client.send("x", {"i": i})
+        self.assertEqual(len(client.outbound), websocket_client.OUTBOUND_QUEUE_LIMIT)
+        self.assertEqual(client.outbound[0]["payload"]["i"], 5)
+
+    def test_subscribe_while_disconnected_is_not_queued(self):
+        """Test subscriptions wait for the resubscribe on connect"""
+        client = RealtimeClient("ws://localhost:1")
+        client.subscribe("user:1")
+        self.assertEqual(len(client.outbound), 0)
+        self.assertEqual(client.topics, {"user:1"})
+
+
+def make_handler(received, label):
+    def on_event(data):
+        received.append((label, data["payload"]["n"]))
+    return on_event
+
+
+class TestListenerRegistry(unittest.TestCase):
+    """Test cases for per-session dispatch"""
+
+    def test_every_session_gets_the_event(self):
+        """Test sessions no longer overwrite each other's handler"""
+        registry = ListenerRegistry()
+        received = []
+        registry.add("a", "x", make_handler(received, "a"))
+        registry.add("b", "x", make_handler(received, "b"))
+        registry.dispatch("x", {"type": "x", "payload": {"n": 1}})
+        self.assertTrue(wait_for(lambda: len(received) == 2))
+        self.assertEqual(sorted(received), [("a", 1), ("b", 1)])
+
+    def test_reregistering_replaces(self):
+        """Test a rebuilt view does not register its handler twice"""
+        registry = ListenerRegistry()
+        received = []
+        registry.add("a", "x", make_handler(received, "old"))
+        registry.add("a", "x", make_handler(received, "new"))
+        registry.dispatch("x", {"type": "x", "payload": {"n": 1}})
+        self.assertTrue(wait_for(lambda: received))
+        time.sleep(0.05)
+        self.assertEqual(received, [("new", 1)])
+
+    def test_slow_session_does_not_block_others(self):
+        """Test a blocked listener only delays its own session"""
+        registry = ListenerRegistry(max_workers=2)
+        release = threading.Event()
+        received = []
+        registry.add("slow", "x", lambda data: release.wait(5))
+        registry.add("fast", "x", make_handler(received, "fast"))
+        for n in range(3):
+            registry.dispatch("x", {"type": "x", "payload": {"n": n}})
+        self.assertTrue(wait_for(lambda: len(received) == 3))
+        self.assertEqual([n for _, n in received], [0, 1, 2])
+        release.set()
+
+    def test_ended_session_is_forgotten(self):
+        """Test no events reach a session after it ends"""
+        registry = ListenerRegistry()
+        received = []
+        registry.add("a", "x", make_handler(received, "a"))
+        registry.remove_session("a")
+        registry.dispatch("x", {"type": "x", "payload": {"n": 1}})
+        time.sleep(0.05)
+        self.assertEqual(received, [])
+
+
+class TestSessionTopics(unittest.TestCase):
+    """Test cases for topic reference counting across sessions"""
+
+    def test_topic_kept_while_another_session_needs_it(self):
+        """Test ending one session only drops topics nobody else uses"""
+        client = RealtimeClient("ws://localhost:1")
+        client.subscribe("role:admin", "user:1", session="a")
+        client.subscribe("role:admin", "user:2", session="b")
+        client.end_session("a")
+        self.assertEqual(client.topics, {"role:admin", "user:2"})
+        client.end_session("b")
+        self.assertEqual(client.topics, set())
+
+
+class TestLocalDelivery(unittest.TestCase):
+    """Test cases for events sent and received in the same process"""
+
+    def setUp(self):
+        self.client = RealtimeClient("ws://localhost:1")
+        self.received = []
+        self.client.on("reservation_approved", make_handler(self.received, "a"), session="a")
+        self.client.on("reservation_approved", make_handler(self.received, "b"), session="b")
+        self.client.subscribe("user:1", session="a")
+        self.client.subscribe("user:2", session="b")
+
+    def test_send_reaches_local_sessions_without_server(self):
+        """Test same-process delivery needs no socket round trip"""
+        self.client.send("reservation_approved", {"n": 1}, topics=["user:1"])
+        self.assertTrue(wait_for(lambda: self.received))
+        time.sleep(0.05)
+        self.assertEqual(self.received, [("a", 1)])
+
+    def test_broadcast_reaches_every_session(self):
+        """Test events without topics go to all sessions"""
+        self.client.send("reservation_approved", {"n": 1})
+        self.assertTrue(wait_for(lambda: len(self.received) == 2))
+
+    def test_own_echo_is_skipped(self):
+        """Test the server's copy of our own event is not delivered twice"""
+        asyncio.run(self.client._handle_message(json.dumps({
+            "seq": 9, "type": "reservation_approved", "payload": {"n": 1},
+            "topics": ["user:1"], "origin": self.client.origin
+        })))
+        time.sleep(0.05)
+        self.assertEqual(self.received, [])
+        self.assertEqual(self.client.last_seq, 9)
+
+    def test_resync_resets_last_seq(self):
+        """Test a resync replaces the stale numbering and reaches the listeners"""
+        resyncs = []
+        self.client.on("resync_required", resyncs.append, session="a")
+        self.client.last_seq, self.client.epoch = 500, "old"
+        asyncio.run(self.client._handle_message(json.dumps({
+            "type": "resync_required", "payload": {"last_seq": 3, "epoch": "new"}
+        })))
+        self.assertEqual((self.client.last_seq, self.client.epoch), (3, "new"))
+        self.assertTrue(wait_for(lambda: resyncs))
+
+    def test_welcome_sets_epoch(self):
+        """Test the first connection learns the server's epoch"""
+        asyncio.run(self.client._handle_message(json.dumps({
+            "type": "welcome", "payload": {"last_seq": 3, "epoch": "e1"}
+        })))
+        self.assertEqual((self.client.last_seq, self.client.epoch), (None, "e1"))
+
+    def test_remote_event_only_reaches_subscribed_session(self):
+        """Test events from other processes are filtered by session topics"""
+        asyncio.run(self.client._handle_message(json.dumps({
+            "type": "reservation_approved", "payload": {"n": 2},
+            "topics": ["user:2"], "origin": "elsewhere"
+        })))
+        self.assertTrue(wait_for(lambda: self.received))
+        time.sleep(0.05)
+        self.assertEqual(self.received, [("b", 2)])
+
+
+class TestReconnect(unittest.TestCase):
+    """Test cases against a real local server"""
+
+    def setUp(self):
+        self.saved = websocket_client.RECONNECT_BASE_DELAY, websocket_client.RECONNECT_MAX_DELAY
+        websocket_client.RECONNECT_BASE_DELAY = 0.05
+        websocket_client.RECONNECT_MAX_DELAY = 0.2
+
+    def tearDown(self):
+        websocket_client.RECONNECT_BASE_DELAY, websocket_client.RECONNECT_MAX_DELAY = self.saved
+
+    def test_reconnects_and_flushes_queue(self):
+        """Test the client survives a server restart and delivers queued sends"""
+        port = free_port()
+        server = EchoServer(port)
+        client = RealtimeClient(f"ws://localhost:{port}")
+        states = []
+        client.on_state_change(states.append)
+        client.subscribe("user:7")
+
+        # Server not up yet: the client keeps retrying instead of giving up
+        client.connect()
+        client.send("hello")
+        time.sleep(0.3)
+        self.assertFalse(client.connected)
+
+        server.start()
+        self.assertTrue(wait_for(lambda: client.connected))
+        self.assertTrue(wait_for(lambda: len(server.received) >= 2))
+        self.assertEqual(server.received[0]["type"], "subscribe")
+        self.assertEqual(server.received[0]["payload"]["topics"], ["user:7"])
+        self.assertEqual(server.received[1]["type"], "hello")
+
+        server.stop()
+        self.assertTrue(wait_for(lambda: not client.connected))
+        client.send("while_down")
+        server.start()
+        self.assertTrue(wait_for(lambda: any(m["type"] == "while_down" for m in server.received)))
+        self.assertEqual(states.count(STATE_CONNECTED), 2)
+        self.assertIn(STATE_DISCONNECTED, states)
+
+        client.disconnect()
+        server.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Unit Tests for the Search Index
+===============================
+Tests tokenizing and prefix lookups of the dashboard classroom search
+"""
+
+import unittest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.search_index import SearchIndex, tokenize
+
+
+def make_index():
+    index = SearchIndex(max_prefix=4)
+    index.add(1, "CS Laboratory 2", "Main Building", 40, "Available")
+    index.add(2, "Room 101", "Annex", 30, "Maintenance")
+    index.add(3, "Lecture Hall", "Main Building", 120, "Available")
+    return index
+
+
+class TestTokenize(unittest.TestCase):
+    """Test cases for query/text normalization"""
+
+    def test_lowercase_and_split(self):
+        """Text is lowercased and split on anything non-alphanumeric"""
+        self.assertEqual(tokenize("CS-Lab  (2nd floor)"), ["cs", "lab", "2nd", "floor"])
+
+    def test_accents_removed(self):
+        """Accented letters match their plain form"""
+        self.assertEqual(tokenize("Sálon Ñino"), ["salon", "nino"])
+
+    def test_numbers(self):
+        """Non-string values are tokenized too"""
+        self.assertEqual(tokenize(120), ["120"])
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Test cases for prefix search"""
+
+    def test_blank_query_matches_all(self):
+        """An empty query matches every indexed item"""
+        self.assertEqual(make_index().search("  "), {1, 2, 3})
+
+    def test_prefix_match(self):
+        """A query token matches the start of any item token"""
+        index = make_index()
+        self.assertEqual(index.search("lab"), {1})
+        self.assertEqual(index.search("build"), {1, 3})
+        self.assertEqual(index.search("10"), {2})
+
+    def test_all_tokens_must_match(self):
+        """Several query tokens narrow the result"""
+        index = make_index()
+        self.assertEqual(index.search("main avail"), {1, 3})
+        self.assertEqual(index.search("main lect"), {3})
+        self.assertEqual(index.search("annex lab"), set())
+
+    def test_case_insensitive(self):
+        """Queries are normalized like the indexed text"""
+        self.assertEqual(make_index().search("LECTURE"), {3})
+
+    def test_tokens_longer_than_max_prefix(self):
+        """Long query tokens are verified against the full tokens"""
+        index = make_index()
+        self.assertEqual(index.search("laboratory"), {1})
+        self.assertEqual(index.search("labyrinth"), set())
+
+    def test_reindex_and_remove(self):
+        """Re-adding replaces old tokens; removing drops the item"""
+        index = make_index()
+        index.add(2, "Studio", "Annex", 30, "Available")
+        self.assertEqual(index.search("room"), set())
+        self.assertEqual(index.search("stud"), {2})
+        index.remove(2)
+        self.assertNotIn(2, index)
+        self.assertEqual(index.search("annex"), set())
+        self.assertEqual(len(index), 2)
+
+    def test_result_is_a_copy(self):
+        """Callers may modify the result without corrupting the index"""
+        index = make_index()
+        index.search("build").clear()
+        self.assertEqual(index.search("build"), {1, 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
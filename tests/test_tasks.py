@@ -0,0 +1,130 @@
+"""
+Unit Tests for the View Task Runner
+===================================
+Tests background execution, limits, busy state and timers of utils/tasks.py
+"""
+
+import unittest
+import sys
+import os
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.tasks import TaskRunner, TaskRejected
+
+
+class StubPage:
+    """Counts page updates (stands in for a Flet page)"""
+
+    def __init__(self, session_id="s1"):
+        self.session_id = session_id
+        self.updates = 0
+
+    def update(self):
+        self.updates += 1
+
+
+class StubControl:
+    def __init__(self):
+        self.disabled = False
+        self.visible = False
+
+
+class TestTaskRunner(unittest.TestCase):
+    """Test cases for TaskRunner"""
+
+    def setUp(self):
+        self.runner = TaskRunner(max_workers=2, queue_limit=3, per_session=2)
+        self.page = StubPage()
+
+    def tearDown(self):
+        self.runner.executor.shutdown(wait=True)
+
+    def test_result_reaches_on_done(self):
+        """The work's result is passed to on_done, then the page is updated"""
+        done = threading.Event()
+        results = []
+
+        def on_done(result):
+            results.append(result)
+            done.set()
+
+        self.assertTrue(self.runner.run(self.page, lambda: 42, on_done))
+        self.assertTrue(done.wait(2))
+        self.runner.executor.shutdown(wait=True)
+        self.assertEqual(results, [42])
+        # One update to show the busy state, one with the result
+        self.assertEqual(self.page.updates, 2)
+
+    def test_busy_and_progress(self):
+        """Busy controls are disabled and progress shown only while running"""
+        button, bar = StubControl(), StubControl()
+        release = threading.Event()
+        seen = []
+
+        def work():
+            seen.append((button.disabled, bar.visible))
+            release.wait(2)
+
+        self.runner.run(self.page, work, busy=[button], progress=bar)
+        release.set()
+        self.runner.executor.shutdown(wait=True)
+        self.assertEqual(seen, [(True, True)])
+        self.assertFalse(button.disabled)
+        self.assertFalse(bar.visible)
+
+    def test_errors_reach_on_error(self):
+        """An exception in the work goes to on_error instead of on_done"""
+        errors = []
+
+        def work():
+            raise ValueError("boom")
+
+        self.runner.run(self.page, work, on_done=lambda r: errors.append("done"), on_error=errors.append)
+        self.runner.executor.shutdown(wait=True)
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], ValueError)
+
+    def test_session_limit(self):
+        """A session cannot have more than per_session tasks in flight"""
+        release = threading.Event()
+        errors = []
+        for _ in range(2):
+            self.assertTrue(self.runner.run(self.page, lambda: release.wait(2)))
+        self.assertFalse(self.runner.run(self.page, lambda: None, on_error=errors.append))
+        self.assertIsInstance(errors[0], TaskRejected)
+        # Another session still gets a slot
+        self.assertTrue(self.runner.run(StubPage("s2"), lambda: release.wait(2)))
+        release.set()
+
+    def test_global_limit(self):
+        """No more than queue_limit tasks run or wait over all sessions"""
+        release = threading.Event()
+        pages = [StubPage(f"s{n}") for n in range(4)]
+        started = [self.runner.run(p, lambda: release.wait(2)) for p in pages]
+        self.assertEqual(started, [True, True, True, False])
+        release.set()
+
+    def test_slots_are_released(self):
+        """Finished tasks free their slots"""
+        for _ in range(5):
+            done = threading.Event()
+            self.assertTrue(self.runner.run(self.page, lambda: None, lambda r: done.set()))
+            self.assertTrue(done.wait(2))
+        self.runner.executor.shutdown(wait=True)
+        self.assertEqual(self.runner.in_flight, 0)
+        self.assertEqual(self.runner.by_session, {})
+
+    def test_later(self):
+        """later() calls back after the delay and updates the page once"""
+        fired = threading.Event()
+        timer = self.runner.later(self.page, 0.01, fired.set)
+        self.assertTrue(fired.wait(2))
+        timer.join(2)
+        self.assertEqual(self.page.updates, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
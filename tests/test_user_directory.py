@@ -0,0 +1,118 @@
+"""
+Unit Tests for the User Directory Queries
+=========================================
+Tests the directory SQL builder and count folding (without database dependency)
+"""
+
+import unittest
+import sys
+import os
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.models import build_directory_query, fold_user_counts, user_matches_directory
+
+
+class TestDirectoryQuery(unittest.TestCase):
+    """Test cases for the directory page query"""
+
+    def test_all_users_first_page(self):
+        """No filter, search or cursor: no WHERE clause"""
+        query, params = build_directory_query("all", "", None, 51)
+        self.assertNotIn("WHERE", query)
+        self.assertIn("ORDER BY created_at DESC, id DESC", query)
+        self.assertEqual(params, (51,))
+
+    def test_role_filter(self):
+        """Role filters compare the role column"""
+        query, params = build_directory_query("faculty", limit=10)
+        self.assertIn("role = %s", query)
+        self.assertEqual(params, ("faculty", 10))
+
+    def test_active_filters(self):
+        """Active/inactive filters compare is_active"""
+        _, params = build_directory_query("active", limit=10)
+        self.assertEqual(params, (True, 10))
+        _, params = build_directory_query("inactive", limit=10)
+        self.assertEqual(params, (False, 10))
+
+    def test_prefix_search(self):
+        """Search is one indexed prefix query per column, joined by UNION"""
+        query, params = build_directory_query("all", "juan", limit=10)
+        self.assertNotIn(" OR ", query)
+        self.assertEqual(query.count("UNION"), 2)
+        for column in ("full_name", "email", "id_number"):
+            self.assertIn(f"WHERE {column} LIKE %s", query)
+        self.assertEqual(params, ("juan%", 10, "juan%", 10, "juan%", 10, 10))
+
+    def test_search_with_filter_and_cursor(self):
+        """Every branch applies the filter and the cursor"""
+        created = datetime(2025, 1, 2, 3, 4, 5)
+        query, params = build_directory_query("faculty", "ju", (created, 42), 10)
+        self.assertEqual(query.count("role = %s"), 3)
+        self.assertEqual(query.count("(created_at < %s OR (created_at = %s AND id < %s))"), 3)
+        self.assertEqual(params[:6], ("ju%", "faculty", created, created, 42, 10))
+        self.assertEqual(len(params), 19)
+
+    def test_search_wildcards_are_literal(self):
+        """% and _ typed by the admin do not act as wildcards"""
+        _, params = build_directory_query("all", "50%_a", limit=10)
+        self.assertEqual(params[0], "50\\%\\_a%")
+
+    def test_keyset_cursor(self):
+        """The cursor continues strictly after the last row shown"""
+        created = datetime(2025, 1, 2, 3, 4, 5)
+        query, params = build_directory_query("student", "", (created, 42), 10)
+        self.assertIn("(created_at < %s OR (created_at = %s AND id < %s))", query)
+        self.assertEqual(params, ("student", created, created, 42, 10))
+
+
+class TestFoldUserCounts(unittest.TestCase):
+    """Test cases for folding grouped counts into filter counts"""
+
+    def test_fold(self):
+        """Each row adds to all, its active state and its role"""
+        counts = fold_user_counts([
+            {"role": "admin", "is_active": 1, "count": 2},
+            {"role": "faculty", "is_active": 1, "count": 5},
+            {"role": "faculty", "is_active": 0, "count": 1},
+            {"role": "student", "is_active": 1, "count": 30},
+            {"role": "student", "is_active": 0, "count": 4},
+        ])
+        self.assertEqual(counts, {
+            "all": 42, "active": 37, "inactive": 5,
+            "admin": 2, "faculty": 6, "student": 34,
+        })
+
+    def test_no_rows(self):
+        """An empty table (or failed query) gives zero counts"""
+        self.assertEqual(set(fold_user_counts(None).values()), {0})
+
+
+class TestUserMatchesDirectory(unittest.TestCase):
+    """Test cases for placing a changed user without a query"""
+
+    user = {"role": "faculty", "is_active": 1, "full_name": "Juan Dela Cruz",
+            "email": "juan@cspc.edu.ph", "id_number": "20231001"}
+
+    def test_filters(self):
+        """Role and active filters agree with the SQL conditions"""
+        self.assertTrue(user_matches_directory(self.user, "all"))
+        self.assertTrue(user_matches_directory(self.user, "faculty"))
+        self.assertFalse(user_matches_directory(self.user, "student"))
+        self.assertTrue(user_matches_directory(self.user, "active"))
+        self.assertFalse(user_matches_directory(dict(self.user, is_active=0), "active"))
+        self.assertTrue(user_matches_directory(dict(self.user, is_active=0), "inactive"))
+
+    def test_prefix_search(self):
+        """Search matches the start of name, email or ID number, any case"""
+        self.assertTrue(user_matches_directory(self.user, "all", "JUAN"))
+        self.assertTrue(user_matches_directory(self.user, "all", "2023"))
+        self.assertFalse(user_matches_directory(self.user, "all", "cruz"))
+        self.assertFalse(user_matches_directory(self.user, "student", "juan"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+"""
+Unit Tests for WebSocket Topic Routing
+======================================
+Tests topic subscriptions, publish routing, per-client backpressure
+and the /metrics endpoint
+"""
+
+import unittest
+import asyncio
+import json
+import sys
+import os
+import urllib.request
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from websocket import websocket_server as server
+from tests.websocket_fakes import FakeSocket
+
+
+def queued(client):
+    """Decoded messages waiting in a client's outbound queue"""
+    return [json.loads(message_json) for _, message_json in client.queue]
+
+
+class TestTopicRouting(unittest.TestCase):
+    """Test cases for subscribe/unsubscribe and publish"""
+
+    def setUp(self):
+        server.connected_clients.clear()
+        server.topic_subscribers.clear()
+        server.client_topics.clear()
+        self.admin = server.ClientConnection(FakeSocket())
+        self.faculty = server.ClientConnection(FakeSocket())
+        for client in (self.admin, self.faculty):
+            server.connected_clients.add(client)
+            server.subscribe(client, [server.BROADCAST_TOPIC])
+        server.subscribe(self.admin, ["role:admin"])
+        server.subscribe(self.faculty, ["user:5", "classroom:3"])
+
+    def publish(self, message):
+        asyncio.run(server.publish(message))
+
+    def test_user_topic_reaches_only_that_user(self):
+        """Test a per-user event is not sent to other clients"""
+        self.publish({"type": "reservation_approved", "payload": {}, "topics": ["user:5"]})
+        self.assertEqual(len(queued(self.faculty)), 1)
+        self.assertEqual(queued(self.admin), [])
+
+    def test_multiple_topics_deliver_once(self):
+        """Test a client subscribed to several matching topics gets one copy"""
+        self.publish({"type": "x", "payload": {}, "topics": ["user:5", "classroom:3", "role:admin"]})
+        self.assertEqual(len(queued(self.faculty)), 1)
+        self.assertEqual(len(queued(self.admin)), 1)
+
+    def test_no_topics_broadcasts(self):
+        """Test events without topics still reach every client"""
+        self.publish({"type": "test", "payload": {}})
+        self.assertEqual(len(queued(self.admin)), 1)
+        self.assertEqual(len(queued(self.faculty)), 1)
+
+    def test_unsubscribe(self):
+        """Test unsubscribed topics stop delivering and empty topics are dropped"""
+        server.unsubscribe(self.faculty, ["classroom:3"])
+        self.publish({"type": "x", "payload": {}, "topics": ["classroom:3"]})
+        self.assertEqual(queued(self.faculty), [])
+        self.assertNotIn("classroom:3", server.topic_subscribers)
+
+    def test_invalid_topics_ignored(self):
+        """Test unknown topic families are not indexed"""
+        server.subscribe(self.admin, ["everything", 42])
+        self.assertNotIn("everything", server.topic_subscribers)
+
+    def test_remove_client(self):
+        """Test disconnect removes the client from every topic"""
+        server.remove_client(self.faculty)
+        self.assertNotIn("user:5", server.topic_subscribers)
+        self.assertNotIn(self.faculty, server.subscribers_for([server.BROADCAST_TOPIC]))
+
+
+class TestBackpressure(unittest.TestCase):
+    """Test cases for bounded outbound queues"""
+
+    def setUp(self):
+        for key in server.metrics:
+            server.metrics[key] = 0
+
+    def test_full_queue_drops_oldest(self):
+        """Test a full queue drops the oldest message and counts it"""
+        client = server.ClientConnection(FakeSocket(), max_queue=2)
+        for number in range(3):
+            client.enqueue(json.dumps({"n": number}), "x")
+        self.assertEqual([m["n"] for m in queued(client)], [1, 2])
+        self.assertEqual(client.dropped, 1)
+        self.assertEqual(server.metrics["dropped"], 1)
+
+    def test_snapshot_events_coalesce(self):
+        """Test a queued analytics snapshot is replaced by the newer one"""
+        client = server.ClientConnection(FakeSocket())
+        client.enqueue(json.dumps({"total": 1}), "analytics_counters")
+        client.enqueue(json.dumps({"other": True}), "x")
+        client.enqueue(json.dumps({"total": 2}), "analytics_counters")
+        self.assertEqual(queued(client), [{"total": 2}, {"other": True}])
+        self.assertEqual(server.metrics["coalesced"], 1)
+
+    def test_slow_consumer_disconnected(self):
+        """Test a client whose queue stays full is disconnected"""
+        async def scenario():
+            socket = FakeSocket()
+            client = server.ClientConnection(socket, max_queue=1)
+            client.enqueue("{}", "x")
+            client.enqueue("{}", "x")
+            client.full_since -= server.SLOW_CONSUMER_SECONDS + 1
+            client.enqueue("{}", "x")
+            await asyncio.sleep(0)
+            return client, socket
+
+        client, socket = asyncio.run(scenario())
+        self.assertTrue(client.closing)
+        self.assertTrue(socket.closed)
+        self.assertEqual(server.metrics["slow_disconnects"], 1)
+
+    def test_writer_drains_queue(self):
+        """Test the writer task sends queued messages in order"""
+        async def scenario():
+            socket = FakeSocket()
+            client = server.ClientConnection(socket)
+            client.start()
+            client.enqueue(json.dumps({"n": 1}), "x")
+            client.enqueue(json.dumps({"n": 2}), "x")
+            await asyncio.sleep(0.01)
+            client.stop()
+            return socket
+
+        socket = asyncio.run(scenario())
+        self.assertEqual([m["n"] for m in socket.sent_json()], [1, 2])
+        self.assertEqual(server.metrics["delivered"], 2)
+
+
+class TestBatching(unittest.TestCase):
+    """Test cases for serialize-once publish and micro-batching"""
+
+    def setUp(self):
+        server.connected_clients.clear()
+        server.topic_subscribers.clear()
+        server.client_topics.clear()
+        server.batching_clients.clear()
+        self.client = server.ClientConnection(FakeSocket())
+        server.connected_clients.add(self.client)
+        server.subscribe(self.client, [server.BROADCAST_TOPIC, "role:admin"])
+
+    def test_received_frame_forwarded_verbatim(self):
+        """Test publish reuses the received frame instead of re-serializing"""
+        raw = '{"type": "reservation_approved", "payload": {"id": 1}}'
+        asyncio.run(server.publish(json.loads(raw), raw))
+        self.assertIs(self.client.queue[0][1], raw)
+
+    def test_high_frequency_events_batched(self):
+        """Test batched event types wait for the tick and go out as one frame"""
+        for reservation_id in (1, 2, 3):
+            asyncio.run(server.publish({"type": "new_reservation", "payload": {"id": reservation_id}, "topics": ["role:admin"]}))
+        self.assertEqual(len(self.client.queue), 0)
+
+        server.flush_batches()
+        frames = queued(self.client)
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(frames[0]["type"], "batch")
+        self.assertEqual([e["payload"]["id"] for e in frames[0]["events"]], [1, 2, 3])
+
+    def test_single_event_not_wrapped(self):
+        """Test a lone batched event is sent as itself"""
+        asyncio.run(server.publish({"type": "notification", "payload": {}, "topics": ["role:admin"]}))
+        server.flush_batches()
+        self.assertEqual(queued(self.client)[0]["type"], "notification")
+
+    def test_snapshots_coalesce_within_batch(self):
+        """Test only the newest analytics snapshot survives a tick"""
+        for total in (1, 2):
+            asyncio.run(server.publish({"type": "analytics_counters", "payload": {"total": total}, "topics": ["role:admin"]}))
+        server.flush_batches()
+        self.assertEqual(queued(self.client)[0]["payload"]["total"], 2)
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    """Test cases for GET /metrics on the websocket port"""
+
+    def setUp(self):
+        server.connected_clients.clear()
+        server.topic_subscribers.clear()
+        server.client_topics.clear()
+
+    def test_metrics_served_over_http(self):
+        """Test plain HTTP gets the counters while websocket upgrades still work"""
+        async def scenario():
+            async with server.websockets.serve(
+                server.handler, "localhost", 0, process_request=server.process_request
+            ) as ws_server:
+                port = ws_server.sockets[0].getsockname()[1]
+                lag_task = asyncio.create_task(server.monitor_loop_lag())
+                async with server.websockets.connect(f"ws://localhost:{port}") as websocket:
+                    await websocket.send(json.dumps({"type": "subscribe", "payload": {"topics": ["user:1"]}}))
+                    await asyncio.sleep(0.05)
+                    url = f"http://localhost:{port}{server.METRICS_PATH}"
+                    body = await asyncio.to_thread(lambda: urllib.request.urlopen(url, timeout=5).read())
+                lag_task.cancel()
+                return json.loads(body)
+
+        received_before = server.metrics["received"]
+        result = asyncio.run(scenario())
+        self.assertEqual(result["clients"], 1)
+        self.assertEqual(result["received"], received_before + 1)
+        for key in ("delivered", "queued", "max_queue_depth", "loop_lag_ms", "pid"):
+            self.assertIn(key, result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+"""
+Test Helpers for the WebSocket Server
+=====================================
+A stand-in websocket connection shared by the realtime server tests
+"""
+
+import json
+
+
+class FakeSocket:
+    """Stands in for a websocket connection and records sent frames"""
+
+    def __init__(self, identity=None, subprotocol=None):
+        self.identity = identity
+        self.subprotocol = subprotocol
+        self.sent = []
+        self.closed = False
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    async def close(self, code=1000, reason=""):
+        self.closed = True
+
+    def sent_json(self):
+        """Frames sent so far, decoded from JSON"""
+        return [json.loads(message) for message in self.sent]
@@ -0,0 +1,76 @@
+"""
+Streaming Quantiles
+===================
+Bounded-memory percentile estimates for values recorded one at a time
+(used for the approval-latency p50/p90/p99 on the analytics dashboard)
+"""
+
+import math
+
+
+class QuantileSketch:
+    """
+    Streaming quantile sketch with bounded relative error.
+
+    Values are counted in logarithmic buckets, so add() is O(1) and memory
+    depends only on the value range, not on how many values were seen.
+    Any quantile is returned within `relative_accuracy` of the true value.
+    """
+
+    def __init__(self, relative_accuracy=0.01, min_value=1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.buckets = {}  # bucket index -> count
+        self.zero_count = 0
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """Record one value"""
+        if value <= self.min_value:
+            self.zero_count += 1
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+
+        self.count += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Fold another sketch (same accuracy) into this one"""
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def quantile(self, q):
+        """Return the estimated q-quantile (0 <= q <= 1), or None if empty"""
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return max(self.min, 0.0)
+
+        running = self.zero_count
+        for index in sorted(self.buckets):
+            running += self.buckets[index]
+            if running > rank:
+                # Midpoint of the bucket (gamma^(i-1), gamma^i]
+                estimate = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def percentiles(self, qs=(0.5, 0.9, 0.99)):
+        """Return {"p50": ..., "p90": ..., "p99": ...} for the given quantiles"""
+        return {f"p{round(q * 100):g}": self.quantile(q) for q in qs}
@@ -0,0 +1,84 @@
+"""
+Search Index
+============
+Token prefix index behind the instant classroom search on the dashboard
+"""
+
+import re
+import unicodedata
+
+# Prefixes longer than this are checked against the full tokens instead
+MAX_PREFIX_LENGTH = 12
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lowercase, accent-free alphanumeric tokens of `text`"""
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode("ascii")
+    return _TOKEN.findall(text.lower())
+
+
+class SearchIndex:
+    """
+    Token prefix index for instant as-you-type search.
+
+    Every token of an item is registered under each of its prefixes (up to
+    MAX_PREFIX_LENGTH), so a query costs one dict lookup per query token
+    and a set intersection, independent of how many items are indexed.
+    An item matches when every query token is the start of one of its
+    tokens ("cs lab" finds "CS Laboratory 2").
+    """
+
+    def __init__(self, max_prefix=MAX_PREFIX_LENGTH):
+        self.max_prefix = max_prefix
+        self.prefixes = {}  # prefix -> set of keys
+        self.tokens = {}  # key -> set of tokens
+
+    def __contains__(self, key):
+        return key in self.tokens
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def add(self, key, *texts):
+        """Index (or re-index) an item under the tokens of `texts`"""
+        if key in self.tokens:
+            self.remove(key)
+        tokens = set()
+        for text in texts:
+            tokens.update(tokenize(text))
+        self.tokens[key] = tokens
+        for token in tokens:
+            for end in range(1, min(len(token), self.max_prefix) + 1):
+                self.prefixes.setdefault(token[:end], set()).add(key)
+
+    def remove(self, key):
+        """Drop an item from the index"""
+        for token in self.tokens.pop(key, ()):
+            for end in range(1, min(len(token), self.max_prefix) + 1):
+                keys = self.prefixes.get(token[:end])
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self.prefixes[token[:end]]
+
+    def search(self, query):
+        """
+        Returns:
+            set: Keys of the items matching every token of `query`
+                 (all keys for a blank query)
+        """
+        query_tokens = sorted(set(tokenize(query)), key=len, reverse=True)
+        if not query_tokens:
+            return set(self.tokens)
+
+        result = None
+        for token in query_tokens:
+            keys = self.prefixes.get(token[:self.max_prefix], set())
+            if len(token) > self.max_prefix:
+                keys = {k for k in keys if any(t.startswith(token) for t in self.tokens[k])}
+            result = keys if result is None else result & keys
+            if not result:
+                return set()
+        return set(result)
@@ -1,9 +1,14 @@
 from datetime import datetime, timedelta
 import secrets
 
+from websocket.auth import sign_token, REALTIME_TOKEN_TTL_SECONDS
+
 # How long a session can be idle before auto-logout
 SESSION_TIMEOUT_MINUTES = 2
 
+# Re-sign the session's websocket token once less than this is left of it
+REALTIME_TOKEN_REFRESH_SECONDS = REALTIME_TOKEN_TTL_SECONDS // 2
+
 
 def _now():
     """Return current time as datetime."""
@@ -12,10 +17,11 @@ def _now():
 
 def touch_session(page):
     """
-    Update last_activity in the session.
+    Update last_activity in the session (and renew its realtime token).
     Call this on each significant user action.
     """
     page.session.set("last_activity", _now().isoformat())
+    refresh_realtime_token(page)
 
 
 def is_session_expired(page):
@@ -48,6 +54,9 @@ def ensure_authenticated(page):
     """
     from views.login_view import show_login  # local import to avoid circular refs
 
+    # Entering a view means leaving the previous one
+    exit_view(page)
+
     user_id = page.session.get("user_id")
 
     # Case 1: No user_id at all → not logged in
@@ -72,6 +81,32 @@ def ensure_authenticated(page):
     return True
 
 
+# ========== VIEW EXIT HOOKS ==========
+
+# session_id -> callback of the view currently shown in that session
+_view_exit_callbacks = {}
+
+
+def on_view_exit(page, callback):
+    """
+    Run callback() once when this session leaves the current view: when the
+    next view is shown (ensure_authenticated / show_login) or the session
+    closes. Use it to release state the view holds outside the page.
+    """
+    _view_exit_callbacks[page.session_id] = callback
+
+
+def exit_view(page):
+    """Run and forget the current view's exit callback, if it registered one"""
+    callback = _view_exit_callbacks.pop(page.session_id, None)
+    if callback is None:
+        return
+    try:
+        callback()
+    except Exception as e:
+        print(f"View exit callback failed: {e}")
+
+
 # ========== CSRF-LIKE PROTECTION (for destructive actions) ==========
 
 def get_csrf_token(page):
@@ -91,3 +126,33 @@ def validate_csrf_token(page, token_from_ui):
     """
     session_token = page.session.get("action_token")
     return bool(session_token and token_from_ui and token_from_ui == session_token)
+
+
+# ========== REALTIME CONNECTION TOKEN ==========
+
+def issue_realtime_token(page):
+    """
+    Sign a short-lived websocket token for the logged-in user
+    (bound to their user_id and role) and keep it in the session.
+    """
+    token = sign_token(page.session.get("user_id"), page.session.get("user_role"))
+    expires = _now() + timedelta(seconds=REALTIME_TOKEN_TTL_SECONDS)
+    page.session.set("realtime_token", token)
+    page.session.set("realtime_token_expires", expires.isoformat())
+    return token
+
+
+def refresh_realtime_token(page):
+    """
+    Re-issue the session's realtime token when it is close to expiring,
+    so an active session always holds one a connection can still use.
+    """
+    if not page.session.get("realtime_token"):
+        return None  # Not logged in (or issued at login right after this)
+    try:
+        expires = datetime.fromisoformat(page.session.get("realtime_token_expires"))
+    except (TypeError, ValueError):
+        expires = _now()
+    if expires - _now() > timedelta(seconds=REALTIME_TOKEN_REFRESH_SECONDS):
+        return page.session.get("realtime_token")
+    return issue_realtime_token(page)
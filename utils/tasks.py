@@ -0,0 +1,147 @@
+"""
+Background Tasks for View Handlers
+==================================
+Runs blocking work (database calls, bcrypt) off Flet's handler threads
+
+A handler hands the blocking part to tasks.run() and returns at once, so
+its session stays responsive and Flet's handler pool is not tied up:
+- Work runs on a bounded pool (TASK_WORKERS threads); at most
+  TASKS_PER_SESSION tasks per session and TASK_QUEUE_LIMIT overall are in
+  flight, anything beyond is rejected with TaskRejected instead of queuing
+  behind other sessions
+- `busy` controls are disabled and an optional `progress` control shown
+  while the task runs
+- The result is handed to on_done (or the exception to on_error) on the
+  worker thread; those callbacks only change controls, the runner sends
+  everything in a single page.update() afterwards
+- tasks.later() replaces time.sleep() in handlers with a timer
+"""
+
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads running view tasks (shared by all sessions)
+TASK_WORKERS = 8
+# Tasks running or waiting, over all sessions
+TASK_QUEUE_LIMIT = 64
+# Tasks one session may have in flight (double clicks, impatient users)
+TASKS_PER_SESSION = 2
+
+
+class TaskRejected(Exception):
+    """The runner (or the session's share of it) is full; try again shortly"""
+
+
+class TaskRunner:
+    """Bounded executor for blocking handler work, one page update per task"""
+
+    def __init__(self, max_workers=TASK_WORKERS, queue_limit=TASK_QUEUE_LIMIT, per_session=TASKS_PER_SESSION):
+        self.lock = threading.Lock()
+        self.queue_limit = queue_limit
+        self.per_session = per_session
+        self.in_flight = 0
+        self.by_session = {}  # session id -> tasks in flight
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="view-task")
+
+    def _acquire(self, session):
+        with self.lock:
+            if self.in_flight >= self.queue_limit or self.by_session.get(session, 0) >= self.per_session:
+                return False
+            self.in_flight += 1
+            self.by_session[session] = self.by_session.get(session, 0) + 1
+            return True
+
+    def _release(self, session):
+        with self.lock:
+            self.in_flight -= 1
+            remaining = self.by_session.get(session, 1) - 1
+            if remaining:
+                self.by_session[session] = remaining
+            else:
+                self.by_session.pop(session, None)
+
+    def run(self, page, work, on_done=None, on_error=None, busy=(), progress=None):
+        """
+        Run work() in the background.
+
+        Args:
+            page: The session's Flet page (updated once when the task ends)
+            work: Blocking callable; its return value goes to on_done
+            on_done: on_done(result), changes controls only
+            on_error: on_error(exception), also called with TaskRejected
+            busy: Controls disabled while the task runs
+            progress: Control made visible while the task runs
+
+        Returns:
+            bool: False if the task was rejected (on_error already called)
+        """
+        session = getattr(page, "session_id", None)
+        if not self._acquire(session):
+            self._finish(page, on_error, TaskRejected("Busy, please try again"))
+            return False
+
+        self._set_busy(busy, progress, True)
+        self._update(page)
+        try:
+            self.executor.submit(self._run, page, session, work, on_done, on_error, busy, progress)
+        except RuntimeError as e:  # Executor shut down (process exiting)
+            self._release(session)
+            self._set_busy(busy, progress, False)
+            self._finish(page, on_error, e)
+            return False
+        return True
+
+    def _run(self, page, session, work, on_done, on_error, busy, progress):
+        try:
+            result = work()
+        except Exception as e:
+            callback, value = on_error, e
+            if on_error is None:
+                traceback.print_exc()
+        else:
+            callback, value = on_done, result
+        finally:
+            self._release(session)
+        self._set_busy(busy, progress, False)
+        self._finish(page, callback, value)
+
+    def later(self, page, delay, callback):
+        """
+        Call callback() after `delay` seconds without blocking the caller,
+        then update the page once (the non-blocking time.sleep() + action).
+
+        Returns:
+            threading.Timer: Cancel it to drop the callback
+        """
+        timer = threading.Timer(delay, self._finish, (page, lambda _: callback(), None))
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    @staticmethod
+    def _set_busy(busy, progress, running):
+        for control in busy:
+            control.disabled = running
+        if progress is not None:
+            progress.visible = running
+
+    def _finish(self, page, callback, value):
+        try:
+            if callback is not None:
+                callback(value)
+        except Exception:
+            traceback.print_exc()
+        finally:
+            self._update(page)
+
+    @staticmethod
+    def _update(page):
+        try:
+            page.update()
+        except Exception:
+            pass  # Session already closed
+
+
+# Shared by all sessions
+tasks = TaskRunner()
@@ -2,12 +2,134 @@
 WebSocket Client for Real-Time Updates
 ======================================
 Connects to the WebSocket server and handles real-time messages
+
+Features:
+- Reconnects automatically with jittered exponential backoff
+- Ping/pong heartbeats detect half-open connections
+- send() calls made while disconnected are queued and flushed on reconnect
+- Connection-state callbacks ("connecting", "connected", "disconnected")
+- Listeners and topics registered per Flet session, dropped when it ends
+- Listeners run on a bounded worker pool, in order within each session, so
+  a slow page.update() in one session does not hold up the others
+- Events sent from this process reach its own sessions directly; the
+  server is only needed to reach other processes (their echo is skipped)
+- Speaks the compact binary protocol when the server supports it
+  (WS_PROTOCOL=json forces readable JSON frames for debugging)
+- Authenticates as the app's "service" identity when WS_TOKEN_SECRET is
+  set, with a fresh short-lived token on every (re)connect
+- Asks for missed events on reconnect; when the server cannot replay them
+  it sends "resync_required" to every listening session, which reloads
+  its data from the database
 """
 
 import asyncio
 import websockets
 import json
+import os
+import random
 import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from websocket import auth, protocol
+
+# Reconnect backoff: first retry after up to BASE seconds, doubling up to MAX
+RECONNECT_BASE_DELAY = 0.5
+RECONNECT_MAX_DELAY = 30
+# Heartbeat: ping this often, drop the connection if no pong within the timeout
+HEARTBEAT_INTERVAL = 20
+HEARTBEAT_TIMEOUT = 10
+# Messages kept while disconnected (oldest dropped first)
+OUTBOUND_QUEUE_LIMIT = 500
+
+# Preferred wire format: "binary" (falls back to JSON on older servers) or "json"
+WS_PROTOCOL = os.getenv("WS_PROTOCOL", "binary")
+
+# Threads running listener callbacks (shared by all sessions)
+DISPATCH_WORKERS = 4
+# Events waiting per session before the oldest is dropped
+DISPATCH_QUEUE_LIMIT = 100
+
+# Connection states reported to state callbacks
+STATE_CONNECTING = "connecting"
+STATE_CONNECTED = "connected"
+STATE_DISCONNECTED = "disconnected"
+
+
+class ListenerRegistry:
+    """
+    Event listeners grouped by session (None for process-wide listeners).
+
+    Registering a function again from the same session replaces the earlier
+    registration (matched by its qualified name), so a view rebuilt on every
+    refresh does not pile up copies of its handler.
+    """
+    
+    def __init__(self, max_workers=DISPATCH_WORKERS, queue_limit=DISPATCH_QUEUE_LIMIT):
+        self.lock = threading.Lock()
+        self.listeners = {}  # session -> event type -> {listener key: callback}
+        self.pending = {}  # session -> deque of (callback, data) waiting to run
+        self.running = set()  # Sessions with a drain task in the pool
+        self.queue_limit = queue_limit
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="realtime-dispatch")
+    
+    @staticmethod
+    def _key(callback):
+        return getattr(callback, "__module__", None), getattr(callback, "__qualname__", id(callback))
+    
+    def add(self, session, event_type, callback):
+        with self.lock:
+            by_type = self.listeners.setdefault(session, {}).setdefault(event_type, {})
+            by_type[self._key(callback)] = callback
+    
+    def remove(self, session, event_type, callback=None):
+        """Remove one listener, or all of a session's listeners for event_type"""
+        with self.lock:
+            by_type = self.listeners.get(session, {})
+            if callback is None:
+                by_type.pop(event_type, None)
+            else:
+                by_type.get(event_type, {}).pop(self._key(callback), None)
+    
+    def remove_session(self, session):
+        """Forget a session's listeners and any events still queued for it"""
+        with self.lock:
+            self.listeners.pop(session, None)
+            self.pending.pop(session, None)
+    
+    def dispatch(self, event_type, data, sessions=None):
+        """
+        Queue the event for every session listening to it (never blocks on callbacks).
+        `sessions` limits delivery to those sessions (None: all).
+        """
+        with self.lock:
+            for session, by_type in self.listeners.items():
+                if sessions is not None and session not in sessions:
+                    continue
+                callbacks = by_type.get(event_type)
+                if not callbacks:
+                    continue
+                queue = self.pending.setdefault(session, deque(maxlen=self.queue_limit))
+                queue.extend((callback, data) for callback in callbacks.values())
+                if session not in self.running:
+                    self.running.add(session)
+                    self.executor.submit(self._drain, session)
+    
+    def _drain(self, session):
+        """Run one session's queued callbacks in order on a pool thread"""
+        while True:
+            with self.lock:
+                queue = self.pending.get(session)
+                if not queue:
+                    self.pending.pop(session, None)
+                    self.running.discard(session)
+                    return
+                callback, data = queue.popleft()
+            try:
+                callback(data)
+            except Exception as e:
+                print(f"Realtime listener for {data.get('type')} failed: {e}")
 
 
 class RealtimeClient:
@@ -17,16 +139,87 @@ class RealtimeClient:
         self.url = url
         self.websocket = None
         self.connected = False
-        self.callbacks = {}  # Event type -> callback function
+        self.listeners = ListenerRegistry()
+        self.session_topics = {}  # Session -> topics it subscribed to
+        self.topics_lock = threading.Lock()
+        self.topics = set()  # Topics to (re)subscribe to on connect (union of all sessions)
+        self.last_seq = None  # Last server sequence number seen (for replay)
+        self.epoch = None  # Server epoch last_seq belongs to
+        self.origin = uuid.uuid4().hex[:12]  # Marks this process's own events
+        self.state = STATE_DISCONNECTED
+        self.state_callbacks = []
+        self.binary = False  # Binary protocol negotiated on the current connection
+        self.outbound = deque(maxlen=OUTBOUND_QUEUE_LIMIT)  # Messages sent while disconnected
+        self.outbound_lock = threading.Lock()
+        self.stopping = False
+        self.task = None
         self.loop = None
         self.thread = None
     
-    def on(self, event_type, callback):
-        """Register a callback for an event type"""
-        self.callbacks[event_type] = callback
+    def on(self, event_type, callback, session=None):
+        """
+        Register a listener for an event type.
+        
+        Pass session=page.session_id from views so the listener is removed
+        with end_session() when that browser session goes away.
+        """
+        self.listeners.add(session, event_type, callback)
+    
+    def off(self, event_type, callback=None, session=None):
+        """Remove a listener (or all of a session's listeners for event_type)"""
+        self.listeners.remove(session, event_type, callback)
+    
+    def on_state_change(self, callback):
+        """Register callback(state) for "connecting", "connected" and "disconnected" """
+        self.state_callbacks.append(callback)
+    
+    def _set_state(self, state):
+        if state == self.state:
+            return
+        self.state = state
+        self.connected = state == STATE_CONNECTED
+        for callback in list(self.state_callbacks):
+            try:
+                callback(state)
+            except Exception as e:
+                print(f"Realtime state callback failed: {e}")
+    
+    def subscribe(self, *topics, session=None):
+        """Receive events for the given topics (e.g. "user:5", "role:admin", "classroom:3")"""
+        with self.topics_lock:
+            self.session_topics.setdefault(session, set()).update(topics)
+            new_topics = set(topics) - self.topics
+            self.topics |= new_topics
+        # While disconnected, the resubscribe on connect covers them
+        if new_topics and self.connected:
+            self.send("subscribe", {"topics": sorted(new_topics)})
+    
+    def unsubscribe(self, *topics, session=None):
+        """Stop receiving events for the given topics (kept while another session needs them)"""
+        with self.topics_lock:
+            self.session_topics.get(session, set()).difference_update(topics)
+        self._release_topics(set(topics))
+    
+    def end_session(self, session):
+        """Drop a session's listeners and the topics only it was subscribed to"""
+        self.listeners.remove_session(session)
+        with self.topics_lock:
+            topics = self.session_topics.pop(session, set())
+        self._release_topics(topics)
+    
+    def _release_topics(self, topics):
+        with self.topics_lock:
+            still_needed = set().union(*self.session_topics.values())
+            unused = (topics & self.topics) - still_needed
+            self.topics -= unused
+        if unused and self.connected:
+            self.send("unsubscribe", {"topics": sorted(unused)})
     
     def connect(self):
-        """Connect to WebSocket server in background thread"""
+        """Connect to WebSocket server in background thread (no-op if already running)"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stopping = False
         self.thread = threading.Thread(target=self._run_loop, daemon=True)
         self.thread.start()
     
@@ -34,63 +227,188 @@ class RealtimeClient:
         """Run the async event loop in a separate thread"""
         self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
-        self.loop.run_until_complete(self._connect_and_listen())
+        self.task = self.loop.create_task(self._run_forever())
+        try:
+            self.loop.run_until_complete(self.task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.loop.close()
+    
+    async def _run_forever(self):
+        """Keep a connection open, reconnecting with backoff until disconnect()"""
+        attempt = 0
+        while not self.stopping:
+            self._set_state(STATE_CONNECTING)
+            try:
+                await self._connect_and_listen()
+            except (OSError, websockets.exceptions.WebSocketException) as e:
+                if attempt == 0:
+                    print(f"❌ WebSocket connection lost or refused ({e}). Retrying in the background.")
+            finally:
+                # A session that got going restarts the backoff from the bottom
+                if self.state == STATE_CONNECTED:
+                    attempt = 0
+                self.websocket = None
+                self._set_state(STATE_DISCONNECTED)
+            if self.stopping:
+                break
+            await asyncio.sleep(self._backoff_delay(attempt))
+            attempt += 1
+    
+    @staticmethod
+    def _backoff_delay(attempt):
+        """Full jitter: random delay up to the exponential cap for this attempt"""
+        cap = min(RECONNECT_MAX_DELAY, RECONNECT_BASE_DELAY * 2 ** attempt)
+        return random.uniform(0, cap)
     
     async def _connect_and_listen(self):
-        """Connect and listen for messages"""
-        try:
-            async with websockets.connect(self.url) as websocket:
-                self.websocket = websocket
-                self.connected = True
-                print(f"✅ Connected to WebSocket server: {self.url}")
-                
-                # Listen for messages
+        """Connect, resubscribe, flush queued sends and listen until the connection drops"""
+        if WS_PROTOCOL == "binary":
+            # Large binary frames are deflated once on the server and shared,
+            # so per-connection permessage-deflate would only add cost
+            subprotocols = [protocol.BINARY_SUBPROTOCOL, protocol.JSON_SUBPROTOCOL]
+            compression = None
+        else:
+            subprotocols = [protocol.JSON_SUBPROTOCOL]
+            compression = "deflate"
+        url = self.url
+        if auth.auth_enabled():
+            url = f"{self.url}?token={auth.sign_token('app', auth.SERVICE_ROLE)}"
+        async with websockets.connect(
+            url, ping_interval=HEARTBEAT_INTERVAL, ping_timeout=HEARTBEAT_TIMEOUT,
+            subprotocols=subprotocols, compression=compression
+        ) as websocket:
+            self.websocket = websocket
+            self.binary = websocket.subprotocol == protocol.BINARY_SUBPROTOCOL
+            print(f"✅ Connected to WebSocket server: {self.url}")
+            
+            # Subscriptions requested before the connection was up;
+            # after a reconnect, ask for the events missed meanwhile
+            with self.topics_lock:
+                topics = sorted(self.topics)
+            if topics or self.last_seq is not None:
+                await websocket.send(self._encode({
+                    "type": "subscribe",
+                    "payload": {"topics": topics, "last_seq": self.last_seq, "epoch": self.epoch}
+                }))
+            await self._flush_outbound()
+            self._set_state(STATE_CONNECTED)
+            
+            # Listen for messages (a missed pong ends this loop with ConnectionClosed)
+            try:
                 async for message in websocket:
                     await self._handle_message(message)
-                    
-        except ConnectionRefusedError:
-            print("❌ Could not connect to WebSocket server. Is it running?")
-            self.connected = False
-        except Exception as e:
-            print(f"❌ WebSocket error: {e}")
-            self.connected = False
+            except websockets.exceptions.ConnectionClosed:
+                pass
+    
+    async def _flush_outbound(self):
+        """Send messages queued while disconnected, oldest first"""
+        while True:
+            with self.outbound_lock:
+                if not self.outbound:
+                    # Later send() calls go straight out instead of queueing
+                    self.connected = True
+                    return
+                message = self.outbound.popleft()
+            await self.websocket.send(self._encode(message))
+    
+    def _encode(self, message):
+        """Serialize a message dict for the current connection's protocol"""
+        return protocol.encode(message) if self.binary else json.dumps(message)
     
     async def _handle_message(self, message):
         """Handle incoming message"""
         try:
-            data = json.loads(message)
-            event_type = data.get("type", "unknown")
-            
-            # Call the registered callback
-            if event_type in self.callbacks:
-                self.callbacks[event_type](data)
-            
-        except json.JSONDecodeError:
-            print(f"Invalid JSON received: {message}")
-    
-    def send(self, event_type, payload=None):
-        """Send a message to the server"""
-        if self.connected and self.loop:
-            message = {
-                "type": event_type,
-                "payload": payload or {}
-            }
-            asyncio.run_coroutine_threadsafe(
-                self._send_async(json.dumps(message)),
-                self.loop
-            )
+            data = protocol.decode(message) if isinstance(message, bytes) else json.loads(message)
+        except ValueError:
+            # json.JSONDecodeError and every binary decode failure are ValueErrors
+            data = None
+        if not isinstance(data, dict):
+            print(f"Invalid message received: {message[:80]!r}")
+            return
+        
+        # The server micro-batches high-frequency events into one frame
+        if data.get("type") == "batch":
+            for event in data.get("events", []):
+                self._dispatch(event)
+        else:
+            self._dispatch(data)
+    
+    def _dispatch(self, data):
+        """Hand one event to the listener pool"""
+        event_type = data.get("type")
+        if event_type == "welcome":
+            # A different epoch is answered with resync_required to our subscribe
+            if self.last_seq is None:
+                self.epoch = data.get("payload", {}).get("epoch")
+            return
+        if event_type == "resync_required":
+            # Continue from the server's numbering, not the stale one
+            payload = data.get("payload", {})
+            self.last_seq = payload.get("last_seq")
+            self.epoch = payload.get("epoch")
+        elif "seq" in data:
+            self.last_seq = max(self.last_seq or 0, data["seq"])
+        # Our own events were already delivered locally by send()
+        if data.get("origin") == self.origin:
+            return
+        self._deliver(data)
+    
+    def _deliver(self, data):
+        """Queue an event for the sessions subscribed to its topics"""
+        self.listeners.dispatch(data.get("type", "unknown"), data, self._sessions_for(data.get("topics")))
+    
+    def _sessions_for(self, topics):
+        """Sessions that should see an event for `topics` (None: everyone)"""
+        if not topics:
+            return None
+        topics = set(topics)
+        with self.topics_lock:
+            sessions = {session for session, subscribed in self.session_topics.items() if subscribed & topics}
+        # Process-wide listeners see every event this process receives
+        sessions.add(None)
+        return sessions
+    
+    def send(self, event_type, payload=None, topics=None):
+        """
+        Send a message to subscribers of `topics` (default: everyone).
+
+        Sessions in this process get it straight away without a socket round
+        trip. The server then fans it out to other processes; while
+        disconnected it is queued and sent after reconnecting.
+        """
+        message = {
+            "type": event_type,
+            "payload": payload or {},
+            "origin": self.origin
+        }
+        if topics:
+            message["topics"] = list(topics)
+        self._deliver(message)
+        with self.outbound_lock:
+            if not (self.connected and self.loop):
+                self.outbound.append(message)
+                return
+        asyncio.run_coroutine_threadsafe(self._send_async(message), self.loop)
+    
+    def _queue_outbound(self, message):
+        with self.outbound_lock:
+            self.outbound.append(message)
     
     async def _send_async(self, message):
-        """Async send"""
-        if self.websocket:
-            await self.websocket.send(message)
+        """Async send; requeue if the connection dropped meanwhile"""
+        try:
+            await self.websocket.send(self._encode(message))
+        except (AttributeError, websockets.exceptions.ConnectionClosed):
+            self._queue_outbound(message)
     
     def disconnect(self):
-        """Disconnect from server"""
-        self.connected = False
-        if self.loop:
-            self.loop.call_soon_threadsafe(self.loop.stop)
+        """Disconnect from server and stop reconnecting"""
+        self.stopping = True
+        if self.loop and self.task:
+            self.loop.call_soon_threadsafe(self.task.cancel)
 
 
 # Global client instance
-realtime = RealtimeClient()
\ No newline at end of file
+realtime = RealtimeClient()
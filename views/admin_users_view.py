@@ -1,6 +1,12 @@
+import threading
+
 import flet as ft
-from data.models import UserModel, ActivityLogModel
+from data.models import UserModel, ActivityLogModel, fold_user_counts, user_matches_directory
 from components.app_header import create_app_header
+from utils.tasks import tasks, TaskRejected
+
+# Wait this long after the last keystroke before searching
+SEARCH_DEBOUNCE_SECONDS = 0.3
 
 
 def show_admin_users(page, user_id, role, name):
@@ -18,11 +24,22 @@ def show_admin_users(page, user_id, role, name):
     # State variables
     current_filter = "all"  # all, admin, faculty, student, active, inactive
     search_query = ""
+    next_cursor = None  # Keyset cursor of the next directory page
+    shown_count = 0
+    counts = {}
+    shown_users = []  # Rows behind the cards in user_list_ref, same order
+    list_version = 0  # Bumped per reload, so pages of an older filter/search are dropped
+    search_timer = None
+    # Guards shown_users and the user cards: task callbacks change them on
+    # their own threads
+    lock = threading.RLock()
     
     # References for dynamic updates
     user_list_ref = ft.Ref[ft.Column]()
     search_field_ref = ft.Ref[ft.TextField]()
     filter_buttons_ref = ft.Ref[ft.Row]()
+    total_text_ref = ft.Ref[ft.Text]()
+    load_more_ref = ft.Ref[ft.TextButton]()
     
     def show_snackbar(message, is_error=False):
         """Show a snackbar notification"""
@@ -35,10 +52,6 @@ def show_admin_users(page, user_id, role, name):
         )
         page.update()
     
-    def refresh_panel():
-        """Refresh the user management panel"""
-        show_admin_users(page, user_id, role, name)
-    
     def back_to_dashboard(e):
         from views.dashboard_view import show_dashboard
         show_dashboard(page, user_id, role, name)
@@ -82,8 +95,10 @@ def show_admin_users(page, user_id, role, name):
         value="faculty"
     )
     create_status_text = ft.Text("", size=13)
+    create_progress = ft.ProgressBar(visible=False)
     
-    def close_create_modal(e):
+    def reset_create_modal():
+        """Close the create modal and clear its fields (no page update)"""
         create_user_modal.open = False
         # Clear fields
         new_email.value = ""
@@ -92,6 +107,9 @@ def show_admin_users(page, user_id, role, name):
         new_password.value = ""
         new_role.value = "faculty"
         create_status_text.value = ""
+    
+    def close_create_modal(e):
+        reset_create_modal()
         page.update()
     
     def handle_create_user(e):
@@ -103,62 +121,67 @@ def show_admin_users(page, user_id, role, name):
             page.update()
             return
         
-        # Check if email already exists
-        if UserModel.check_email_exists(new_email.value.strip()):
-            create_status_text.value = "✗ Email already exists"
-            create_status_text.color = ft.Colors.RED
-            page.update()
-            return
-        
-        # Check if ID number already exists
-        if UserModel.check_id_number_exists(new_id_number.value.strip()):
-            create_status_text.value = "✗ ID Number already exists"
-            create_status_text.color = ft.Colors.RED
-            page.update()
-            return
+        email = new_email.value.strip()
+        id_number = new_id_number.value.strip()
+        full_name = new_full_name.value.strip()
+        password = new_password.value
+        new_user_role = new_role.value
         
-        # Create user
-        try:
+        def create():
+            """Duplicate checks, password hashing and insert (off the handler thread)"""
+            if UserModel.check_email_exists(email):
+                return "✗ Email already exists", None
+            if UserModel.check_id_number_exists(id_number):
+                return "✗ ID Number already exists", None
             new_user_id = UserModel.create_user(
-                email=new_email.value.strip(),
-                id_number=new_id_number.value.strip(),
-                password=new_password.value,
-                role=new_role.value,
-                full_name=new_full_name.value.strip()
+                email=email,
+                id_number=id_number,
+                password=password,
+                role=new_user_role,
+                full_name=full_name
             )
-            
-            if new_user_id:
-                # Log the action
-                ActivityLogModel.log_activity(
-                    user_id,
-                    "Created user",
-                    f"Created {new_role.value} account for {new_full_name.value.strip()}"
-                )
-                
-                create_status_text.value = "✓ User created successfully!"
-                create_status_text.color = ft.Colors.GREEN
-                page.update()
-                
-                # Close modal and refresh after brief delay
-                import time
-                time.sleep(1)
-                close_create_modal(e)
-                refresh_panel()
-            else:
-                create_status_text.value = "✗ Error creating user"
+            if not new_user_id:
+                return "✗ Error creating user", None
+            # Log the action
+            ActivityLogModel.log_activity(
+                user_id,
+                "Created user",
+                f"Created {new_user_role} account for {full_name}"
+            )
+            return None, UserModel.get_directory_user(new_user_id)
+        
+        def on_created(result):
+            error, new_user = result
+            if error:
+                create_status_text.value = error
                 create_status_text.color = ft.Colors.RED
-                page.update()
-                
-        except Exception as ex:
+                return
+            create_status_text.value = "✓ User created successfully!"
+            create_status_text.color = ft.Colors.GREEN
+            apply_user_change(None, new_user)
+            # Close modal after brief delay
+            tasks.later(page, 1, reset_create_modal)
+        
+        def on_failed(ex):
             create_status_text.value = f"✗ Error: {str(ex)}"
-            create_status_text.color = ft.Colors.RED
-            page.update()
+            create_status_text.color = ft.Colors.ORANGE if isinstance(ex, TaskRejected) else ft.Colors.RED
+        
+        tasks.run(page, create, on_created, on_failed, busy=[create_user_button], progress=create_progress)
+    
+    create_user_button = ft.ElevatedButton(
+        "Create User",
+        icon=ft.Icons.PERSON_ADD,
+        on_click=handle_create_user,
+        bgcolor="#3B82F6",
+        color=ft.Colors.WHITE,
+    )
     
     create_user_modal = ft.AlertDialog(
         modal=True,
         title=ft.Text("Create New User", weight=ft.FontWeight.BOLD),
         content=ft.Container(
             content=ft.Column([
+                create_progress,
                 create_status_text,
                 new_full_name,
                 new_email,
@@ -171,13 +194,7 @@ def show_admin_users(page, user_id, role, name):
         ),
         actions=[
             ft.TextButton("Cancel", on_click=close_create_modal),
-            ft.ElevatedButton(
-                "Create User",
-                icon=ft.Icons.PERSON_ADD,
-                on_click=handle_create_user,
-                bgcolor="#3B82F6",
-                color=ft.Colors.WHITE,
-            ),
+            create_user_button,
         ],
         actions_alignment=ft.MainAxisAlignment.END,
     )
@@ -199,50 +216,69 @@ def show_admin_users(page, user_id, role, name):
         ],
     )
     edit_status_text = ft.Text("", size=13)
+    edit_progress = ft.ProgressBar(visible=False)
     
-    def close_edit_modal(e):
+    def reset_edit_modal():
+        """Close the edit modal (no page update)"""
         edit_user_modal.open = False
         edit_status_text.value = ""
+    
+    def close_edit_modal(e):
+        reset_edit_modal()
         page.update()
     
     def handle_edit_user(e):
         """Handle user profile update"""
         target_user_id = int(edit_user_id.value)
+        full_name = edit_full_name.value.strip() if edit_full_name.value else None
+        email = edit_email.value.strip() if edit_email.value else None
+        new_user_role = edit_role.value
         
-        # Update profile fields
-        success, message = UserModel.update_user_profile(
-            target_user_id,
-            full_name=edit_full_name.value.strip() if edit_full_name.value else None,
-            email=edit_email.value.strip() if edit_email.value else None
-        )
-        
-        if not success and "No fields" not in message:
-            edit_status_text.value = f"✗ {message}"
-            edit_status_text.color = ft.Colors.RED
-            page.update()
-            return
-        
-        # Update role
-        role_success, role_message = UserModel.update_user_role(target_user_id, edit_role.value)
-        
-        if role_success or success:
+        def update():
+            """Profile and role updates (off the handler thread)"""
+            # Update profile fields
+            success, message = UserModel.update_user_profile(target_user_id, full_name=full_name, email=email)
+            if not success and "No fields" not in message:
+                return f"✗ {message}", None
+            
+            # Update role
+            role_success, role_message = UserModel.update_user_role(target_user_id, new_user_role)
+            if not (role_success or success):
+                return f"✗ {role_message}", None
+            
             ActivityLogModel.log_activity(
                 user_id,
                 "Updated user",
                 f"Updated user ID {target_user_id}"
             )
+            return None, UserModel.get_directory_user(target_user_id)
+        
+        def on_updated(result):
+            error, updated_user = result
+            if error:
+                edit_status_text.value = error
+                edit_status_text.color = ft.Colors.RED
+                return
             edit_status_text.value = "✓ User updated successfully!"
             edit_status_text.color = ft.Colors.GREEN
-            page.update()
-            
-            import time
-            time.sleep(1)
-            close_edit_modal(e)
-            refresh_panel()
-        else:
-            edit_status_text.value = f"✗ {role_message}"
-            edit_status_text.color = ft.Colors.RED
-            page.update()
+            with lock:
+                before = next((u for u in shown_users if u['id'] == target_user_id), None)
+                if before is not None:
+                    apply_user_change(before, updated_user)
+            tasks.later(page, 1, reset_edit_modal)
+        
+        def on_failed(ex):
+            edit_status_text.value = f"✗ Error: {str(ex)}"
+            edit_status_text.color = ft.Colors.ORANGE if isinstance(ex, TaskRejected) else ft.Colors.RED
+        
+        tasks.run(page, update, on_updated, on_failed, busy=[edit_save_button], progress=edit_progress)
+    
+    edit_save_button = ft.ElevatedButton(
+        "Save Changes",
+        on_click=handle_edit_user,
+        bgcolor="#3B82F6",
+        color=ft.Colors.WHITE,
+    )
     
     edit_user_modal = ft.AlertDialog(
         modal=True,
@@ -250,6 +286,7 @@ def show_admin_users(page, user_id, role, name):
         content=ft.Container(
             content=ft.Column([
                 edit_user_id,
+                edit_progress,
                 edit_status_text,
                 edit_full_name,
                 edit_email,
@@ -260,12 +297,7 @@ def show_admin_users(page, user_id, role, name):
         ),
         actions=[
             ft.TextButton("Cancel", on_click=close_edit_modal),
-            ft.ElevatedButton(
-                "Save Changes",
-                on_click=handle_edit_user,
-                bgcolor="#3B82F6",
-                color=ft.Colors.WHITE,
-            ),
+            edit_save_button,
         ],
         actions_alignment=ft.MainAxisAlignment.END,
     )
@@ -290,11 +322,16 @@ def show_admin_users(page, user_id, role, name):
         hint_text="Enter new password"
     )
     reset_status_text = ft.Text("", size=13)
+    reset_progress = ft.ProgressBar(visible=False)
     
-    def close_reset_modal(e):
+    def clear_reset_modal():
+        """Close the reset modal and clear it (no page update)"""
         reset_password_modal.open = False
         reset_new_password.value = ""
         reset_status_text.value = ""
+    
+    def close_reset_modal(e):
+        clear_reset_modal()
         page.update()
     
     def handle_reset_password(e):
@@ -306,31 +343,48 @@ def show_admin_users(page, user_id, role, name):
             return
         
         target_user_id = int(reset_user_id.value)
-        success, message = UserModel.admin_reset_password(target_user_id, reset_new_password.value)
+        password = reset_new_password.value
         
-        if success:
-            ActivityLogModel.log_activity(
-                user_id,
-                "Reset password",
-                f"Reset password for user ID {target_user_id}"
-            )
+        def reset():
+            """bcrypt hash and update (off the handler thread)"""
+            success, message = UserModel.admin_reset_password(target_user_id, password)
+            if success:
+                ActivityLogModel.log_activity(
+                    user_id,
+                    "Reset password",
+                    f"Reset password for user ID {target_user_id}"
+                )
+            return success, message
+        
+        def on_reset(result):
+            success, message = result
+            if not success:
+                reset_status_text.value = f"✗ {message}"
+                reset_status_text.color = ft.Colors.RED
+                return
             reset_status_text.value = "✓ Password reset successfully!"
             reset_status_text.color = ft.Colors.GREEN
-            page.update()
-            
-            import time
-            time.sleep(1.5)
-            close_reset_modal(e)
-        else:
-            reset_status_text.value = f"✗ {message}"
-            reset_status_text.color = ft.Colors.RED
-            page.update()
+            tasks.later(page, 1.5, clear_reset_modal)
+        
+        def on_failed(ex):
+            reset_status_text.value = f"✗ Error: {str(ex)}"
+            reset_status_text.color = ft.Colors.ORANGE if isinstance(ex, TaskRejected) else ft.Colors.RED
+        
+        tasks.run(page, reset, on_reset, on_failed, busy=[reset_button], progress=reset_progress)
+    
+    reset_button = ft.ElevatedButton(
+        "Reset Password",
+        on_click=handle_reset_password,
+        bgcolor=ft.Colors.ORANGE,
+        color=ft.Colors.WHITE,
+    )
     
     reset_password_modal = ft.AlertDialog(
         modal=True,
         title=ft.Text("Reset User Password", weight=ft.FontWeight.BOLD),
         content=ft.Container(
             content=ft.Column([
+                reset_progress,
                 reset_status_text,
                 reset_user_name,
                 ft.Divider(),
@@ -341,12 +395,7 @@ def show_admin_users(page, user_id, role, name):
         ),
         actions=[
             ft.TextButton("Cancel", on_click=close_reset_modal),
-            ft.ElevatedButton(
-                "Reset Password",
-                on_click=handle_reset_password,
-                bgcolor=ft.Colors.ORANGE,
-                color=ft.Colors.WHITE,
-            ),
+            reset_button,
         ],
         actions_alignment=ft.MainAxisAlignment.END,
     )
@@ -377,20 +426,38 @@ def show_admin_users(page, user_id, role, name):
             close_delete_modal(e)
             return
         
-        success, message = UserModel.delete_user(target_user_id)
+        def delete():
+            success, message = UserModel.delete_user(target_user_id)
+            if success:
+                ActivityLogModel.log_activity(
+                    user_id,
+                    "Deleted user",
+                    f"Deleted user ID {target_user_id}"
+                )
+            return success, message
         
-        if success:
-            ActivityLogModel.log_activity(
-                user_id,
-                "Deleted user",
-                f"Deleted user ID {target_user_id}"
-            )
-            close_delete_modal(e)
-            show_snackbar(message)
-            refresh_panel()
-        else:
-            show_snackbar(message, is_error=True)
-            close_delete_modal(e)
+        def on_deleted(result):
+            success, message = result
+            delete_confirm_modal.open = False
+            if success:
+                with lock:
+                    before = next((u for u in shown_users if u['id'] == target_user_id), None)
+                    if before is not None:
+                        apply_user_change(before, None)
+            show_snackbar(message, is_error=not success)
+        
+        def on_failed(ex):
+            delete_confirm_modal.open = False
+            show_snackbar(str(ex), is_error=True)
+        
+        tasks.run(page, delete, on_deleted, on_failed, busy=[delete_button])
+    
+    delete_button = ft.ElevatedButton(
+        "Delete User",
+        on_click=handle_delete_user,
+        bgcolor=ft.Colors.RED,
+        color=ft.Colors.WHITE,
+    )
     
     delete_confirm_modal = ft.AlertDialog(
         modal=True,
@@ -415,12 +482,7 @@ def show_admin_users(page, user_id, role, name):
         ),
         actions=[
             ft.TextButton("Cancel", on_click=close_delete_modal),
-            ft.ElevatedButton(
-                "Delete User",
-                on_click=handle_delete_user,
-                bgcolor=ft.Colors.RED,
-                color=ft.Colors.WHITE,
-            ),
+            delete_button,
         ],
         actions_alignment=ft.MainAxisAlignment.END,
     )
@@ -439,19 +501,24 @@ def show_admin_users(page, user_id, role, name):
             show_snackbar("You cannot deactivate your own account!", is_error=True)
             return
         
-        success, message = UserModel.toggle_user_status(user['id'])
+        def toggle():
+            success, message = UserModel.toggle_user_status(user['id'])
+            if success:
+                action = "Deactivated" if user['is_active'] else "Activated"
+                ActivityLogModel.log_activity(
+                    user_id,
+                    f"{action} user",
+                    f"{action} user: {user['full_name']}"
+                )
+            return success, message
         
-        if success:
-            action = "Deactivated" if user['is_active'] else "Activated"
-            ActivityLogModel.log_activity(
-                user_id,
-                f"{action} user",
-                f"{action} user: {user['full_name']}"
-            )
-            show_snackbar(message)
-            refresh_panel()
-        else:
-            show_snackbar(message, is_error=True)
+        def on_toggled(result):
+            success, message = result
+            if success:
+                apply_user_change(user, dict(user, is_active=not user['is_active']))
+            show_snackbar(message, is_error=not success)
+        
+        tasks.run(page, toggle, on_toggled, lambda ex: show_snackbar(str(ex), is_error=True))
     
     # ==================== USER CARD ====================
     def create_user_card(user):
@@ -564,42 +631,33 @@ def show_admin_users(page, user_id, role, name):
         )
     
     # ==================== FILTER & SEARCH ====================
-    def get_filtered_users():
-        """Get users based on current filter and search"""
-        # Get all users first
-        if current_filter == "all":
-            users = UserModel.get_all_users()
-        elif current_filter in ['admin', 'faculty', 'student']:
-            users = UserModel.get_users_by_role(current_filter)
-        elif current_filter == "active":
-            users = [u for u in UserModel.get_all_users() if u['is_active']]
-        elif current_filter == "inactive":
-            users = [u for u in UserModel.get_all_users() if not u['is_active']]
-        else:
-            users = UserModel.get_all_users()
-        
-        # Apply search filter
+    def set_first_page(result):
+        """Take a fetched first page and its filter counts as the panel state"""
+        nonlocal next_cursor, shown_count, counts, shown_users
+        next_cursor = result["next"]
+        shown_users = list(result["users"])
+        shown_count = len(shown_users)
+        counts = result["counts"]
+        return result["users"]
+    
+    def total_label():
+        """Text for the count line under the filters"""
+        more = "+" if next_cursor else ""
         if search_query:
-            query_lower = search_query.lower()
-            users = [u for u in users if 
-                     query_lower in u['full_name'].lower() or 
-                     query_lower in u['email'].lower() or 
-                     query_lower in u['id_number'].lower()]
-        
-        return users
-    
-    def get_user_counts():
-        """Get counts for each filter category"""
-        all_users = UserModel.get_all_users()
-        counts = {
-            'all': len(all_users),
-            'active': len([u for u in all_users if u['is_active']]),
-            'inactive': len([u for u in all_users if not u['is_active']]),
-            'admin': len([u for u in all_users if u['role'] == 'admin']),
-            'faculty': len([u for u in all_users if u['role'] == 'faculty']),
-            'student': len([u for u in all_users if u['role'] == 'student']),
-        }
-        return counts
+            return f"{shown_count}{more} matching user(s)"
+        return f"Showing {shown_count} of {counts.get(current_filter, 0)} user(s)"
+    
+    def create_no_users():
+        """Empty state for a filter/search with no matches"""
+        return ft.Container(
+            content=ft.Column([
+                ft.Icon(ft.Icons.PERSON_OFF, size=64, color=ft.Colors.GREY_400),
+                ft.Text("No users found", size=18, color=ft.Colors.GREY_600),
+                ft.Text("Try adjusting your filters", size=14, color=ft.Colors.GREY_500),
+            ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=10),
+            padding=40,
+            alignment=ft.alignment.center,
+        )
     
     def create_filter_button(label, filter_value, count):
         """Create a filter button with count"""
@@ -619,22 +677,67 @@ def show_admin_users(page, user_id, role, name):
         """Handle filter button click"""
         nonlocal current_filter
         current_filter = filter_value
-        update_filter_buttons()
         update_user_list()
     
-    def update_filter_buttons():
-        """Update filter buttons appearance"""
-        counts = get_user_counts()
-        filter_buttons_ref.current.controls = [
+    filter_labels = [
+        ("All Users", "all"),
+        ("Active", "active"),
+        ("Inactive", "inactive"),
+        ("Admin", "admin"),
+        ("Faculty", "faculty"),
+        ("Student", "student"),
+    ]
+    
+    def create_filter_buttons():
+        """Filter buttons labelled with the current counts"""
+        return [
             ft.Text("Filter by:", size=14, color=ft.Colors.GREY_700, weight=ft.FontWeight.BOLD),
-            create_filter_button("All Users", "all", counts['all']),
-            create_filter_button("Active", "active", counts['active']),
-            create_filter_button("Inactive", "inactive", counts['inactive']),
-            create_filter_button("Admin", "admin", counts['admin']),
-            create_filter_button("Faculty", "faculty", counts['faculty']),
-            create_filter_button("Student", "student", counts['student']),
-        ]
-        page.update()
+        ] + [create_filter_button(label, value, counts.get(value, 0)) for label, value in filter_labels]
+    
+    def update_filter_counts():
+        """Relabel the existing filter buttons (no new controls)"""
+        for button, (label, value) in zip(filter_buttons_ref.current.controls[1:], filter_labels):
+            button.text = f"{label} ({counts.get(value, 0)})"
+    
+    def apply_user_change(before, after):
+        """
+        Apply one user change to the panel in place: counts, the count line
+        and the one affected card. `before` is None for a created user and
+        `after` is None for a deleted one. The caller sends the page update.
+        """
+        nonlocal shown_count
+        with lock:
+            if user_list_ref.current is None or user_list_ref.current.page is None:
+                return
+            for row, sign in ((before, -1), (after, 1)):
+                if row is not None:
+                    for key, n in fold_user_counts([dict(row, count=1)]).items():
+                        counts[key] = counts.get(key, 0) + sign * n
+        
+            controls = user_list_ref.current.controls
+            index = None
+            if before is not None:
+                index = next((i for i, u in enumerate(shown_users) if u['id'] == before['id']), None)
+            visible = after is not None and user_matches_directory(after, current_filter, search_query)
+            if index is not None and visible:
+                shown_users[index] = after
+                controls[index] = create_user_card(after)
+            elif index is not None:
+                del shown_users[index]
+                del controls[index]
+                shown_count -= 1
+            elif before is None and visible:
+                # Newest user: goes on top
+                if not shown_users:
+                    controls.clear()  # Drop the empty state
+                shown_users.insert(0, after)
+                controls.insert(0, create_user_card(after))
+                shown_count += 1
+            if not shown_users and not controls:
+                controls.append(create_no_users())
+        
+            update_filter_counts()
+            total_text_ref.current.value = total_label()
     
     def on_filter_change(e):
         nonlocal current_filter
@@ -642,32 +745,63 @@ def show_admin_users(page, user_id, role, name):
         update_user_list()
     
     def on_search_change(e):
-        nonlocal search_query
+        """Search once typing pauses, not on every keystroke"""
+        nonlocal search_query, search_timer
         search_query = e.control.value
-        update_user_list()
+        if search_timer is not None:
+            search_timer.cancel()
+        search_timer = tasks.later(page, SEARCH_DEBOUNCE_SECONDS, update_user_list)
+    
+    def on_list_failed(ex):
+        show_snackbar(f"Could not load users: {ex}", is_error=True)
     
     def update_user_list():
-        """Update the user list display"""
-        users = get_filtered_users()
-        
-        if users:
-            user_list_ref.current.controls = [create_user_card(u) for u in users]
-        else:
-            user_list_ref.current.controls = [
-                ft.Container(
-                    content=ft.Column([
-                        ft.Icon(ft.Icons.PERSON_OFF, size=64, color=ft.Colors.GREY_400),
-                        ft.Text("No users found", size=18, color=ft.Colors.GREY_600),
-                        ft.Text("Try adjusting your filters", size=14, color=ft.Colors.GREY_500),
-                    ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=10),
-                    padding=40,
-                    alignment=ft.alignment.center,
-                )
-            ]
-        page.update()
+        """Reload the first page, the filter counts and the count line in the background"""
+        nonlocal list_version
+        if user_list_ref.current is None or user_list_ref.current.page is None:
+            return
+        with lock:
+            list_version += 1
+            version = list_version
+        filter_value, query = current_filter, search_query
+        
+        def on_loaded(result):
+            with lock:
+                if version != list_version or user_list_ref.current.page is None:
+                    return  # A newer filter/search took over
+                users = set_first_page(result)
+                user_list_ref.current.controls = [create_user_card(u) for u in users] if users else [create_no_users()]
+                filter_buttons_ref.current.controls = create_filter_buttons()
+                total_text_ref.current.value = total_label()
+                load_more_ref.current.visible = next_cursor is not None
+        
+        tasks.run(page, lambda: UserModel.directory(filter_value, query), on_loaded, on_list_failed)
     
-    # Get initial user list
-    users = get_filtered_users()
+    def load_more(e):
+        """Append the next page after the last card shown (in the background)"""
+        if next_cursor is None or user_list_ref.current is None or user_list_ref.current.page is None:
+            return
+        with lock:
+            version, cursor = list_version, next_cursor
+        filter_value, query = current_filter, search_query
+        
+        def on_loaded(result):
+            nonlocal next_cursor, shown_count
+            with lock:
+                if version != list_version or cursor != next_cursor or user_list_ref.current.page is None:
+                    return  # Reloaded meanwhile, or this page is already shown
+                next_cursor = result["next"]
+                shown_users.extend(result["users"])
+                shown_count += len(result["users"])
+                user_list_ref.current.controls.extend(create_user_card(u) for u in result["users"])
+                total_text_ref.current.value = total_label()
+                load_more_ref.current.visible = next_cursor is not None
+        
+        tasks.run(page, lambda: UserModel.directory(filter_value, query, after=cursor), on_loaded, on_list_failed,
+                  busy=[load_more_ref.current])
+    
+    # Initial page: one page query plus one grouped count query
+    users = set_first_page(UserModel.directory(current_filter, search_query))
     user_cards = [create_user_card(u) for u in users] if users else [
         ft.Container(
             content=ft.Text("No users found", color=ft.Colors.GREY),
@@ -695,7 +829,7 @@ def show_admin_users(page, user_id, role, name):
                     ft.Row([
                         ft.TextField(
                             ref=search_field_ref,
-                            hint_text="Search by Name, Email, or ID Number",
+                            hint_text="Search by Name, Email, or ID Number (starts with)",
                             prefix_icon=ft.Icons.SEARCH,
                             on_change=on_search_change,
                             border_color="#C3C3C3",
@@ -725,15 +859,7 @@ def show_admin_users(page, user_id, role, name):
                     ft.Container(
                         content=ft.Row(
                             ref=filter_buttons_ref,
-                            controls=[
-                                ft.Text("Filter by:", size=14, color=ft.Colors.GREY_700, weight=ft.FontWeight.BOLD),
-                                create_filter_button("All Users", "all", len(users)),
-                                create_filter_button("Active", "active", len([u for u in UserModel.get_all_users() if u['is_active']])),
-                                create_filter_button("Inactive", "inactive", len([u for u in UserModel.get_all_users() if not u['is_active']])),
-                                create_filter_button("Admin", "admin", len([u for u in UserModel.get_all_users() if u['role'] == 'admin'])),
-                                create_filter_button("Faculty", "faculty", len([u for u in UserModel.get_all_users() if u['role'] == 'faculty'])),
-                                create_filter_button("Student", "student", len([u for u in UserModel.get_all_users() if u['role'] == 'student'])),
-                            ],
+                            controls=create_filter_buttons(),
                             spacing=20,
                             wrap=True,
                         ),
@@ -743,7 +869,7 @@ def show_admin_users(page, user_id, role, name):
                     ft.Container(height=5),
                     
                     # Total users count
-                    ft.Text(f"Total: {len(users)} user(s)", color=ft.Colors.GREY_600, size=14),
+                    ft.Text(total_label(), ref=total_text_ref, color=ft.Colors.GREY_600, size=14),
                     
                     ft.Container(height=5),
                     
@@ -759,6 +885,17 @@ def show_admin_users(page, user_id, role, name):
                         expand=True,
                         alignment=ft.alignment.top_center,
                     ),
+
+                    # Next directory page
+                    ft.Row([
+                        ft.TextButton(
+                            ref=load_more_ref,
+                            text="Load more",
+                            icon=ft.Icons.EXPAND_MORE,
+                            on_click=load_more,
+                            visible=next_cursor is not None,
+                        ),
+                    ], alignment=ft.MainAxisAlignment.CENTER),
                 ], spacing=10),
                 padding=20,
                 expand=True,
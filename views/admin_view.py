@@ -1,7 +1,11 @@
+import threading
+
 import flet as ft
 from utils.config import ICONS, COLORS
 from data.models import ReservationModel, ActivityLogModel
 from components.app_header import create_app_header
+from components.paged_list import PagedList
+from utils.tasks import tasks
 from utils.security import ensure_authenticated, get_csrf_token, touch_session
 
 
@@ -33,20 +37,56 @@ def show_admin_panel(page, user_id, role, name):
     # Optional CSRF token if you will use it in handlers later
     # csrf_token = get_csrf_token(page)
     
+    # Guards the tab lists, status_counts and deciding: task callbacks and
+    # realtime events change them on their own threads
+    lock = threading.RLock()
+    
     if REALTIME_ENABLED:
         def on_new_reservation(data):
-            """Handle new reservation event"""
+            """Handle new reservation event: add its card to Pending in place"""
+            if tabs.page is None:
+                return  # Panel no longer on screen
+            reservation_id = data['payload'].get('reservation_id')
+            
+            def on_loaded(res):
+                if tabs.page is None or not res or res["status"] != "pending":
+                    return
+                with lock:
+                    if tab_lists["pending"].index_of(reservation_id) is None:
+                        tab_lists["pending"].insert(res)
+                        status_counts["pending"] = status_counts.get("pending", 0) + 1
+                        update_tab_labels()
+            
             page.open(ft.SnackBar(
                 content=ft.Text(f"🔔 {data['payload'].get('message', 'New reservation!')}"),
                 bgcolor=ft.Colors.BLUE,
                 duration=4000
             ))
-            page.update()
-            # Auto-refresh the panel
-            refresh_panel()
+            tasks.run(page, lambda: ReservationModel.get_reservation_details(reservation_id), on_loaded)
+        
+        def on_resync(data):
+            """Missed events could not be replayed: reload counts and loaded tabs"""
+            if tabs.page is None:
+                return
+            
+            def on_counts(counts):
+                if tabs.page is None:
+                    return
+                with lock:
+                    status_counts.clear()
+                    status_counts.update(counts)
+                    for tab_list in tab_lists.values():
+                        tab_list.reset()
+                    update_tab_labels()
+                # Other tabs reload when they are opened
+                tab_lists[tab_specs[tabs.selected_index][1]].load_first_page(background=True)
+            
+            tasks.run(page, ReservationModel.get_status_counts, on_counts)
         
         # Register callback and connect
-        realtime.on("new_reservation", on_new_reservation)
+        realtime.on("new_reservation", on_new_reservation, session=page.session_id)
+        realtime.on("resync_required", on_resync, session=page.session_id)
+        realtime.subscribe("role:admin", session=page.session_id)
         if not realtime.connected:
             realtime.connect()
     
@@ -54,35 +94,57 @@ def show_admin_panel(page, user_id, role, name):
         from views.dashboard_view import show_dashboard
         show_dashboard(page, user_id, role, name)
     
-    def refresh_panel():
-        """Refresh the admin panel to show updated data"""
-        show_admin_panel(page, user_id, role, name)
+    def move_reservation(res, new_status):
+        """Move one card to another tab and fix both counts (no page update)"""
+        with lock:
+            tab_lists[res["status"]].remove(res["id"])
+            status_counts[res["status"]] = max(status_counts.get(res["status"], 0) - 1, 0)
+            tab_lists[new_status].insert(dict(res, status=new_status))
+            status_counts[new_status] = status_counts.get(new_status, 0) + 1
+            update_tab_labels()
     
-    def handle_approve(reservation_id, room_name, requester):
-        ReservationModel.approve_reservation(reservation_id)
-        ActivityLogModel.log_activity(
-            user_id, 
-            "Approved reservation", 
-            f"Approved {room_name} reservation by {requester}"
-        )
-        refresh_panel()
-    
-    def handle_reject(reservation_id, room_name, requester):
-        ReservationModel.reject_reservation(reservation_id)
-        ActivityLogModel.log_activity(
-            user_id, 
-            "Rejected reservation", 
-            f"Rejected {room_name} reservation by {requester}"
-        )
-        refresh_panel()
+    deciding = set()  # Reservation ids with an approve/reject in flight
     
-    # Get all reservations from database
-    reservations = ReservationModel.get_all_reservations()
-    pending = [r for r in reservations if r["status"] == "pending"]
-    approved = [r for r in reservations if r["status"] == "approved"]
-    ongoing = [r for r in reservations if r["status"] == "ongoing"]
-    done = [r for r in reservations if r["status"] == "done"]
-    rejected = [r for r in reservations if r["status"] == "rejected"]
+    def decide(res, new_status, model_call, action):
+        """Approve/reject in the background; the card moves when it is done"""
+        with lock:
+            if res["id"] in deciding or tab_lists["pending"].index_of(res["id"]) is None:
+                return  # Already handled (double click)
+            deciding.add(res["id"])
+        
+        def work():
+            if not model_call(res["id"], admin_id=user_id):
+                return False  # Decided elsewhere meanwhile
+            ActivityLogModel.log_activity(
+                user_id, 
+                f"{action} reservation", 
+                f"{action} {res['room_name']} reservation by {res['full_name']}"
+            )
+            return True
+        
+        def on_done(changed):
+            with lock:
+                deciding.discard(res["id"])
+                if tabs.page is not None and changed:
+                    move_reservation(res, new_status)
+            if not changed:
+                page.open(ft.SnackBar(content=ft.Text("This reservation was already decided"), bgcolor=ft.Colors.ORANGE))
+        
+        def on_failed(ex):
+            with lock:
+                deciding.discard(res["id"])
+            page.open(ft.SnackBar(content=ft.Text(f"Could not update reservation: {ex}"), bgcolor=ft.Colors.RED))
+        
+        tasks.run(page, work, on_done, on_failed)
+    
+    def handle_approve(res):
+        decide(res, "approved", ReservationModel.approve_reservation, "Approved")
+    
+    def handle_reject(res):
+        decide(res, "rejected", ReservationModel.reject_reservation, "Rejected")
+    
+    # Tab counts from one grouped query; rows are paged in per tab
+    status_counts = ReservationModel.get_status_counts()
     
     def create_reservation_card(res, show_actions=True):
         """Create a reservation card with optional approve/reject buttons"""
@@ -138,14 +200,14 @@ def show_admin_panel(page, user_id, role, name):
                         color="white", width=120,
                         bgcolor="#10B981",
                         style=ft.ButtonStyle(shape=ft.RoundedRectangleBorder(radius=16)),
-                        on_click=lambda e, rid=res["id"], rn=res["room_name"], req=res["full_name"]: handle_approve(rid, rn, req)
+                        on_click=lambda e, r=res: handle_approve(r)
                     ),
                     ft.ElevatedButton(
                         "Reject",
                         color="white", width=120,
                         bgcolor="#EF4444",
                         style=ft.ButtonStyle(shape=ft.RoundedRectangleBorder(radius=16)),
-                        on_click=lambda e, rid=res["id"], rn=res["room_name"], req=res["full_name"]: handle_reject(rid, rn, req)
+                        on_click=lambda e, r=res: handle_reject(r)
                     )
                 ], spacing=40, tight=True),
                 padding=ft.padding.all(50)
@@ -172,51 +234,56 @@ def show_admin_panel(page, user_id, role, name):
             elevation=2
         )
 
-    def create_scrollable_tab_content(reservation_list, empty_message):
-        """Create scrollable content for a tab"""
-        if reservation_list:
-            return ft.Container(
-                content=ft.Column(
-                    [create_reservation_card(r, show_actions=(r["status"] == "pending")) for r in reservation_list],
-                    spacing=10,
-                    scroll=ft.ScrollMode.AUTO,
-                ),
-                padding=10,
-                expand=True,
-            )
-        else:
-            return ft.Container(
+    def create_scrollable_tab_content(status, empty_message):
+        """Create a lazily paged list of the reservations with a status"""
+        return PagedList(
+            page,
+            load_page=lambda after: ReservationModel.get_reservations_page(status, after),
+            build_item=lambda r: create_reservation_card(r, show_actions=(r["status"] == "pending")),
+            empty_content=ft.Container(
                 content=ft.Text(empty_message, color=COLORS.GREY if hasattr(COLORS, "GREY") else "grey"),
                 padding=20,
                 expand=True,
-            )
+            ),
+            key_columns=("created_at", "id"),
+            lock=lock,
+        )
+    
+    tab_specs = [
+        ("Pending", "pending", "No pending reservations"),
+        ("Approved", "approved", "No approved reservations"),
+        ("Ongoing", "ongoing", "No ongoing reservations"),
+        ("Done", "done", "No completed reservations"),
+        ("Rejected", "rejected", "No rejected reservations"),
+    ]
+    # One paged list per status; actions and events edit them in place
+    tab_lists = {status: create_scrollable_tab_content(status, empty) for _, status, empty in tab_specs}
+    
+    def tab_label(label, status):
+        return f"{label} ({status_counts.get(status, 0)})"
+    
+    def update_tab_labels():
+        for tab, (label, status, _) in zip(tabs.tabs, tab_specs):
+            tab.text = tab_label(label, status)
+    
+    def on_tab_change(e):
+        """Fetch a tab's first page (in the background) the first time it is opened"""
+        tab_lists[tab_specs[e.control.selected_index][1]].load_first_page(background=True)
     
     tabs = ft.Tabs(
         selected_index=0,
         tabs=[
             ft.Tab(
-                text=f"Pending ({len(pending)})",
-                content=create_scrollable_tab_content(pending, "No pending reservations"),
-            ),
-            ft.Tab(
-                text=f"Approved ({len(approved)})",
-                content=create_scrollable_tab_content(approved, "No approved reservations"),
-            ),
-            ft.Tab(
-                text=f"Ongoing ({len(ongoing)})",
-                content=create_scrollable_tab_content(ongoing, "No ongoing reservations"),
-            ),
-            ft.Tab(
-                text=f"Done ({len(done)})",
-                content=create_scrollable_tab_content(done, "No completed reservations"),
-            ),
-            ft.Tab(
-                text=f"Rejected ({len(rejected)})",
-                content=create_scrollable_tab_content(rejected, "No rejected reservations"),
-            ),
+                text=tab_label(label, status),
+                content=tab_lists[status].container,
+            )
+            for label, status, _ in tab_specs
         ],
+        on_change=on_tab_change,
         expand=True
     )
+    # Only the tab on screen is loaded up front
+    tab_lists["pending"].load_first_page()
     
     page.controls.clear()
     page.add(
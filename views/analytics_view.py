@@ -4,11 +4,22 @@ Analytics Dashboard View
 Displays comprehensive data visualizations and insights for admin users
 """
 
+import os
 import flet as ft
 from utils.config import ICONS, COLORS
-from data.analytics import AnalyticsModel
+from data.analytics import AnalyticsModel, live_counters
+from data.export import ExportModel, PARQUET_ENABLED, download_url
+from data.forecast import forecast_service
 from components.app_header import create_app_header
 from utils.security import ensure_authenticated, get_csrf_token, touch_session
+from utils.tasks import tasks, TaskRejected
+
+# Import realtime client for live counter updates
+try:
+    from utils.websocket_client import realtime
+    REALTIME_ENABLED = True
+except ImportError:
+    REALTIME_ENABLED = False
 
 def show_analytics_dashboard(page, user_id, role, name):
     """Display analytics dashboard with charts and insights"""
@@ -35,6 +46,164 @@ def show_analytics_dashboard(page, user_id, role, name):
         """Refresh all analytics data"""
         show_analytics_dashboard(page, user_id, role, name)
     
+    # ==================== LIVE COUNTERS ====================
+    total_ref = ft.Ref[ft.Text]()
+    approved_ref = ft.Ref[ft.Text]()
+    pending_ref = ft.Ref[ft.Text]()
+    rejected_ref = ft.Ref[ft.Text]()
+    today_ref = ft.Ref[ft.Text]()
+    
+    if REALTIME_ENABLED:
+        def on_analytics_counters(data):
+            """Apply pushed counters to the status cards in place"""
+            counters = data.get('payload', {})
+            # Ignore pushes once the user has left this view
+            if total_ref.current is None or total_ref.current.page is None:
+                return
+            total_ref.current.value = str(counters.get('total', 0))
+            approved_ref.current.value = str(counters.get('approved', 0))
+            pending_ref.current.value = str(counters.get('pending', 0))
+            rejected_ref.current.value = str(counters.get('rejected', 0))
+            today_ref.current.value = f"{counters.get('today_bookings', 0)} booked today"
+            page.update()
+        
+        def on_resync(data):
+            """Counter pushes may have been missed: show the current counters"""
+            on_analytics_counters({'payload': live_counters.snapshot()})
+        
+        realtime.on("analytics_counters", on_analytics_counters, session=page.session_id)
+        realtime.on("resync_required", on_resync, session=page.session_id)
+        realtime.subscribe("role:admin", session=page.session_id)
+        if not realtime.connected:
+            realtime.connect()
+    
+    # ==================== EXPORT ====================
+    export_start_date = None
+    export_end_date = None
+    export_start_ref = ft.Ref[ft.OutlinedButton]()
+    export_end_ref = ft.Ref[ft.OutlinedButton]()
+    export_format_ref = ft.Ref[ft.Dropdown]()
+    export_status_ref = ft.Ref[ft.Text]()
+    
+    def handle_export_start_change(e):
+        nonlocal export_start_date
+        export_start_date = e.control.value.date() if e.control.value else None
+        export_start_ref.current.text = export_start_date.strftime('%m/%d/%Y') if export_start_date else "From"
+        page.update()
+    
+    def handle_export_end_change(e):
+        nonlocal export_end_date
+        export_end_date = e.control.value.date() if e.control.value else None
+        export_end_ref.current.text = export_end_date.strftime('%m/%d/%Y') if export_end_date else "To"
+        page.update()
+    
+    def open_export_date_picker(on_change):
+        page.open(ft.DatePicker(on_change=on_change))
+    
+    def clear_export_range(e):
+        nonlocal export_start_date, export_end_date
+        export_start_date = None
+        export_end_date = None
+        export_start_ref.current.text = "From"
+        export_end_ref.current.text = "To"
+        page.update()
+    
+    export_buttons = []
+    
+    def run_export(export_fn, label):
+        """Run an export in the background and report the written file"""
+        touch_session(page)
+        fmt = export_format_ref.current.value
+        start_date, end_date = export_start_date, export_end_date
+        export_status_ref.current.value = f"Exporting {label}..."
+        export_status_ref.current.color = "#6B7280"
+        
+        def on_exported(outcome):
+            if export_status_ref.current.page is None:
+                return
+            success, result, count = outcome
+            if success:
+                url = download_url(result)
+                export_status_ref.current.value = f"✓ Exported {count} row(s) - downloading {os.path.basename(result)}"
+                export_status_ref.current.color = "#10B981"
+                page.launch_url(url)
+            else:
+                export_status_ref.current.value = f"✗ {result}"
+                export_status_ref.current.color = "#EF4444"
+        
+        def on_failed(ex):
+            if export_status_ref.current.page is None:
+                return
+            export_status_ref.current.value = f"✗ {ex}"
+            export_status_ref.current.color = "#F59E0B" if isinstance(ex, TaskRejected) else "#EF4444"
+        
+        tasks.run(page, lambda: export_fn(start_date, end_date, fmt), on_exported, on_failed, busy=export_buttons)
+    
+    def create_export_button(text, icon, on_click):
+        button = ft.ElevatedButton(
+            text,
+            icon=icon,
+            on_click=on_click,
+            bgcolor="#3B82F6",
+            color="white",
+            style=ft.ButtonStyle(shape=ft.RoundedRectangleBorder(radius=8)),
+        )
+        export_buttons.append(button)
+        return button
+    
+    export_format_options = [ft.dropdown.Option("csv", "CSV")]
+    if PARQUET_ENABLED:
+        export_format_options.append(ft.dropdown.Option("parquet", "Parquet"))
+    
+    export_card = ft.Container(
+        content=ft.Column([
+            ft.Text("Export Data", size=16, weight=ft.FontWeight.BOLD),
+            ft.Text("Leave the range empty to export the full history", size=12, color="#6B7280"),
+            ft.Row([
+                ft.OutlinedButton(
+                    "From",
+                    ref=export_start_ref,
+                    icon=ICONS.CALENDAR_MONTH,
+                    on_click=lambda e: open_export_date_picker(handle_export_start_change),
+                ),
+                ft.OutlinedButton(
+                    "To",
+                    ref=export_end_ref,
+                    icon=ICONS.CALENDAR_MONTH,
+                    on_click=lambda e: open_export_date_picker(handle_export_end_change),
+                ),
+                ft.TextButton("Clear", on_click=clear_export_range),
+                ft.Dropdown(
+                    ref=export_format_ref,
+                    options=export_format_options,
+                    value="csv",
+                    width=130,
+                    dense=True,
+                ),
+            ], spacing=15),
+            ft.Row([
+                create_export_button(
+                    "Reservations", ICONS.EVENT_NOTE,
+                    lambda e: run_export(ExportModel.export_reservations, "reservations")
+                ),
+                create_export_button(
+                    "Activity Logs", ICONS.HISTORY,
+                    lambda e: run_export(ExportModel.export_activity_logs, "activity logs")
+                ),
+                create_export_button(
+                    "Analytics", ICONS.INSIGHTS,
+                    lambda e: run_export(ExportModel.export_analytics, "analytics")
+                ),
+            ], spacing=15),
+            ft.Text("", ref=export_status_ref, size=12),
+        ], spacing=12),
+        border=ft.border.all(1, "#E0E0E0"),
+        border_radius=10,
+        padding=15,
+        bgcolor="white",
+        width=850,
+    )
+    
     # Fetch analytics data
     summary = AnalyticsModel.get_reservation_summary()
     status_data = AnalyticsModel.get_reservations_by_status()
@@ -53,13 +222,18 @@ def show_analytics_dashboard(page, user_id, role, name):
     most_active = AnalyticsModel.get_most_active_faculty()
     room_recommendation = AnalyticsModel.get_room_recommendation()
     pending_status = AnalyticsModel.get_pending_bottleneck()
+    approval_latency = AnalyticsModel.get_approval_latency()
+    
+    # Demand forecast (fitted in the background; empty until the first fit finishes)
+    forecast_service.start()
+    forecast = forecast_service.get_forecast(weeks=2)
     
     # Row 1: Status Metrics (4 Columns)
     status_row = ft.Row([
         ft.Container(
             content=ft.Column([
                 ft.Text("TOTAL", size=11, color="#6B7280", weight=ft.FontWeight.W_500),
-                ft.Text(str(summary['total']), size=36, weight=ft.FontWeight.BOLD, color="#111827"),
+                ft.Text(str(summary['total']), ref=total_ref, size=36, weight=ft.FontWeight.BOLD, color="#111827"),
                 ft.Row([
                     ft.Icon(ICONS.CALENDAR_MONTH, size=16, color="#3B82F6"),
                     ft.Text("Total Reservations", size=13, color="#3B82F6"),
@@ -76,21 +250,24 @@ def show_analytics_dashboard(page, user_id, role, name):
             str(summary['approved']), 
             "Approved Requests",
             ICONS.CHECK_CIRCLE, 
-            "#10B981"
+            "#10B981",
+            value_ref=approved_ref
         ),
         create_modern_stat_card(
             "PENDING", 
             str(summary['pending']), 
             "Awaiting Review",
             ICONS.HOURGLASS_EMPTY, 
-            "#F59E0B"
+            "#F59E0B",
+            value_ref=pending_ref
         ),
         create_modern_stat_card(
             "REJECTED", 
             str(summary['rejected']), 
             "Declined Requests",
             ICONS.CANCEL, 
-            "#EF4444"
+            "#EF4444",
+            value_ref=rejected_ref
         ),
     ], spacing=15, alignment=ft.MainAxisAlignment.CENTER)
     
@@ -148,6 +325,17 @@ def show_analytics_dashboard(page, user_id, role, name):
                     width=850,
                     alignment=ft.alignment.center_left
                 ),
+                ft.Container(
+                    content=ft.Row([
+                        ft.Icon(ICONS.CIRCLE, size=10, color="#10B981" if REALTIME_ENABLED else "#9CA3AF"),
+                        ft.Text(
+                            f"{summary.get('today_bookings') or 0} booked today",
+                            ref=today_ref, size=13, color="#6B7280"
+                        ),
+                    ], spacing=6),
+                    width=850,
+                    padding=ft.padding.only(bottom=10),
+                ),
                 status_row,
                 
                 # Insights Section
@@ -194,6 +382,18 @@ def show_analytics_dashboard(page, user_id, role, name):
                 # Utilization
                 create_utilization_table(utilization),
                 ft.Container(height=20),
+                
+                # Demand Forecast
+                create_forecast_table(forecast),
+                ft.Container(height=20),
+                
+                # Approval Latency
+                create_latency_table(approval_latency),
+                ft.Container(height=20),
+                
+                # Export
+                export_card,
+                ft.Container(height=20),
             ], 
             horizontal_alignment=ft.CrossAxisAlignment.CENTER,
             scroll=ft.ScrollMode.AUTO,
@@ -208,12 +408,12 @@ def show_analytics_dashboard(page, user_id, role, name):
     page.update()
 
 
-def create_modern_stat_card(label, value, subtitle, icon, color):
-    """Create modern status card matching the design"""
+def create_modern_stat_card(label, value, subtitle, icon, color, value_ref=None):
+    """Create modern status card matching the design (value_ref allows live updates)"""
     return ft.Container(
         content=ft.Column([
             ft.Text(label, size=11, color="#6B7280", weight=ft.FontWeight.W_500),
-            ft.Text(value, size=36, weight=ft.FontWeight.BOLD, color="#111827"),
+            ft.Text(value, ref=value_ref, size=36, weight=ft.FontWeight.BOLD, color="#111827"),
             ft.Row([
                 ft.Icon(icon, size=16, color=color),
                 ft.Text(subtitle, size=13, color=color),
@@ -739,4 +939,139 @@ def create_utilization_table(utilization):
         padding=15,
         bgcolor="white",
         width=850,
-    )
\ No newline at end of file
+    )
+
+
+def create_forecast_table(forecast):
+    """Create table for predicted room demand over the next two weeks"""
+    if not forecast:
+        return ft.Container(
+            content=ft.Column([
+                ft.Text("Demand Forecast (Next 2 Weeks)", size=16, weight=ft.FontWeight.BOLD),
+                ft.Text("Forecast is being prepared from reservation history...", size=14, color="grey"),
+            ]),
+            border=ft.border.all(1, "#E0E0E0"),
+            border_radius=10,
+            padding=15,
+            bgcolor="white",
+            width=850,
+        )
+    
+    rows = []
+    max_hours = max(item['total_hours'] for item in forecast) if forecast else 1
+    
+    for item in forecast[:10]:  # Top 10
+        bar_width = int((item['total_hours'] / max_hours) * 150) if max_hours > 0 else 0
+        peak_str = f"{item['peak_day'][:3]} {item['peak_hour']:02d}:00" if item['peak_load'] > 0 else "N/A"
+        
+        rows.append(
+            ft.DataRow(
+                cells=[
+                    ft.DataCell(ft.Text(item['room_name'], size=14)),
+                    ft.DataCell(ft.Text(f"{item['weekly_hours'][0]:.1f}", size=14)),
+                    ft.DataCell(ft.Text(f"{item['weekly_hours'][1]:.1f}", size=14)),
+                    ft.DataCell(ft.Text(peak_str, size=14)),
+                    ft.DataCell(
+                        ft.Container(
+                            width=bar_width,
+                            height=20,
+                            bgcolor="#0EA5E9",
+                            border_radius=3
+                        )
+                    ),
+                ]
+            )
+        )
+    
+    return ft.Container(
+        content=ft.Column([
+            ft.Text("Demand Forecast (Next 2 Weeks)", size=16, weight=ft.FontWeight.BOLD),
+            ft.Text("Predicted booked hours per room", size=12, color="#6B7280"),
+            ft.DataTable(
+                columns=[
+                    ft.DataColumn(ft.Text("Room", weight=ft.FontWeight.BOLD)),
+                    ft.DataColumn(ft.Text("Week 1", weight=ft.FontWeight.BOLD), numeric=True),
+                    ft.DataColumn(ft.Text("Week 2", weight=ft.FontWeight.BOLD), numeric=True),
+                    ft.DataColumn(ft.Text("Peak Slot", weight=ft.FontWeight.BOLD)),
+                    ft.DataColumn(ft.Text("Load", weight=ft.FontWeight.BOLD)),
+                ],
+                rows=rows,
+                column_spacing=80,
+                data_row_min_height=50,
+                data_row_max_height=50,
+                horizontal_margin=0,
+            ),
+        ]),
+        border=ft.border.all(1, "#E0E0E0"),
+        border_radius=10,
+        padding=15,
+        bgcolor="white",
+        width=850,
+    )
+
+
+def create_latency_table(latency):
+    """Create tables for approval latency percentiles: overall, per admin and per room"""
+    overall = latency['overall']
+    if not overall['count']:
+        return ft.Container(
+            content=ft.Column([
+                ft.Text("Approval Latency", size=16, weight=ft.FontWeight.BOLD),
+                ft.Text("No approved reservations yet", size=14, color="grey"),
+            ]),
+            border=ft.border.all(1, "#E0E0E0"),
+            border_radius=10,
+            padding=15,
+            bgcolor="white",
+            width=850,
+        )
+    
+    def fmt_hours(value):
+        return f"{value:.1f}h" if value is not None else "N/A"
+    
+    def percentile_table(label, overall_name, breakdown):
+        """Overall row (bold) followed by the ten busiest entries"""
+        rows = []
+        entries = [dict(overall, name=overall_name)] + breakdown[:10]
+        for index, item in enumerate(entries):
+            weight = ft.FontWeight.BOLD if index == 0 else None
+            rows.append(
+                ft.DataRow(
+                    cells=[
+                        ft.DataCell(ft.Text(item['name'], size=14, weight=weight)),
+                        ft.DataCell(ft.Text(str(item['count']), size=14, weight=weight)),
+                        ft.DataCell(ft.Text(fmt_hours(item['p50']), size=14, weight=weight)),
+                        ft.DataCell(ft.Text(fmt_hours(item['p90']), size=14, weight=weight)),
+                        ft.DataCell(ft.Text(fmt_hours(item['p99']), size=14, weight=weight)),
+                    ]
+                )
+            )
+        return ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text(label, weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Approved", weight=ft.FontWeight.BOLD), numeric=True),
+                ft.DataColumn(ft.Text("p50", weight=ft.FontWeight.BOLD), numeric=True),
+                ft.DataColumn(ft.Text("p90", weight=ft.FontWeight.BOLD), numeric=True),
+                ft.DataColumn(ft.Text("p99", weight=ft.FontWeight.BOLD), numeric=True),
+            ],
+            rows=rows,
+            column_spacing=80,
+            data_row_min_height=50,
+            data_row_max_height=50,
+            horizontal_margin=0,
+        )
+    
+    return ft.Container(
+        content=ft.Column([
+            ft.Text("Approval Latency", size=16, weight=ft.FontWeight.BOLD),
+            ft.Text("Time from submission (or the last edit) to approval", size=12, color="#6B7280"),
+            percentile_table("Reviewer", "All admins", latency['by_admin']),
+            ft.Container(height=10),
+            percentile_table("Room", "All rooms", latency['by_room']),
+        ]),
+        border=ft.border.all(1, "#E0E0E0"),
+        border_radius=10,
+        padding=15,
+        bgcolor="white",
+        width=850,
+    )
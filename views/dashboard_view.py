@@ -5,6 +5,11 @@ from data.models import ClassroomModel, ReservationModel
 from views.schedule_view import show_classroom_schedule
 from components.app_header import create_app_header
 from utils.security import ensure_authenticated, touch_session, get_csrf_token
+from utils.search_index import SearchIndex
+from utils.tasks import tasks
+
+# Wait this long after the last keystroke before filtering
+SEARCH_DEBOUNCE_SECONDS = 0.15
 
 def show_dashboard(page, user_id, role, name):
     """Display main dashboard with availability filtering"""
@@ -47,6 +52,13 @@ def show_dashboard(page, user_id, role, name):
     except Exception:
         all_classrooms = []
 
+    # Built once per load: search is then a lookup, cards are reused until
+    # their room row changes
+    search_index = SearchIndex()
+    card_cache = {}  # room id -> card control
+    room_rows = {}  # room id -> latest row, the one its card and index entry show
+    search_timer = None
+
     # Search and filter state
     search_query = ft.Ref[ft.TextField]()
     classroom_list_ref = ft.Ref[ft.Row]()
@@ -168,63 +180,79 @@ def show_dashboard(page, user_id, role, name):
             )
         )
 
-    def matches_search(text, query):
-        """Check if query appears in text"""
-        if not query:
-            return True
-        return query.lower() in text.lower()
-    
-    def apply_filters(classrooms_to_filter):
-        """Apply search query to classroom list"""
-        query = current_search_query.strip()
-        filtered_cards = []
-        
-        for room in classrooms_to_filter:
-            room_name = room.get("room_name", "")
-            building = room.get("building", "")
-            capacity = str(room.get("capacity", ""))
-            status = room.get("status", "")
-            
-            searchable_text = f"{room_name} {building} {capacity} {status}"
-            
-            if matches_search(searchable_text, query):
-                filtered_cards.append(create_classroom_card(room))
-        
-        return filtered_cards
-    
-    def update_classroom_display(classrooms_to_show):
-        """Update the classroom grid with filtered results"""
-        filtered_cards = apply_filters(classrooms_to_show)
-        
-        # Update result count
-        result_count_ref.current.value = f"Showing {len(filtered_cards)} classroom(s)"
-        
-        if not filtered_cards:
+    def index_room(room):
+        """Add a room to the search index (name, building, capacity, status)"""
+        search_index.add(
+            room["id"],
+            room.get("room_name", ""),
+            room.get("building", ""),
+            room.get("capacity", ""),
+            room.get("status", ""),
+        )
+
+    def refresh_room(room):
+        """Re-index a room and drop its cached card when its row is new or changed"""
+        if room_rows.get(room["id"]) == room:
+            return
+        room_rows[room["id"]] = room
+        index_room(room)
+        card_cache.pop(room["id"], None)
+
+    def get_classroom_card(room):
+        """Card for a room, built once and reused across searches and filters"""
+        card = card_cache.get(room["id"])
+        if card is None:
+            card = card_cache[room["id"]] = create_classroom_card(room)
+        return card
+
+    no_results = ft.Container(
+        content=ft.Column([
+            ft.Icon(ft.Icons.SEARCH_OFF, size=64, color=ft.Colors.GREY_400),
+            ft.Text(
+                "No classrooms found",
+                size=18,
+                weight=ft.FontWeight.BOLD,
+                color=ft.Colors.GREY_600
+            ),
+            ft.Text(
+                "Try adjusting your search or filter criteria",
+                size=14,
+                color=ft.Colors.GREY_500,
+                italic=True
+            )
+        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=10),
+        padding=40,
+        alignment=ft.alignment.center,
+        visible=False,
+    )
+
+    def apply_filters():
+        """Show the cards matching the search, hide the rest; returns how many are shown"""
+        matches = search_index.search(current_search_query)
+        shown = 0
+        for room in current_classrooms:
+            card = get_classroom_card(room)
+            visible = room["id"] in matches
+            # Only touched cards are sent to the client on update
+            if card.visible != visible:
+                card.visible = visible
+            shown += visible
+        no_results.visible = shown == 0
+        return shown
+
+    def update_classroom_display(classrooms_to_show=None):
+        """Update the classroom grid; pass a new room list when the set changes"""
+        if classroom_list_ref.current is None or classroom_list_ref.current.page is None:
+            return
+        if classrooms_to_show is not None:
+            for room in classrooms_to_show:
+                refresh_room(room)
             classroom_list_ref.current.controls = [
-                ft.Container(
-                    content=ft.Column([
-                        ft.Icon(ft.Icons.SEARCH_OFF, size=64, color=ft.Colors.GREY_400),
-                        ft.Text(
-                            "No classrooms found",
-                            size=18,
-                            weight=ft.FontWeight.BOLD,
-                            color=ft.Colors.GREY_600
-                        ),
-                        ft.Text(
-                            "Try adjusting your search or filter criteria",
-                            size=14,
-                            color=ft.Colors.GREY_500,
-                            italic=True
-                        )
-                    ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=10),
-                    padding=40,
-                    alignment=ft.alignment.center
-                )
-            ]
-        else:
-            # Just add all cards directly to the Row with wrap=True
-            classroom_list_ref.current.controls = filtered_cards
-        
+                get_classroom_card(room) for room in classrooms_to_show
+            ] + [no_results]
+
+        shown = apply_filters()
+        result_count_ref.current.value = f"Showing {shown} classroom(s)"
         page.update()
     
     def filter_by_availability(reservation_date, start_time, end_time):
@@ -254,7 +282,8 @@ def show_dashboard(page, user_id, role, name):
         selected_date = None
         selected_start_time = None
         selected_end_time = None
-        current_classrooms = all_classrooms
+        # Rooms seen since the page loaded keep their newer rows
+        current_classrooms = [room_rows.get(room["id"], room) for room in all_classrooms]
         
         # Reset button texts
         date_button_ref.current.content.value = "Select Date"
@@ -331,13 +360,20 @@ def show_dashboard(page, user_id, role, name):
         """Clear the availability filter"""
         clear_availability_filter()
     
-    def search_classrooms(e):
-        """Handle search query changes"""
+    def run_search():
+        """Apply the latest query to the current classroom list (filtered or all)"""
         nonlocal current_search_query
-        current_search_query = search_query.current.value.strip()
-        
-        # Apply search to current classroom list (filtered or all)
-        update_classroom_display(current_classrooms)
+        if search_query.current is None:
+            return
+        current_search_query = (search_query.current.value or "").strip()
+        update_classroom_display()
+
+    def search_classrooms(e):
+        """Handle search query changes (debounced while typing)"""
+        nonlocal search_timer
+        if search_timer is not None:
+            search_timer.cancel()
+        search_timer = tasks.later(page, SEARCH_DEBOUNCE_SECONDS, run_search)
 
     # Initialize current_classrooms at the start
     current_classrooms = all_classrooms 
@@ -423,8 +459,13 @@ def show_dashboard(page, user_id, role, name):
         height=45,
     )
 
-    # Initial classroom display - create cards
-    classroom_cards = [create_classroom_card(room) for room in all_classrooms]
+    # Initial classroom display - index rooms and create their cards
+    for room in all_classrooms:
+        refresh_room(room)
+    classroom_cards = [get_classroom_card(room) for room in all_classrooms]
+    if not all_classrooms:
+        no_results.visible = True
+    classroom_cards.append(no_results)
 
     # Build page layout
     page.controls.clear()
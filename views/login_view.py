@@ -2,12 +2,15 @@ import flet as ft
 from utils.config import ICONS, COLORS
 from data.models import UserModel, ActivityLogModel
 from views.dashboard_view import show_dashboard
-from utils.security import touch_session, get_csrf_token
+from utils.security import touch_session, get_csrf_token, issue_realtime_token, exit_view
 
 
 def show_login(page):
     """Display the enhanced login page with database authentication"""
     
+    # Logout or expiry: release whatever the previous view held
+    exit_view(page)
+    
     # State for password visibility and loading
     show_password = ft.Ref[ft.TextField]()
     login_button_ref = ft.Ref[ft.ElevatedButton]()
@@ -167,6 +170,7 @@ def show_login(page):
             # NEW: initialize session activity + CSRF token
             touch_session(page)       # sets last_activity
             get_csrf_token(page)      # generates & stores action_token
+            issue_realtime_token(page)  # signed websocket token, renewed by touch_session
 
             # Login successful - navigate to dashboard
             show_dashboard(page, user['id'], user['role'], user['full_name'])
@@ -1,8 +1,12 @@
+import threading
+
 import flet as ft
 from utils.config import ICONS, COLORS
-from data.models import ReservationModel, ActivityLogModel
-from datetime import datetime, date, time as datetime_time
+from data.models import ReservationModel, ActivityLogModel, reservation_is_past
+from datetime import datetime
 from components.app_header import create_app_header
+from components.paged_list import PagedList
+from utils.tasks import tasks
 
 try:
     from utils.websocket_client import realtime
@@ -32,36 +36,88 @@ def show_my_reservations(page, user_id, role, name):
         from views.dashboard_view import show_dashboard
         show_dashboard(page, user_id, role, name)
     
-    def refresh_view():
-        """Refresh the reservations view"""
-        show_my_reservations(page, user_id, role, name)
+    # Guards the tab lists and reservation_counts: task callbacks and
+    # realtime events change them on their own threads
+    lock = threading.RLock()
+    
+    def find_loaded(reservation_id):
+        """The tab list holding a loaded reservation, or None"""
+        for tab_list in tab_lists.values():
+            if tab_list.index_of(reservation_id) is not None:
+                return tab_list
+        return None
+    
+    def set_status(reservation_id, status):
+        """Re-render one loaded card with a new status (no page update)"""
+        with lock:
+            tab_list = find_loaded(reservation_id)
+            if tab_list is not None:
+                res = tab_list.rows[tab_list.index_of(reservation_id)]
+                tab_list.replace(dict(res, status=status))
+    
+    def place_reservation(old_res, res):
+        """Move an edited reservation to its tab/position and fix the counts (no page update)"""
+        # The tab counts include unloaded rows, so judge the tab by the pre-edit row
+        old_when = "past" if reservation_is_past(old_res, now) else "upcoming"
+        new_when = "past" if reservation_is_past(res, now) else "upcoming"
+        with lock:
+            old_list = find_loaded(res["id"])
+            if old_list is not None:
+                old_list.remove(res["id"])
+            if old_when != new_when:
+                reservation_counts[old_when] -= 1
+                reservation_counts[new_when] += 1
+            tab_lists[new_when].insert(res)
+            update_tab_labels()
     
     # Real-time updates setup
     if REALTIME_ENABLED:
         def on_reservation_approved(data):
-            """Handle reservation approved event"""
-            if data['payload'].get('user_id') == user_id:
-                page.open(ft.SnackBar(
-                    content=ft.Text(f"✅ {data['payload'].get('message', 'Reservation approved!')}"),
-                    bgcolor=ft.Colors.GREEN,
-                    duration=4000
-                ))
-                page.update()
-                refresh_view()
+            """Handle reservation approved event (routed here by the user:<id> topic)"""
+            if tabs.page is None:
+                return  # View no longer on screen
+            set_status(data['payload'].get('reservation_id'), "approved")
+            page.open(ft.SnackBar(
+                content=ft.Text(f"✅ {data['payload'].get('message', 'Reservation approved!')}"),
+                bgcolor=ft.Colors.GREEN,
+                duration=4000
+            ))
+            page.update()
         
         def on_reservation_rejected(data):
-            """Handle reservation rejected event"""
-            if data['payload'].get('user_id') == user_id:
-                page.open(ft.SnackBar(
-                    content=ft.Text(f"❌ {data['payload'].get('message', 'Reservation rejected')}"),
-                    bgcolor=ft.Colors.RED,
-                    duration=4000
-                ))
-                page.update()
-                refresh_view()
+            """Handle reservation rejected event (routed here by the user:<id> topic)"""
+            if tabs.page is None:
+                return  # View no longer on screen
+            set_status(data['payload'].get('reservation_id'), "rejected")
+            page.open(ft.SnackBar(
+                content=ft.Text(f"❌ {data['payload'].get('message', 'Reservation rejected')}"),
+                bgcolor=ft.Colors.RED,
+                duration=4000
+            ))
+            page.update()
         
-        realtime.on("reservation_approved", on_reservation_approved)
-        realtime.on("reservation_rejected", on_reservation_rejected)
+        def on_resync(data):
+            """Missed events could not be replayed: reload counts and loaded tabs"""
+            if tabs.page is None:
+                return
+            
+            def on_counts(counts):
+                if tabs.page is None:
+                    return
+                with lock:
+                    reservation_counts.update(counts)
+                    for tab_list in tab_lists.values():
+                        tab_list.reset()
+                    update_tab_labels()
+                # The other tab reloads when it is opened
+                tab_lists[("upcoming", "past")[tabs.selected_index]].load_first_page(background=True)
+            
+            tasks.run(page, lambda: ReservationModel.get_user_reservation_counts(user_id, now=now), on_counts)
+        
+        realtime.on("reservation_approved", on_reservation_approved, session=page.session_id)
+        realtime.on("resync_required", on_resync, session=page.session_id)
+        realtime.on("reservation_rejected", on_reservation_rejected, session=page.session_id)
+        realtime.subscribe(f"user:{user_id}", session=page.session_id)
         if not realtime.connected:
             realtime.connect()
     
@@ -144,44 +200,49 @@ def show_my_reservations(page, user_id, role, name):
                 page.update()
                 return
             
-            is_available = ReservationModel.check_availability(
-                reservation["classroom_id"],
-                date_field.value,
-                start_field.value,
-                end_field.value,
-                exclude_reservation_id=reservation["id"]
-            )
-            
-            if not is_available:
-                error_text.value = "⚠ Time slot not available"
-                page.update()
-                return
-            
-            success = ReservationModel.update_reservation(
-                reservation["id"],
-                date_field.value,
-                start_field.value,
-                end_field.value,
-                purpose_field.value
-            )
+            values = (date_field.value, start_field.value, end_field.value, purpose_field.value)
             
-            if success:
+            def save():
+                """Returns the updated row, or None if the slot is taken"""
+                if not ReservationModel.check_availability(
+                    reservation["classroom_id"], *values[:3], exclude_reservation_id=reservation["id"]
+                ):
+                    return None
+                if not ReservationModel.update_reservation(reservation["id"], *values):
+                    raise RuntimeError("update failed")
                 ActivityLogModel.log_activity(
                     user_id,
                     "Updated reservation",
                     f"Modified reservation for {reservation['room_name']}"
                 )
+                return ReservationModel.get_reservation_details(reservation["id"]) or {}
+            
+            def on_saved(updated):
+                if updated is None:
+                    error_text.value = "⚠ Time slot not available"
+                    return
+                if updated and tabs.page is not None:
+                    place_reservation(reservation, updated)
                 dialog.open = False
-                page.update()
-                refresh_view()
-            else:
+                if dialog in page.overlay:
+                    page.overlay.remove(dialog)
+            
+            def on_failed(ex):
                 error_text.value = "⚠ Failed to update. Please try again."
-                page.update()
+            
+            error_text.value = ""
+            tasks.run(page, save, on_saved, on_failed, busy=[save_button])
         
         def close_dialog(e):
             dialog.open = False
             page.update()
         
+        save_button = ft.ElevatedButton(
+            "Save Changes",
+            on_click=save_changes, width=140,
+            style=ft.ButtonStyle(bgcolor="#4CAF50", color="white", shape=ft.RoundedRectangleBorder(radius=16))
+        )
+        
         dialog = ft.AlertDialog(
             modal=True,
             title=ft.Text(f"Edit Reservation: {reservation['room_name']}", weight=ft.FontWeight.BOLD),
@@ -209,11 +270,7 @@ def show_my_reservations(page, user_id, role, name):
             ),
             actions=[
                 ft.TextButton("Cancel", on_click=close_dialog),
-                ft.ElevatedButton(
-                    "Save Changes",
-                    on_click=save_changes, width=140,
-                    style=ft.ButtonStyle(bgcolor="#4CAF50", color="white", shape=ft.RoundedRectangleBorder(radius=16))
-                ),
+                save_button,
             ],
             actions_alignment=ft.MainAxisAlignment.END,
         )
@@ -226,20 +283,27 @@ def show_my_reservations(page, user_id, role, name):
         """Show confirmation dialog to cancel a reservation"""
         
         def confirm_cancel(e):
-            success = ReservationModel.cancel_reservation(reservation["id"])
+            def cancel():
+                success = ReservationModel.cancel_reservation(reservation["id"])
+                if success:
+                    ActivityLogModel.log_activity(
+                        user_id,
+                        "Cancelled reservation",
+                        f"Cancelled reservation for {reservation['room_name']}"
+                    )
+                return success
             
-            if success:
-                ActivityLogModel.log_activity(
-                    user_id,
-                    "Cancelled reservation",
-                    f"Cancelled reservation for {reservation['room_name']}"
-                )
+            def on_cancelled(success):
+                if success and tabs.page is not None:
+                    set_status(reservation["id"], "cancelled")
                 dialog.open = False
-                page.update()
-                refresh_view()
-            else:
+                if success and dialog in page.overlay:
+                    page.overlay.remove(dialog)
+            
+            def on_failed(ex):
                 dialog.open = False
-                page.update()
+            
+            tasks.run(page, cancel, on_cancelled, on_failed, busy=[cancel_button])
         
         def close_dialog(e):
             dialog.open = False
@@ -251,6 +315,12 @@ def show_my_reservations(page, user_id, role, name):
         else:
             date_str = str(res_date)
         
+        cancel_button = ft.ElevatedButton(
+            "Yes, Cancel It",
+            on_click=confirm_cancel, width=120,
+            style=ft.ButtonStyle(bgcolor="#F44336", color="white")
+        )
+        
         dialog = ft.AlertDialog(
             modal=True,
             title=ft.Row([
@@ -270,11 +340,7 @@ def show_my_reservations(page, user_id, role, name):
             ),
             actions=[
                 ft.TextButton("Keep Reservation", on_click=close_dialog),
-                ft.ElevatedButton(
-                    "Yes, Cancel It",
-                    on_click=confirm_cancel, width=120,
-                    style=ft.ButtonStyle(bgcolor="#F44336", color="white")
-                ),
+                cancel_button,
             ],
             actions_alignment=ft.MainAxisAlignment.END,
         )
@@ -283,49 +349,10 @@ def show_my_reservations(page, user_id, role, name):
         dialog.open = True
         page.update()
     
-    # Get reservations from database
-    reservations = ReservationModel.get_user_reservations(user_id)
-    
-    # Separate into upcoming and past reservations
-    today = date.today()
-    now = datetime.now().time()
-    
-    upcoming = []
-    past = []
-    
-    for res in reservations:
-        res_date = res["reservation_date"]
-        if hasattr(res_date, 'date'):
-            res_date = res_date.date()
-        elif isinstance(res_date, str):
-            res_date = datetime.strptime(res_date, '%Y-%m-%d').date()
-        
-        # Parse end time
-        end_time = res["end_time"]
-        if isinstance(end_time, str):
-            try:
-                end_time = datetime.strptime(end_time, '%H:%M:%S').time()
-            except ValueError:
-                end_time = datetime.strptime(end_time, '%H:%M').time()
-        elif hasattr(end_time, 'seconds'):  # timedelta object
-            total_seconds = end_time.total_seconds()
-            hours = int(total_seconds // 3600)
-            minutes = int((total_seconds % 3600) // 60)
-            seconds = int(total_seconds % 60)
-            end_time = datetime_time(hours, minutes, seconds)
-        elif not isinstance(end_time, datetime_time):
-            # If it's a datetime object, extract time
-            if hasattr(end_time, 'time'):
-                end_time = end_time.time()
-            else:
-                # Default to end of day if parsing fails
-                end_time = datetime_time(23, 59, 59)
-        
-        # Determine if reservation is past or upcoming
-        if res_date < today or (res_date == today and end_time < now):
-            past.append(res)
-        else:
-            upcoming.append(res)
+    # Upcoming/past split and counts are done in SQL; rows are paged in per tab
+    # (one clock reading so a reservation ending now lands in exactly one tab)
+    now = datetime.now()
+    reservation_counts = ReservationModel.get_user_reservation_counts(user_id, now=now)
     
     def create_reservation_card(res):
         """Create a reservation card following admin panel format"""
@@ -440,20 +467,15 @@ def show_my_reservations(page, user_id, role, name):
             elevation=2
         )
 
-    def create_scrollable_tab_content(reservation_list, empty_message):
-        """Create scrollable content for a tab"""
-        if reservation_list:
-            return ft.Container(
-                content=ft.Column(
-                    [create_reservation_card(r) for r in reservation_list],
-                    spacing=10,
-                    scroll=ft.ScrollMode.AUTO,
-                ),
-                padding=10,
-                expand=True,
-            )
-        else:
-            return ft.Container(
+    def create_scrollable_tab_content(when, empty_message):
+        """Create a lazily paged list of upcoming or past reservations"""
+        return PagedList(
+            page,
+            load_page=lambda after: ReservationModel.get_user_reservations_page(
+                user_id, when, after, now=now
+            ),
+            build_item=create_reservation_card,
+            empty_content=ft.Container(
                 content=ft.Column([
                     ft.Icon(ICONS.EVENT_BUSY, size=48, color="grey"),
                     ft.Text(empty_message, color="grey", size=16),
@@ -462,23 +484,42 @@ def show_my_reservations(page, user_id, role, name):
                 padding=40,
                 expand=True,
                 alignment=ft.alignment.center
-            )
+            ),
+            key_columns=("reservation_date", "start_time", "id"),
+            lock=lock,
+        )
+    
+    # Edits, cancellations and status events are applied to these in place
+    tab_lists = {
+        "upcoming": create_scrollable_tab_content("upcoming", "No upcoming reservations"),
+        "past": create_scrollable_tab_content("past", "No past reservations"),
+    }
+    
+    def update_tab_labels():
+        tabs.tabs[0].text = f"Upcoming ({reservation_counts['upcoming']})"
+        tabs.tabs[1].text = f"Past ({reservation_counts['past']})"
+    
+    def on_tab_change(e):
+        """Fetch a tab's first page (in the background) the first time it is opened"""
+        tab_lists[("upcoming", "past")[e.control.selected_index]].load_first_page(background=True)
     
     # Create tabs
     tabs = ft.Tabs(
         selected_index=0,
         tabs=[
             ft.Tab(
-                text=f"Upcoming ({len(upcoming)})",
-                content=create_scrollable_tab_content(upcoming, "No upcoming reservations"),
+                text=f"Upcoming ({reservation_counts['upcoming']})",
+                content=tab_lists["upcoming"].container,
             ),
             ft.Tab(
-                text=f"Past ({len(past)})",
-                content=create_scrollable_tab_content(past, "No past reservations"),
+                text=f"Past ({reservation_counts['past']})",
+                content=tab_lists["past"].container,
             ),
         ],
+        on_change=on_tab_change,
         expand=True
     )
+    tab_lists["upcoming"].load_first_page()
     
     page.controls.clear()
     page.overlay.clear()
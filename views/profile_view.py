@@ -4,6 +4,7 @@ import shutil
 import uuid
 from data.models import UserModel, ActivityLogModel
 from utils.security import ensure_authenticated, touch_session, get_csrf_token
+from utils.tasks import tasks, TaskRejected
 
 # ==================== CONFIGURATION ====================
 # Allowed file extensions for profile pictures
@@ -232,6 +233,7 @@ def show_profile(page, user_id, role, name):
     )
     
     modal_status_text = ft.Text("", size=14)
+    password_progress = ft.ProgressBar(visible=False)
     
     def go_back(e):
         """Navigate back to dashboard"""
@@ -241,13 +243,17 @@ def show_profile(page, user_id, role, name):
         from views.dashboard_view import show_dashboard
         show_dashboard(page, user_id, role, name)
     
-    def close_password_modal(e):
-        """Close password change modal and reset fields"""
+    def reset_password_modal():
+        """Close password change modal and reset fields (no page update)"""
         password_modal.open = False
         current_password.value = ""
         new_password.value = ""
         confirm_password.value = ""
         modal_status_text.value = ""
+    
+    def close_password_modal(e):
+        """Close password change modal and reset fields"""
+        reset_password_modal()
         page.update()
     
     def change_password(e):
@@ -280,39 +286,43 @@ def show_profile(page, user_id, role, name):
             page.update()
             return
         
-        # Attempt to change password
-        try:
-            success, message = UserModel.change_password(
-                user_id, 
-                current_password.value, 
-                new_password.value
-            )
-            
+        # Attempt to change password (bcrypt verify + hash, off the handler thread)
+        old_value, new_value = current_password.value, new_password.value
+        
+        def change():
+            success, message = UserModel.change_password(user_id, old_value, new_value)
             if success:
-                modal_status_text.value = f"✓ {message}"
-                modal_status_text.color = ft.Colors.GREEN
-                page.update()
-                
                 # Log the activity
                 ActivityLogModel.log_activity(
                     user_id,
                     "Password changed",
                     "User changed their password"
                 )
-                
-                # Close modal after brief delay
-                import time
-                time.sleep(1.5)
-                close_password_modal(e)
-            else:
+            return success, message
+        
+        def on_changed(result):
+            success, message = result
+            if not success:
                 modal_status_text.value = f"✗ {message}"
                 modal_status_text.color = ft.Colors.RED
-                page.update()
-                
-        except Exception as ex:
+                return
+            modal_status_text.value = f"✓ {message}"
+            modal_status_text.color = ft.Colors.GREEN
+            # Close modal after brief delay
+            tasks.later(page, 1.5, reset_password_modal)
+        
+        def on_failed(ex):
             modal_status_text.value = f"✗ Error: {str(ex)}"
-            modal_status_text.color = ft.Colors.RED
-            page.update()
+            modal_status_text.color = ft.Colors.ORANGE if isinstance(ex, TaskRejected) else ft.Colors.RED
+        
+        tasks.run(page, change, on_changed, on_failed, busy=[update_password_button], progress=password_progress)
+
+    update_password_button = ft.ElevatedButton(
+        "Update Password", 
+        on_click=change_password,
+        bgcolor=ft.Colors.BLUE,
+        color=ft.Colors.WHITE,
+    )
 
     # Password change modal dialog
     password_modal = ft.AlertDialog(
@@ -321,6 +331,7 @@ def show_profile(page, user_id, role, name):
         content=ft.Container(
             content=ft.Column(
                 [
+                    password_progress,
                     modal_status_text,
                     current_password,
                     new_password,
@@ -333,12 +344,7 @@ def show_profile(page, user_id, role, name):
         ),
         actions=[
             ft.TextButton("Cancel", on_click=close_password_modal),
-            ft.ElevatedButton(
-                "Update Password", 
-                on_click=change_password,
-                bgcolor=ft.Colors.BLUE,
-                color=ft.Colors.WHITE,
-            ),
+            update_password_button,
         ],
         actions_alignment=ft.MainAxisAlignment.END,
     )
@@ -2,9 +2,18 @@ import flet as ft
 from utils.config import ICONS, COLORS
 from data.models import ClassroomModel, ReservationModel, ActivityLogModel
 from datetime import datetime
+import threading
+from uuid import uuid4
 from components.app_header import create_app_header
 from components.datetime_picker import DateTimePicker
-from utils.security import ensure_authenticated, touch_session, get_csrf_token
+from utils.security import ensure_authenticated, touch_session, get_csrf_token, on_view_exit
+
+try:
+    from utils.websocket_client import realtime
+    from websocket.presence import PRESENCE_TTL_SECONDS
+    REALTIME_ENABLED = True
+except ImportError:
+    REALTIME_ENABLED = False
 
 def show_reservation_form(page, user_id, role, name, classroom_id):
     """Display the reservation form for faculty to book classrooms"""
@@ -34,6 +43,98 @@ def show_reservation_form(page, user_id, role, name, classroom_id):
     occupied_slots_ref = ft.Ref[ft.Column]()
     occupied_container_ref = ft.Ref[ft.Container]()
     
+    # ==================== PRESENCE & SLOT HOLDS ====================
+    # Other faculty on this room/date and the slots they are filling in
+    # (soft state from the realtime server; the database still decides)
+    presence_text_ref = ft.Ref[ft.Text]()
+    presence = {"date": None, "hold": None, "others_holds": []}
+    # Opaque id for this form in presence snapshots (never the session id,
+    # which other subscribers to the room would receive)
+    viewer_id = uuid4().hex
+    # Set when the form is left; stops the keep-alive loop
+    closed = threading.Event()
+    
+    def report_presence(action, date_str, start_time=None, end_time=None):
+        """Tell the realtime server what this session is looking at / holding"""
+        if not REALTIME_ENABLED or not date_str:
+            return
+        realtime.send("presence", {
+            "action": action,
+            "classroom_id": classroom_id,
+            "date": date_str,
+            "viewer_id": viewer_id,
+            "user_id": user_id,
+            "name": name,
+            "start_time": start_time,
+            "end_time": end_time,
+        }, topics=[f"classroom:{classroom_id}"])
+    
+    def set_presence_date(date_str):
+        """Move this viewer (and drop any hold) to another date"""
+        if presence["date"] and presence["date"] != date_str:
+            report_presence("leave", presence["date"])
+        presence.update(date=date_str, hold=None, others_holds=[])
+        report_presence("view", date_str)
+    
+    def set_hold(start_time, end_time):
+        """Hold the chosen slot while the form is being completed"""
+        hold = (str(start_time)[:5], str(end_time)[:5])
+        if presence["date"] and hold != presence["hold"]:
+            presence["hold"] = hold
+            report_presence("hold", presence["date"], *hold)
+    
+    def leave_presence():
+        if presence["date"]:
+            report_presence("leave", presence["date"])
+            presence.update(date=None, hold=None)
+    
+    def conflicting_hold(start_time, end_time):
+        """Another viewer's hold overlapping the given slot, if any"""
+        start, end = str(start_time)[:5], str(end_time)[:5]
+        for hold in presence["others_holds"]:
+            if hold["start_time"] < end and start < hold["end_time"]:
+                return hold
+        return None
+    
+    def on_presence_update(data):
+        """Show who else is on this room/date and what they are holding"""
+        snapshot = data.get("payload", {})
+        if presence_text_ref.current is None or presence_text_ref.current.page is None:
+            return
+        if snapshot.get("classroom_id") != classroom_id or snapshot.get("date") != presence["date"]:
+            return
+        others = [v for v in snapshot.get("viewers", []) if v["viewer_id"] != viewer_id]
+        presence["others_holds"] = [h for h in snapshot.get("holds", []) if h["viewer_id"] != viewer_id]
+        parts = []
+        if others:
+            parts.append(f"👀 {len(others)} other{'s' if len(others) != 1 else ''} viewing this date")
+        for hold in presence["others_holds"]:
+            parts.append(f"⏳ {hold['name']} is booking {hold['start_time']} - {hold['end_time']}")
+        presence_text_ref.current.value = "\n".join(parts)
+        presence_text_ref.current.visible = bool(parts)
+        page.update()
+    
+    def keep_presence_alive():
+        """Re-announce well within the TTL while the form stays open"""
+        while not closed.wait(PRESENCE_TTL_SECONDS / 3):
+            if presence["date"]:
+                report_presence("view", presence["date"])
+                if presence["hold"]:
+                    report_presence("hold", presence["date"], *presence["hold"])
+    
+    def close_presence():
+        """Form left by any route: release the hold now and stop re-announcing"""
+        closed.set()
+        leave_presence()
+        realtime.off("presence_update", on_presence_update, session=page.session_id)
+        realtime.unsubscribe(f"classroom:{classroom_id}", session=page.session_id)
+    
+    if REALTIME_ENABLED:
+        realtime.on("presence_update", on_presence_update, session=page.session_id)
+        realtime.subscribe(f"classroom:{classroom_id}", session=page.session_id)
+        threading.Thread(target=keep_presence_alive, daemon=True).start()
+        on_view_exit(page, close_presence)
+    
     def load_occupied_slots(selected_date=None):
         """Load and display occupied time slots for selected date"""
         if not selected_date:
@@ -96,6 +197,7 @@ def show_reservation_form(page, user_id, role, name, classroom_id):
         date_text_ref.current.color = "#212121"
         date_icon_ref.current.color = "#4A7BA7"
         page.update()
+        set_presence_date(date.strftime('%Y-%m-%d'))
         load_occupied_slots(date)
     
     def on_start_time_selected(start_time):
@@ -150,11 +252,18 @@ def show_reservation_form(page, user_id, role, name, classroom_id):
             submit_button_ref.current.disabled = True
             page.update()
             return False
+        
+        held = conflicting_hold(start_time, end_time)
+        if held:
+            # Soft warning only - whoever submits first gets the slot
+            availability_text.value = f"⏳  {held['name']} is currently booking an overlapping slot"
+            availability_text.color = "#F57C00"
         else:
             availability_text.value = "✓  Time slot is available for booking"
             availability_text.color = "#2E7D32"
-            page.update()
-            return True
+        set_hold(start_time, end_time)
+        page.update()
+        return True
     
     def check_form_ready(*args):
         """Enable submit button when all fields are filled"""
@@ -216,6 +325,9 @@ def show_reservation_form(page, user_id, role, name, classroom_id):
         )
         
         if reservation_id:
+            # The slot is a real (pending) reservation now
+            leave_presence()
+            
             # Log activity
             ActivityLogModel.log_activity(
                 user_id, 
@@ -232,6 +344,7 @@ def show_reservation_form(page, user_id, role, name, classroom_id):
             page.update()
     
     def back_to_dashboard(e):
+        leave_presence()
         from views.dashboard_view import show_dashboard
         show_dashboard(page, user_id, role, name)
     
@@ -386,6 +499,14 @@ def show_reservation_form(page, user_id, role, name, classroom_id):
                             ], spacing=2),
                             ft.Container(height=8),
                             date_button,
+                            ft.Text(
+                                "",
+                                ref=presence_text_ref,
+                                size=13,
+                                color="#F57C00",
+                                weight=ft.FontWeight.W_500,
+                                visible=False,
+                            ),
                         ], spacing=0),
                         
                         # Occupied slots display with improved design
@@ -0,0 +1,95 @@
+"""
+Realtime Connection Tokens
+==========================
+Signed, short-lived tokens that bind a websocket connection to an identity
+
+Token: base64url(JSON claims) + "." + base64url(HMAC-SHA256 signature)
+Claims: {"sub": user id, "role": "admin" | "faculty" | ... | "service", "exp": unix time}
+
+The app signs tokens with WS_TOKEN_SECRET and the websocket server checks
+them once, at the handshake (?token=...). The "service" role is the app
+process itself, the only identity allowed to publish events.
+
+Without WS_TOKEN_SECRET the server fails closed: it refuses to start
+unless WS_AUTH_DISABLED=1 explicitly opts out for local development.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+
+# The app and the server both read WS_TOKEN_SECRET from .env when available
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+# Shared by the app and the websocket server
+WS_TOKEN_SECRET = os.getenv("WS_TOKEN_SECRET", "")
+# Explicit development opt-out: run the server without tokens when no
+# secret is set (everyone may connect and publish)
+WS_AUTH_DISABLED = os.getenv("WS_AUTH_DISABLED", "").lower() in ("1", "true", "yes")
+# Tokens are only checked at the handshake, so they can be short-lived
+REALTIME_TOKEN_TTL_SECONDS = 300
+# Role of the app process's own connection (may publish)
+SERVICE_ROLE = "service"
+
+
+def auth_enabled():
+    return bool(WS_TOKEN_SECRET)
+
+
+def open_access_allowed():
+    """True only when there is no secret and WS_AUTH_DISABLED opts out of auth"""
+    return not auth_enabled() and WS_AUTH_DISABLED
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(body, secret):
+    return _b64encode(hmac.new(secret.encode("utf-8"), body.encode("ascii"), hashlib.sha256).digest())
+
+
+def sign_token(user_id, role, ttl_seconds=REALTIME_TOKEN_TTL_SECONDS, secret=None):
+    """Create a token for user_id/role that expires after ttl_seconds"""
+    claims = {"sub": user_id, "role": role, "exp": int(time.time() + ttl_seconds)}
+    body = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    return f"{body}.{_sign(body, secret or WS_TOKEN_SECRET)}"
+
+
+def verify_token(token, secret=None):
+    """
+    Check a token's signature and expiry.
+
+    Returns:
+        dict: The claims ({"sub", "role", "exp"}), or None if the token is
+              malformed, forged or expired
+    """
+    try:
+        body, signature = token.split(".", 1)
+        expected = _sign(body, secret or WS_TOKEN_SECRET)
+        if not hmac.compare_digest(signature, expected):
+            return None
+        claims = json.loads(_b64decode(body))
+    except (AttributeError, ValueError):
+        return None
+    if not isinstance(claims, dict) or claims.get("exp", 0) < time.time():
+        return None
+    return claims
+
+
+def identity_topics(claims):
+    """Topics a connection joins automatically because of who it is"""
+    if claims.get("role") == SERVICE_ROLE:
+        return []
+    return [f"user:{claims.get('sub')}", f"role:{claims.get('role')}"]
@@ -0,0 +1,274 @@
+"""
+Event Bus for Multi-Process Fan-Out
+===================================
+Shares published events between websocket server processes
+
+Every server process publishes the frames it receives to the bus and
+delivers whatever the bus hands back to its own subscribers, so an event
+published through any process reaches clients connected to every process.
+
+Backends (pick with WS_BUS):
+- "local": single process, events loop straight back (default)
+- "unix":  broker-free reference implementation over a Unix socket. The
+           first process to take the lock file becomes the hub and relays
+           each frame to every connected process (itself included); the
+           others connect to it and take over if it goes away.
+
+The bus is also the single ordering point: it stamps each event with a
+monotonically increasing sequence number, so every process sees the same
+numbers (used for replay-on-reconnect). Only the hub assigns numbers; an
+event published while no hub is reachable is delivered locally unsequenced,
+as is ephemeral state published with sequenced=False (presence), which is
+never logged for replay and so must not use up a number.
+The numbers belong to an epoch, a random id made by the first hub and
+handed on at failover; a new epoch means the numbering started over.
+
+Frames on the Unix socket are length-prefixed, so any frame content (e.g.
+pretty-printed JSON with newlines) passes through intact, and an oversized
+or undeliverable frame is skipped without losing the stream.
+
+Other backends (e.g. Redis pub/sub) only need start/publish/close.
+"""
+
+import asyncio
+import fcntl
+import logging
+import os
+import struct
+import uuid
+
+# Unix socket the hub listens on
+BUS_SOCKET_PATH = os.getenv("WS_BUS_PATH", "/tmp/eduroom-ws-bus.sock")
+# Largest frame accepted on the bus
+BUS_FRAME_LIMIT = 2 ** 20
+# Bytes buffered for one peer before frames to it are dropped
+BUS_PEER_BUFFER_LIMIT = 4 * 2 ** 20
+# Delay between hub election / reconnect attempts
+BUS_RETRY_SECONDS = 0.5
+
+# Process -> hub: frame length, sequenced flag. Hub -> process: sequence
+# number (0 for an unsequenced frame), frame length
+PUBLISH_HEADER = struct.Struct("!I?")
+DELIVER_HEADER = struct.Struct("!QI")
+# Sent by the hub to each process as it connects
+EPOCH_LENGTH = 16
+
+logger = logging.getLogger("eduroom.websocket.bus")
+
+
+def new_epoch():
+    return uuid.uuid4().hex[:EPOCH_LENGTH]
+
+
+class EventBus:
+    """Interface: deliver every published frame to every process's on_message"""
+
+    # Epoch of the sequence numbers being delivered
+    epoch = None
+
+    @property
+    def is_hub(self):
+        """True for the process that owns the numbering (and the event log file)"""
+        return True
+
+    async def start(self, on_message, last_seq=0, epoch=None):
+        """
+        Begin receiving; on_message(frame_json, seq) is awaited for each event
+        (seq is None for an event the bus could not or was told not to
+        sequence). Sequence numbers continue after last_seq within `epoch`
+        (a new epoch if None).
+        """
+        raise NotImplementedError
+
+    async def publish(self, message_json, sequenced=True):
+        """
+        Publish one serialized event to all processes (including this one).
+        sequenced=False delivers it without a number (ephemeral state).
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        """Stop receiving and release resources"""
+
+
+class LocalBus(EventBus):
+    """Single-process bus: published frames go straight back to on_message"""
+
+    def __init__(self):
+        self.on_message = None
+        self.seq = 0
+
+    async def start(self, on_message, last_seq=0, epoch=None):
+        self.on_message = on_message
+        self.seq = last_seq
+        self.epoch = epoch or new_epoch()
+
+    async def publish(self, message_json, sequenced=True):
+        if not sequenced:
+            await self.on_message(message_json, None)
+            return
+        self.seq += 1
+        await self.on_message(message_json, self.seq)
+
+
+class UnixSocketBus(EventBus):
+    """Hub-and-spoke bus over a Unix socket, with no external broker"""
+
+    def __init__(self, path=BUS_SOCKET_PATH):
+        self.path = path
+        self.on_message = None
+        self.lock_file = None
+        self.server = None
+        self.peers = set()
+        self.reader = None
+        self.writer = None
+        self.reader_task = None
+        self.closed = False
+        self.seq = 0  # Hub: last number assigned
+        self.hub_epoch = None  # Hub: epoch of its numbering
+        self.last_seq = 0  # Last number received
+
+    @property
+    def is_hub(self):
+        return self.server is not None
+
+    async def start(self, on_message, last_seq=0, epoch=None):
+        self.on_message = on_message
+        self.last_seq = last_seq
+        self.epoch = epoch
+        await self._connect()
+        self.reader_task = asyncio.create_task(self._read_loop())
+
+    def _try_become_hub(self):
+        """Take the hub lock if nobody holds it (non-blocking)"""
+        lock_file = open(self.path + ".lock", "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self.lock_file = lock_file
+        return True
+
+    async def _connect(self):
+        """Elect a hub if needed, then connect to it"""
+        while not self.closed:
+            if not self.is_hub and self._try_become_hub():
+                # The lock guarantees any socket file left behind is stale
+                if os.path.exists(self.path):
+                    os.unlink(self.path)
+                # Continue numbering (and its epoch) where the previous hub left off
+                self.seq = self.last_seq
+                self.hub_epoch = self.epoch or new_epoch()
+                self.server = await asyncio.start_unix_server(self._serve_peer, path=self.path)
+            try:
+                self.reader, self.writer = await asyncio.open_unix_connection(self.path)
+                epoch = (await self.reader.readexactly(EPOCH_LENGTH)).decode("ascii")
+            except (FileNotFoundError, ConnectionError, asyncio.IncompleteReadError):
+                self.writer = None
+                await asyncio.sleep(BUS_RETRY_SECONDS)
+                continue
+            if self.epoch is not None and epoch != self.epoch:
+                # Another numbering: our count does not carry over
+                self.last_seq = 0
+            self.epoch = epoch
+            return
+
+    async def _serve_peer(self, reader, writer):
+        """Hub side: relay every frame from one process to all processes"""
+        if self.closed:
+            writer.close()
+            return
+        self.peers.add(writer)
+        try:
+            writer.write(self.hub_epoch.encode("ascii"))
+            while not self.closed:
+                length, sequenced = PUBLISH_HEADER.unpack(await reader.readexactly(PUBLISH_HEADER.size))
+                if length > BUS_FRAME_LIMIT:
+                    # Skip the frame but stay in step with the stream
+                    logger.warning("bus_frame_dropped", extra={"fields": {"bytes": length}})
+                    while length:
+                        length -= len(await reader.readexactly(min(length, 65536)))
+                    continue
+                frame = await reader.readexactly(length)
+                if sequenced:
+                    self.seq += 1
+                stamped = DELIVER_HEADER.pack(self.seq if sequenced else 0, length) + frame
+                for peer in list(self.peers):
+                    # Never let one stuck process grow the hub's memory
+                    if peer.transport.get_write_buffer_size() < BUS_PEER_BUFFER_LIMIT:
+                        peer.write(stamped)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self.peers.discard(writer)
+            writer.close()
+
+    async def _read_loop(self):
+        """Deliver frames from the hub; re-elect and reconnect if it goes away"""
+        while not self.closed:
+            try:
+                seq, length = DELIVER_HEADER.unpack(await self.reader.readexactly(DELIVER_HEADER.size))
+                frame = await self.reader.readexactly(length)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                frame = None
+            if frame is not None:
+                if seq:
+                    self.last_seq = seq
+                try:
+                    await self.on_message(frame.decode("utf-8"), seq or None)
+                except Exception:
+                    # One bad frame must not stop delivery of the rest
+                    logger.exception("bus_frame_failed", extra={"fields": {"seq": seq}})
+                continue
+            if self.closed:
+                return
+            self.writer = None
+            await asyncio.sleep(BUS_RETRY_SECONDS)
+            await self._connect()
+
+    async def publish(self, message_json, sequenced=True):
+        frame = message_json.encode("utf-8")
+        if len(frame) > BUS_FRAME_LIMIT:
+            logger.warning("bus_frame_dropped", extra={"fields": {"bytes": len(frame)}})
+            return
+        if self.writer is not None:
+            try:
+                self.writer.write(PUBLISH_HEADER.pack(len(frame), sequenced) + frame)
+                await self.writer.drain()
+                return
+            except ConnectionError:
+                self.writer = None
+        # Hub unreachable - at least serve this process's subscribers. Only
+        # the hub numbers events, so this one goes out without a seq rather
+        # than with a number another process may also use
+        await self.on_message(message_json, None)
+
+    async def close(self):
+        self.closed = True
+        if self.reader_task:
+            self.reader_task.cancel()
+        if self.writer:
+            self.writer.close()
+        if self.server:
+            self.server.close()
+            for peer in list(self.peers):
+                peer.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+        if self.lock_file:
+            self.lock_file.close()
+
+
+# Available backends by WS_BUS name
+BUS_BACKENDS = {
+    "local": LocalBus,
+    "unix": UnixSocketBus,
+}
+
+
+def create_bus(kind="local"):
+    """Build the configured bus backend"""
+    if kind not in BUS_BACKENDS:
+        raise ValueError(f"Unknown event bus '{kind}'. Available: {', '.join(BUS_BACKENDS)}")
+    return BUS_BACKENDS[kind]()
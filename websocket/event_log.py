@@ -0,0 +1,150 @@
+"""
+Event Log for Replay-on-Reconnect
+=================================
+Keeps the most recent sequenced events so reconnecting clients can catch up
+
+Features:
+- Bounded in-memory ring buffer of (seq, topics, frame)
+- Sequence numbers belong to an epoch (set by the event bus); a client
+  whose epoch or last_seq this log cannot account for - e.g. after a
+  restart without a spill file - must resync instead of replaying
+- Optional append-only file (one "seq<TAB>frame" line per event, and an
+  "epoch<TAB>id" line where an epoch starts); on start the tail of the file
+  refills the ring and numbering continues. Only the process that owns the
+  log (the bus hub) writes it, and writes are flushed periodically rather
+  than per event. Once the file holds twice the ring's capacity it is
+  rewritten to just the ring, so it (and the read on start) stays bounded
+- since(last_seq, topics) returns only the missed events a client may see
+"""
+
+import json
+import os
+from collections import deque
+
+# Events kept in memory for replay
+EVENT_LOG_SIZE = int(os.getenv("WS_EVENT_LOG_SIZE", "1000"))
+# Append-only spill file (empty disables)
+EVENT_LOG_PATH = os.getenv("WS_EVENT_LOG_PATH", "")
+
+
+def with_seq(frame, seq):
+    """Insert "seq" into a serialized JSON object without re-encoding it"""
+    body = frame.strip()[1:]
+    separator = "" if body.lstrip().startswith("}") else ", "
+    return f'{{"seq": {seq}{separator}{body}'
+
+
+class EventLog:
+    """Ring buffer of recent events, optionally mirrored to an append-only file"""
+
+    def __init__(self, capacity=EVENT_LOG_SIZE, path=EVENT_LOG_PATH):
+        self.capacity = capacity
+        self.path = path or None
+        self.events = deque(maxlen=capacity)
+        self.last_seq = 0
+        self.epoch = None
+        self.file = None
+        self.lines = 0  # Event lines in the spill file
+        if self.path:
+            self._load()
+
+    def _load(self):
+        """Refill the ring from the end of the spill file"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                key, value = line.rstrip("\n").split("\t", 1)
+                if key == "epoch":
+                    if value != self.epoch:
+                        self._start_epoch(value)
+                    continue
+                message = json.loads(value)
+                self._remember(int(key), message.get("topics"), value)
+                self.lines += 1
+
+    def _compact(self):
+        """Rewrite the spill file to hold only the ring's events"""
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            if self.epoch is not None:
+                f.write(f"epoch\t{self.epoch}\n")
+            for seq, _, frame in self.events:
+                f.write(f"{seq}\t{frame}\n")
+        if self.file:
+            self.file.close()
+        os.replace(temp_path, self.path)
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.lines = len(self.events)
+
+    def _start_epoch(self, epoch):
+        self.events.clear()
+        self.last_seq = 0
+        self.epoch = epoch
+
+    def _remember(self, seq, topics, frame):
+        self.events.append((seq, tuple(topics) if topics else None, frame))
+        self.last_seq = max(self.last_seq, seq)
+
+    def set_epoch(self, epoch):
+        """Adopt the bus's epoch; events numbered in another epoch are dropped"""
+        if epoch == self.epoch:
+            return
+        if self.epoch is None:
+            self.epoch = epoch  # First epoch: the loaded events belong to it
+        else:
+            self._start_epoch(epoch)
+        if self.file:
+            self.file.write(f"epoch\t{epoch}\n")
+
+    def append(self, seq, topics, frame, persist=True):
+        """
+        Record one event (frame already carries its seq). persist=False keeps
+        it in memory only, for processes that do not own the spill file.
+        """
+        self._remember(seq, topics, frame)
+        if persist and self.path:
+            if self.file is None:
+                self.file = open(self.path, "a", encoding="utf-8")
+                if self.epoch is not None:
+                    self.file.write(f"epoch\t{self.epoch}\n")
+            self.file.write(f"{seq}\t{frame}\n")
+            self.lines += 1
+            if self.lines >= 2 * self.capacity:
+                self._compact()
+
+    def flush(self):
+        """Push buffered spill-file writes to the OS"""
+        if self.file:
+            self.file.flush()
+
+    @property
+    def first_seq(self):
+        """Oldest sequence number still available (0 if empty)"""
+        return self.events[0][0] if self.events else 0
+
+    def can_replay(self, last_seq, epoch=None):
+        """
+        True if every event after last_seq is still in the buffer. False for
+        another epoch or a last_seq this log never reached (the client saw a
+        numbering that was lost, e.g. in a restart).
+        """
+        if epoch != self.epoch or last_seq > self.last_seq:
+            return False
+        return not self.events or last_seq >= self.first_seq - 1
+
+    def since(self, last_seq, topics):
+        """
+        Frames after last_seq visible to a client subscribed to `topics`.
+        Events without topics were broadcasts and are always visible.
+        """
+        topics = set(topics)
+        return [
+            frame for seq, event_topics, frame in self.events
+            if seq > last_seq and (event_topics is None or topics.intersection(event_topics))
+        ]
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
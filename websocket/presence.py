@@ -0,0 +1,118 @@
+"""
+Presence and Slot Holds
+=======================
+Who is looking at which room/date, and which time slots are being filled in
+
+Both are soft, in-memory state with a TTL: a viewer disappears unless it
+re-announces itself within PRESENCE_TTL_SECONDS, and a hold lapses after
+HOLD_TTL_SECONDS unless renewed. Nothing here is authoritative - the
+database still decides on submit - it only lets concurrent bookers see
+each other before they race.
+
+Keys are (classroom_id, date); viewers are keyed by an opaque viewer id
+(one per browser session), so one user with two tabs counts twice.
+"""
+
+import time
+
+# A viewer who has not re-announced within this long is gone
+PRESENCE_TTL_SECONDS = 30
+# A slot hold lapses after this long unless renewed
+HOLD_TTL_SECONDS = 120
+
+
+class PresenceTracker:
+    """Expiring maps of viewers and slot holds per (classroom_id, date)"""
+
+    def __init__(self, presence_ttl=PRESENCE_TTL_SECONDS, hold_ttl=HOLD_TTL_SECONDS, clock=time.monotonic):
+        self.presence_ttl = presence_ttl
+        self.hold_ttl = hold_ttl
+        self.clock = clock
+        self.viewers = {}  # key -> viewer_id -> {"user_id", "name", "expires"}
+        self.holds = {}  # key -> viewer_id -> {"user_id", "name", "start_time", "end_time", "expires"}
+
+    def view(self, key, viewer_id, user_id, name):
+        """Announce (or keep alive) a viewer of a room/date"""
+        self.viewers.setdefault(key, {})[viewer_id] = {
+            "user_id": user_id, "name": name, "expires": self.clock() + self.presence_ttl,
+        }
+
+    def hold(self, key, viewer_id, user_id, name, start_time, end_time):
+        """Place or move this viewer's soft hold (one per viewer per room/date)"""
+        self.view(key, viewer_id, user_id, name)
+        self.holds.setdefault(key, {})[viewer_id] = {
+            "user_id": user_id, "name": name, "start_time": start_time, "end_time": end_time,
+            "expires": self.clock() + self.hold_ttl,
+        }
+
+    def release(self, key, viewer_id):
+        """Drop this viewer's hold"""
+        self._discard(self.holds, key, viewer_id)
+
+    def leave(self, key, viewer_id):
+        """Viewer closed the form: drop presence and hold"""
+        self._discard(self.viewers, key, viewer_id)
+        self._discard(self.holds, key, viewer_id)
+
+    def apply(self, payload):
+        """
+        Apply one presence message from the app.
+
+        Returns:
+            tuple: The (classroom_id, date) key that changed
+        """
+        key = (payload.get("classroom_id"), payload.get("date"))
+        viewer_id = payload.get("viewer_id")
+        action = payload.get("action")
+        if action == "view":
+            self.view(key, viewer_id, payload.get("user_id"), payload.get("name"))
+        elif action == "hold":
+            self.hold(key, viewer_id, payload.get("user_id"), payload.get("name"),
+                      payload.get("start_time"), payload.get("end_time"))
+        elif action == "release":
+            self.release(key, viewer_id)
+        elif action == "leave":
+            self.leave(key, viewer_id)
+        return key
+
+    def snapshot(self, key):
+        """Current viewers and holds of a room/date, ready to push"""
+        classroom_id, date = key
+        return {
+            "classroom_id": classroom_id,
+            "date": date,
+            "viewers": [
+                {"viewer_id": viewer_id, "user_id": v["user_id"], "name": v["name"]}
+                for viewer_id, v in self.viewers.get(key, {}).items()
+            ],
+            "holds": [
+                {"viewer_id": viewer_id, "user_id": h["user_id"], "name": h["name"],
+                 "start_time": h["start_time"], "end_time": h["end_time"]}
+                for viewer_id, h in self.holds.get(key, {}).items()
+            ],
+        }
+
+    def expire(self):
+        """
+        Drop lapsed viewers and holds.
+
+        Returns:
+            set: Keys whose snapshot changed
+        """
+        now = self.clock()
+        changed = set()
+        for entries in (self.viewers, self.holds):
+            for key in list(entries):
+                for viewer_id in [v for v, entry in entries[key].items() if entry["expires"] <= now]:
+                    self._discard(entries, key, viewer_id)
+                    changed.add(key)
+        return changed
+
+    @staticmethod
+    def _discard(entries, key, viewer_id):
+        by_viewer = entries.get(key)
+        if by_viewer is None:
+            return
+        by_viewer.pop(viewer_id, None)
+        if not by_viewer:
+            del entries[key]
@@ -0,0 +1,237 @@
+"""
+Realtime Wire Protocol
+======================
+Compact binary encoding of realtime events, with JSON as the fallback
+
+Negotiated per connection through the WebSocket subprotocol:
+- "eduroom.v1.bin":  binary frames (below)
+- "eduroom.v1.json": the original JSON frames (also used when the client
+                     offers no subprotocol - handy for debugging)
+
+Binary frame (version 1):
+    header  struct "!BBBI"  version, flags, event code, seq (0 = none)
+    body    the remaining fields as one packed map (see pack_value),
+            zlib-deflated when larger than COMPRESS_THRESHOLD (FLAG_DEFLATE);
+            a received frame may inflate to at most MAX_DECODED bytes
+
+Event types are sent as one-byte codes (EVENT_CODES); an unknown type is
+sent as code 0 with its name kept in the body. A batch is code
+EVENT_CODES["batch"] with a list of already-encoded frames as its body, so
+shared frames are never re-encoded per client.
+"""
+
+import struct
+import zlib
+
+PROTOCOL_VERSION = 1
+BINARY_SUBPROTOCOL = "eduroom.v1.bin"
+JSON_SUBPROTOCOL = "eduroom.v1.json"
+# Server preference order
+SUBPROTOCOLS = (BINARY_SUBPROTOCOL, JSON_SUBPROTOCOL)
+
+# Bodies larger than this are deflated once, before being shared
+COMPRESS_THRESHOLD = 1024
+# Most bytes one received frame may inflate to (batched frames included)
+MAX_DECODED = 2 ** 20
+
+FLAG_DEFLATE = 0x01
+
+# Stable one-byte event codes (append only - never renumber)
+EVENT_CODES = {
+    "subscribe": 1,
+    "unsubscribe": 2,
+    "batch": 3,
+    "resync_required": 4,
+    "new_reservation": 5,
+    "reservation_approved": 6,
+    "reservation_rejected": 7,
+    "notification": 8,
+    "analytics_counters": 9,
+    "presence": 10,
+    "presence_update": 11,
+    "welcome": 12,
+}
+EVENT_TYPES = {code: event_type for event_type, code in EVENT_CODES.items()}
+UNKNOWN_EVENT = 0
+
+HEADER = struct.Struct("!BBBI")
+
+# Value tags
+_NONE, _TRUE, _FALSE, _INT, _FLOAT, _STR, _BYTES, _LIST, _MAP = b"NTFidsblm"
+_INT64 = struct.Struct("!q")
+_FLOAT64 = struct.Struct("!d")
+_LENGTH = struct.Struct("!I")
+
+
+def select_subprotocol(connection, subprotocols):
+    """Server hook: honour the client's order, fall back to plain JSON"""
+    for subprotocol in subprotocols:
+        if subprotocol in SUBPROTOCOLS:
+            return subprotocol
+    return None
+
+
+def pack_value(value, out):
+    """Append the tagged binary form of a JSON-like value to bytearray `out`"""
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, int):
+        out.append(_INT)
+        out += _INT64.pack(value)
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out += _FLOAT64.pack(value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out.append(_STR)
+        out += _LENGTH.pack(len(data))
+        out += data
+    elif isinstance(value, (bytes, bytearray)):
+        out.append(_BYTES)
+        out += _LENGTH.pack(len(value))
+        out += value
+    elif isinstance(value, (list, tuple)):
+        out.append(_LIST)
+        out += _LENGTH.pack(len(value))
+        for item in value:
+            pack_value(item, out)
+    elif isinstance(value, dict):
+        out.append(_MAP)
+        out += _LENGTH.pack(len(value))
+        for key, item in value.items():
+            pack_value(str(key), out)
+            pack_value(item, out)
+    else:
+        # Same behaviour as json.dumps(default=str)
+        pack_value(str(value), out)
+
+
+def unpack_value(data, offset=0):
+    """
+    Returns:
+        tuple: (value, offset just past it)
+    """
+    tag = data[offset]
+    offset += 1
+    if tag == _NONE:
+        return None, offset
+    if tag == _TRUE:
+        return True, offset
+    if tag == _FALSE:
+        return False, offset
+    if tag == _INT:
+        return _INT64.unpack_from(data, offset)[0], offset + 8
+    if tag == _FLOAT:
+        return _FLOAT64.unpack_from(data, offset)[0], offset + 8
+    if tag in (_STR, _BYTES, _LIST, _MAP):
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += 4
+        if tag in (_STR, _BYTES) and offset + length > len(data):
+            raise ValueError("Value runs past the end of the frame")
+        if tag == _STR:
+            return bytes(data[offset:offset + length]).decode("utf-8"), offset + length
+        if tag == _BYTES:
+            return bytes(data[offset:offset + length]), offset + length
+        if tag == _LIST:
+            items = []
+            for _ in range(length):
+                item, offset = unpack_value(data, offset)
+                items.append(item)
+            return items, offset
+        result = {}
+        for _ in range(length):
+            key, offset = unpack_value(data, offset)
+            result[key], offset = unpack_value(data, offset)
+        return result, offset
+    raise ValueError(f"Unknown value tag {tag!r}")
+
+
+def _frame(code, seq, body_value):
+    body = bytearray()
+    pack_value(body_value, body)
+    flags = 0
+    if len(body) > COMPRESS_THRESHOLD:
+        body = zlib.compress(bytes(body))
+        flags |= FLAG_DEFLATE
+    return HEADER.pack(PROTOCOL_VERSION, flags, code, seq or 0) + bytes(body)
+
+
+def encode(message, seq=None):
+    """Encode one event dict ({"type", "payload", "topics", ...}) as a binary frame"""
+    fields = dict(message)
+    event_type = fields.pop("type", None)
+    seq = fields.pop("seq", seq)
+    code = EVENT_CODES.get(event_type, UNKNOWN_EVENT)
+    if code == UNKNOWN_EVENT:
+        fields["type"] = event_type
+    return _frame(code, seq, fields)
+
+
+def encode_batch(frames):
+    """Wrap already-encoded binary frames into one batch frame"""
+    return _frame(EVENT_CODES["batch"], None, list(frames))
+
+
+def peek_type(frame):
+    """
+    Event type of a binary frame, read from the header alone
+    (None for a type without a code).
+
+    Raises:
+        ValueError: Unsupported protocol version or truncated header
+    """
+    try:
+        version, _, code, _ = HEADER.unpack_from(frame, 0)
+    except struct.error as e:
+        raise ValueError(f"Malformed frame: {e}") from None
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported protocol version {version}")
+    return EVENT_TYPES.get(code)
+
+
+def decode(frame):
+    """
+    Decode a binary frame back to the JSON-equivalent dict
+    (a batch becomes {"type": "batch", "events": [...]}).
+
+    Raises:
+        ValueError: Unsupported protocol version or malformed frame
+    """
+    try:
+        return _decode(frame, [MAX_DECODED])
+    except ValueError:
+        raise
+    except (struct.error, IndexError, KeyError, TypeError, AttributeError, zlib.error, RecursionError) as e:
+        raise ValueError(f"Malformed frame: {e!r}") from None
+
+
+def _decode(frame, budget):
+    """decode(), charging inflated bodies to budget[0] (bytes left)"""
+    version, flags, code, seq = HEADER.unpack_from(frame, 0)
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported protocol version {version}")
+    body = memoryview(frame)[HEADER.size:]
+    if flags & FLAG_DEFLATE:
+        # One byte over the budget shows the frame does not fit (0 would mean no limit)
+        inflater = zlib.decompressobj()
+        body = inflater.decompress(body, budget[0] + 1)
+        if len(body) > budget[0] or inflater.unconsumed_tail:
+            raise ValueError(f"Frame inflates to more than {MAX_DECODED} bytes")
+        budget[0] -= len(body)
+    value, _ = unpack_value(body)
+
+    if code == EVENT_CODES["batch"]:
+        return {"type": "batch", "events": [_decode(item, budget) for item in value]}
+    if not isinstance(value, dict):
+        raise ValueError("Frame body is not a map")
+    message = {}
+    if seq:
+        message["seq"] = seq
+    if code != UNKNOWN_EVENT:
+        message["type"] = EVENT_TYPES.get(code, "unknown")
+    message.update(value)
+    return message
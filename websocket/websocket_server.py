@@ -2,58 +2,693 @@
 WebSocket Server for Real-Time Updates
 =======================================
 Run this separately: python websocket_server.py
+
+Clients receive only the events for topics they subscribed to:
+    {"type": "subscribe", "payload": {"topics": ["user:5", "role:admin"]}}
+    {"type": "unsubscribe", "payload": {"topics": ["classroom:3"]}}
+
+Published events name their topics; events without topics go to "all",
+which every client is subscribed to on connect:
+    {"type": "reservation_approved", "payload": {...}, "topics": ["user:5"]}
+
+Each client has a bounded outbound queue drained by its own writer task,
+so a slow or stalled client never delays delivery to anyone else. When a
+queue is full the oldest message is dropped (state-snapshot events are
+coalesced instead), and clients that stay full or stall on a send are
+disconnected.
+
+Each event is serialized once and the same frame is shared by every
+recipient. High-frequency event types are micro-batched: per client they
+are collected for one tick and sent as a single frame
+    {"type": "batch", "events": [{...}, {...}]}
+
+Logging is structured (one JSON object per line) and goes through a
+queue so the event loop never blocks on stdout. Set WS_LOG_LEVEL=DEBUG
+to log every published event.
+
+Set WS_WORKERS=N to run N server processes on the same port
+(SO_REUSEPORT, Linux). Events are shared between them over the event bus
+(see bus.py), so a publish through any process reaches every subscriber.
+
+Every delivered event carries a "seq" number, counted within an epoch.
+On connect the server sends
+    {"type": "welcome", "payload": {"epoch": "...", "last_seq": 41}}
+A reconnecting client sends its last seen number and epoch with its
+subscription
+    {"type": "subscribe", "payload": {"topics": [...], "last_seq": 41, "epoch": "..."}}
+and receives only the events it missed (see event_log.py), or
+{"type": "resync_required"} if they are no longer buffered or belong to
+another epoch (e.g. the server restarted) - the client then reloads.
+
+Connections must present a signed token (?token=..., see auth.py),
+checked once at the handshake. Without WS_TOKEN_SECRET the server refuses
+to start unless WS_AUTH_DISABLED=1 (local development only). A user's
+connection joins its own user:/role: topics automatically, may only
+subscribe to those and classroom topics, and may not publish; only the
+app's "service" connection publishes events.
+
+The app reports who is viewing which room/date and which slots are being
+filled in ("presence" messages, see presence.py). The server keeps them in
+an expiring map and pushes a "presence_update" snapshot to the
+classroom:<id> topic whenever it changes.
+
+Plain HTTP GET /metrics on the same port returns this process's counters
+as JSON (clients, messages in/out, queue depths, event-loop lag).
+
+Clients may negotiate the compact binary protocol (see protocol.py) with
+the "eduroom.v1.bin" subprotocol; others get JSON. Frames are encoded at
+most once per format and shared by every recipient of that format.
 """
 
 import asyncio
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
+import time
+from collections import deque
+from http import HTTPStatus
+from urllib.parse import parse_qs
+
 import websockets
 import json
 
-# Store all connected clients
+try:
+    from websocket.bus import create_bus
+    from websocket.event_log import EventLog, with_seq
+    from websocket import protocol
+    from websocket import auth
+    from websocket.presence import PresenceTracker
+except ImportError:
+    # Run as a script from inside websocket/
+    from bus import create_bus
+    from event_log import EventLog, with_seq
+    import protocol
+    import auth
+    from presence import PresenceTracker
+
+WS_HOST = os.getenv("WS_HOST", "localhost")
+WS_PORT = int(os.getenv("WS_PORT", "8765"))
+# Server processes sharing the port
+WS_WORKERS = int(os.getenv("WS_WORKERS", "1"))
+# Event bus backend shared by the workers ("local" only works with one worker)
+WS_BUS = os.getenv("WS_BUS", "unix" if WS_WORKERS > 1 else "local")
+
+# Topic every client joins on connect (legacy broadcast)
+BROADCAST_TOPIC = "all"
+# Allowed topic families: per user, per role, per classroom
+TOPIC_PREFIXES = ("user:", "role:", "classroom:")
+
+# Outbound messages buffered per client before dropping
+OUTBOUND_QUEUE_SIZE = 256
+# Events where only the newest matters: a queued one is replaced, not appended
+COALESCE_EVENT_TYPES = {"analytics_counters"}
+# Disconnect a client whose queue stays full this long
+SLOW_CONSUMER_SECONDS = 10
+# Disconnect a client when a single send takes longer than this
+SEND_TIMEOUT_SECONDS = 5
+# How often queue metrics are printed (0 disables)
+METRICS_INTERVAL_SECONDS = 60
+# HTTP path serving get_metrics() as JSON
+METRICS_PATH = "/metrics"
+# How often event-loop lag is sampled
+LOOP_LAG_INTERVAL_SECONDS = 0.5
+
+# Event types collected per client and sent as one frame per tick
+BATCH_EVENT_TYPES = {"notification", "new_reservation", "analytics_counters"}
+# Micro-batch tick
+BATCH_INTERVAL_SECONDS = 0.05
+# Frame types any client may send; everything else is a publish
+CLIENT_EVENT_TYPES = {"subscribe", "unsubscribe"}
+
+# App -> server presence reports, and the snapshots pushed to viewers
+PRESENCE_EVENT = "presence"
+PRESENCE_UPDATE_EVENT = "presence_update"
+# How often lapsed viewers/holds are swept
+PRESENCE_SWEEP_SECONDS = 5
+
+# How often the event log's spill file is flushed
+EVENT_LOG_FLUSH_SECONDS = 1
+
+logger = logging.getLogger("eduroom.websocket")
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including `extra` fields"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "event": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, default=str)
+
+
+def setup_logging(level=None):
+    """
+    Route server logs through a queue to a background thread.
+
+    Returns:
+        QueueListener: already started; call stop() to flush on shutdown
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(StructuredFormatter())
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+
+    logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    logger.setLevel(level or os.getenv("WS_LOG_LEVEL", "INFO"))
+    logger.propagate = False
+    return listener
+
+
+# Server-wide delivery counters (see get_metrics)
+metrics = {
+    "received": 0,
+    "published": 0,
+    "replayed": 0,
+    "resyncs": 0,
+    "batches": 0,
+    "delivered": 0,
+    "dropped": 0,
+    "coalesced": 0,
+    "send_errors": 0,
+    "slow_disconnects": 0,
+    "auth_failures": 0,
+    "rejected": 0,
+    "invalid_frames": 0,
+    "loop_lag_ms": 0.0,
+    "max_loop_lag_ms": 0.0,
+}
+
+
+class ClientConnection:
+    """A connected client with its bounded outbound queue and writer task"""
+
+    def __init__(self, websocket, max_queue=OUTBOUND_QUEUE_SIZE):
+        self.websocket = websocket
+        # Negotiated binary protocol; otherwise JSON text frames
+        self.binary = getattr(websocket, "subprotocol", None) == protocol.BINARY_SUBPROTOCOL
+        # Verified token claims (None when authentication is disabled)
+        self.identity = getattr(websocket, "identity", None)
+        self.max_queue = max_queue
+        self.queue = deque()  # (event_type, frame in this client's format)
+        self.batch = []  # (event_type, frame) waiting for the next tick
+        self.has_data = asyncio.Event()
+        self.dropped = 0
+        self.full_since = None
+        self.closing = False
+        self.writer = None
+
+    def start(self):
+        """Start the writer task"""
+        self.writer = asyncio.create_task(self.run_writer())
+
+    def enqueue(self, message_json, event_type=None):
+        """Queue a message without blocking; apply coalesce/drop policies"""
+        if self.closing:
+            return
+        if event_type in COALESCE_EVENT_TYPES:
+            for index, (queued_type, _) in enumerate(self.queue):
+                if queued_type == event_type:
+                    self.queue[index] = (event_type, message_json)
+                    metrics["coalesced"] += 1
+                    return
+
+        if len(self.queue) >= self.max_queue:
+            self.queue.popleft()
+            self.dropped += 1
+            metrics["dropped"] += 1
+            now = time.monotonic()
+            if self.full_since is None:
+                self.full_since = now
+            elif now - self.full_since > SLOW_CONSUMER_SECONDS:
+                self.disconnect_slow("queue full")
+                return
+        self.queue.append((event_type, message_json))
+        self.has_data.set()
+
+    def add_to_batch(self, message_json, event_type=None):
+        """Hold a high-frequency event until the next tick (snapshots coalesce)"""
+        if event_type in COALESCE_EVENT_TYPES:
+            for index, (queued_type, _) in enumerate(self.batch):
+                if queued_type == event_type:
+                    self.batch[index] = (event_type, message_json)
+                    metrics["coalesced"] += 1
+                    return
+        self.batch.append((event_type, message_json))
+
+    def flush_batch(self):
+        """Queue the held events as a single frame"""
+        if not self.batch:
+            return
+        if len(self.batch) == 1:
+            event_type, message_json = self.batch[0]
+            self.enqueue(message_json, event_type)
+        elif self.binary:
+            self.enqueue(protocol.encode_batch(m for _, m in self.batch), "batch")
+            metrics["batches"] += 1
+        else:
+            # Frames are already serialized - join them instead of re-encoding
+            frame = '{"type": "batch", "events": [' + ", ".join(m for _, m in self.batch) + ']}'
+            self.enqueue(frame, "batch")
+            metrics["batches"] += 1
+        self.batch = []
+
+    async def run_writer(self):
+        """Drain the queue to the socket, one message at a time"""
+        try:
+            while True:
+                await self.has_data.wait()
+                while self.queue:
+                    _, message_json = self.queue.popleft()
+                    try:
+                        await asyncio.wait_for(self.websocket.send(message_json), SEND_TIMEOUT_SECONDS)
+                        metrics["delivered"] += 1
+                    except asyncio.TimeoutError:
+                        self.disconnect_slow("send timeout")
+                        return
+                    except websockets.exceptions.ConnectionClosed:
+                        return
+                    except Exception as e:
+                        metrics["send_errors"] += 1
+                        logger.warning("send_failed", extra={"fields": {"error": str(e)}})
+                self.full_since = None
+                self.has_data.clear()
+        except asyncio.CancelledError:
+            pass
+
+    def disconnect_slow(self, reason):
+        """Close a client that cannot keep up"""
+        if self.closing:
+            return
+        self.closing = True
+        self.queue.clear()
+        metrics["slow_disconnects"] += 1
+        logger.warning("slow_consumer_disconnected", extra={"fields": {"reason": reason, "dropped": self.dropped}})
+        asyncio.ensure_future(self.websocket.close(code=1008, reason="slow consumer"))
+
+    def stop(self):
+        """Cancel the writer task"""
+        self.closing = True
+        if self.writer:
+            self.writer.cancel()
+
+
+# Store all connected clients (ClientConnection)
 connected_clients = set()
+# Clients holding events for the next batch tick
+batching_clients = set()
+# Event bus shared with the other server processes (set in serve())
+event_bus = None
+# Recent sequenced events for replay-on-reconnect
+event_log = EventLog()
+# Viewers and soft slot holds per (classroom_id, date)
+presence = PresenceTracker()
+# Topic -> set of subscribed clients
+topic_subscribers = {}
+# Client -> set of its topics (for cleanup on disconnect)
+client_topics = {}
+
+
+def is_valid_topic(topic):
+    """Check a topic name is the broadcast topic or a known family"""
+    return isinstance(topic, str) and (topic == BROADCAST_TOPIC or topic.startswith(TOPIC_PREFIXES))
+
+
+def allowed_topics(client, topics):
+    """Topics a client may join: anything for the service, else its own and classrooms"""
+    identity = client.identity
+    if identity is None or identity.get("role") == auth.SERVICE_ROLE:
+        return list(topics)
+    own = set(auth.identity_topics(identity))
+    return [t for t in topics if t == BROADCAST_TOPIC or t in own or (isinstance(t, str) and t.startswith("classroom:"))]
+
+
+def may_publish(client):
+    """Only the app's service connection may publish (anyone, under the dev opt-out)"""
+    if not auth.auth_enabled():
+        return auth.open_access_allowed()
+    return client.identity is not None and client.identity.get("role") == auth.SERVICE_ROLE
+
+
+def subscribe(client, topics):
+    """Add a client to each valid topic"""
+    joined = client_topics.setdefault(client, set())
+    for topic in topics:
+        if is_valid_topic(topic):
+            topic_subscribers.setdefault(topic, set()).add(client)
+            joined.add(topic)
+
+
+def unsubscribe(client, topics):
+    """Remove a client from the given topics"""
+    joined = client_topics.get(client, set())
+    for topic in topics:
+        subscribers = topic_subscribers.get(topic)
+        if subscribers is not None:
+            subscribers.discard(client)
+            if not subscribers:
+                del topic_subscribers[topic]
+        joined.discard(topic)
+
+
+def remove_client(client):
+    """Drop a client from every topic it joined"""
+    unsubscribe(client, list(client_topics.get(client, ())))
+    client_topics.pop(client, None)
+    connected_clients.discard(client)
+    batching_clients.discard(client)
+
+
+def subscribers_for(topics):
+    """Union of the subscribers of the given topics - O(subscribers)"""
+    recipients = set()
+    for topic in topics:
+        recipients |= topic_subscribers.get(topic, set())
+    return recipients
+
+
+def send_control(client, event_type, payload):
+    """Queue a server message (not an event) for one client"""
+    message = {"type": event_type, "payload": payload}
+    client.enqueue(protocol.encode(message) if client.binary else json.dumps(message), event_type)
+
+
+def replay(client, last_seq, epoch=None):
+    """
+    Queue the events a reconnecting client missed since last_seq.
+
+    Returns:
+        int: Number of events replayed (0 when a resync was requested)
+    """
+    if not event_log.can_replay(last_seq, epoch):
+        frames = None
+    else:
+        frames = event_log.since(last_seq, client_topics.get(client, ()))
+    if frames is None or len(frames) > client.max_queue:
+        # Too far behind, or numbered in another epoch - the client has to
+        # reload from the database
+        metrics["resyncs"] += 1
+        send_control(client, "resync_required", {"last_seq": event_log.last_seq, "epoch": event_log.epoch})
+        return 0
+    for frame in frames:
+        # The log keeps JSON; re-encoding for binary clients is fine on this rare path
+        client.enqueue(protocol.encode(json.loads(frame)) if client.binary else frame, "replay")
+    metrics["replayed"] += len(frames)
+    return len(frames)
+
+
+def get_metrics():
+    """Delivery counters plus current queue depth"""
+    depths = [len(client.queue) for client in connected_clients]
+    return dict(
+        metrics,
+        pid=os.getpid(),
+        clients=len(connected_clients),
+        queued=sum(depths),
+        max_queue_depth=max(depths, default=0),
+    )
+
+
+async def report_metrics():
+    """Log queue metrics periodically"""
+    while METRICS_INTERVAL_SECONDS:
+        await asyncio.sleep(METRICS_INTERVAL_SECONDS)
+        if connected_clients:
+            logger.info("metrics", extra={"fields": get_metrics()})
+
+
+async def monitor_loop_lag():
+    """Sample how late the event loop wakes up (time spent blocked by other work)"""
+    while True:
+        start = time.monotonic()
+        await asyncio.sleep(LOOP_LAG_INTERVAL_SECONDS)
+        lag_ms = max(0.0, (time.monotonic() - start - LOOP_LAG_INTERVAL_SECONDS) * 1000)
+        metrics["loop_lag_ms"] = round(lag_ms, 2)
+        metrics["max_loop_lag_ms"] = max(metrics["max_loop_lag_ms"], metrics["loop_lag_ms"])
+
+
+def process_request(connection, request):
+    """Serve GET /metrics over plain HTTP; verify the token of everything else"""
+    path, _, query = request.path.partition("?")
+    if path == METRICS_PATH:
+        response = connection.respond(HTTPStatus.OK, json.dumps(get_metrics()) + "\n")
+        del response.headers["Content-Type"]
+        response.headers["Content-Type"] = "application/json"
+        return response
+    if not auth.auth_enabled():
+        return None
+    token = parse_qs(query).get("token", [None])[0]
+    claims = auth.verify_token(token) if token else None
+    if claims is None:
+        metrics["auth_failures"] += 1
+        logger.warning("auth_rejected", extra={"fields": {"reason": "missing token" if not token else "invalid or expired token"}})
+        return connection.respond(HTTPStatus.UNAUTHORIZED, "Invalid or expired token\n")
+    # Read by ClientConnection in handler()
+    connection.identity = claims
+    return None
+
+
+def flush_batches():
+    """Send every client's held events as one frame each"""
+    clients = list(batching_clients)
+    batching_clients.clear()
+    for client in clients:
+        client.flush_batch()
+
+
+async def run_batcher():
+    """Flush micro-batches once per tick"""
+    while True:
+        await asyncio.sleep(BATCH_INTERVAL_SECONDS)
+        if batching_clients:
+            flush_batches()
+
+
+def update_subscription(client, event_type, payload):
+    """Apply a subscribe (with optional replay) or unsubscribe request"""
+    if event_type == "subscribe":
+        subscribe(client, allowed_topics(client, payload.get("topics", [])))
+        if payload.get("last_seq") is not None:
+            replay(client, int(payload["last_seq"]), payload.get("epoch"))
+    else:
+        unsubscribe(client, payload.get("topics", []))
+
+
+def reject_publish(client, event_type):
+    """Count and log a publish from a client without the right to publish"""
+    metrics["rejected"] += 1
+    logger.warning("publish_rejected", extra={"fields": {"type": event_type, "sub": client.identity and client.identity.get("sub")}})
+
+
+def read_frame(client, message):
+    """
+    Parse one received frame (binary clients send binary frames).
+
+    A binary publish from a client that may not publish is turned away on
+    its header, before the body is inflated or parsed.
+
+    Returns:
+        tuple: (event dict, frame as JSON text), or None if the frame was dropped
+    """
+    try:
+        if isinstance(message, bytes):
+            event_type = protocol.peek_type(message)
+            if event_type not in CLIENT_EVENT_TYPES and not may_publish(client):
+                reject_publish(client, event_type)
+                return None
+            data = protocol.decode(message)
+            message = json.dumps(data)
+        else:
+            data = json.loads(message)
+    except ValueError as e:
+        data = e
+    if not isinstance(data, dict):
+        metrics["invalid_frames"] += 1
+        logger.warning("invalid_frame", extra={"fields": {"bytes": len(message), "error": str(data)[:80]}})
+        return None
+    return data, message
 
 
 async def handler(websocket):
     """Handle WebSocket connections (new API - no path parameter)"""
     # Register new client
-    connected_clients.add(websocket)
-    print(f"✅ Client connected. Total clients: {len(connected_clients)}")
-    
+    client = ClientConnection(websocket)
+    client.start()
+    connected_clients.add(client)
+    # Authenticated users are routed by identity from the start
+    subscribe(client, [BROADCAST_TOPIC] + (auth.identity_topics(client.identity) if client.identity else []))
+    send_control(client, "welcome", {"epoch": event_log.epoch, "last_seq": event_log.last_seq})
+    logger.info("client_connected", extra={"fields": {"clients": len(connected_clients)}})
+
     try:
         async for message in websocket:
-            # Parse incoming message
-            data = json.loads(message)
-            print(f"📨 Received: {data}")
-            
-            # Broadcast to ALL connected clients (including sender)
-            await broadcast(data)
-            
+            frame = read_frame(client, message)
+            if frame is None:
+                continue
+            data, message = frame
+            metrics["received"] += 1
+            event_type = data.get("type")
+
+            if event_type in CLIENT_EVENT_TYPES:
+                try:
+                    update_subscription(client, event_type, data.get("payload", {}))
+                except (AttributeError, TypeError, ValueError):
+                    # A malformed request costs the client that frame, not the connection
+                    metrics["invalid_frames"] += 1
+                    logger.warning("invalid_frame", extra={"fields": {"type": event_type}})
+            elif not may_publish(client):
+                reject_publish(client, event_type)
+            elif event_bus is not None:
+                # Forward the frame as received - no re-serialization;
+                # the bus hands it back to every process, this one included.
+                # Presence is not logged, so it takes no sequence number
+                await event_bus.publish(message, sequenced=event_type != PRESENCE_EVENT)
+            else:
+                await publish(data, message)
+
     except websockets.exceptions.ConnectionClosed:
-        print("❌ Client disconnected")
+        pass
     finally:
         # Remove client on disconnect
-        connected_clients.discard(websocket)
-        print(f"📊 Remaining clients: {len(connected_clients)}")
+        client.stop()
+        remove_client(client)
+        logger.info("client_disconnected", extra={"fields": {"clients": len(connected_clients)}})
+
+
+async def publish_presence(key):
+    """Push the current viewers/holds of a room/date to that classroom's topic"""
+    await publish({
+        "type": PRESENCE_UPDATE_EVENT,
+        "payload": presence.snapshot(key),
+        "topics": [f"classroom:{key[0]}"],
+    })
+
+
+async def sweep_presence():
+    """Expire lapsed viewers and holds, and push the rooms that changed"""
+    while True:
+        await asyncio.sleep(PRESENCE_SWEEP_SECONDS)
+        for key in presence.expire():
+            await publish_presence(key)
+
+
+async def publish(message, message_json=None, seq=None):
+    """
+    Queue message for the subscribers of its topics (never waits on a client).
+
+    The message is serialized at most once per wire format (JSON not at all
+    when the received frame is passed as message_json) and each frame is
+    shared by every recipient using that format. Sequenced events (from the
+    bus) are stamped with "seq" and recorded in the event log for replay.
+    """
+    event_type = message.get("type")
+    if event_type == PRESENCE_EVENT:
+        # Ephemeral state, not an event: apply it and push the new snapshot
+        await publish_presence(presence.apply(message.get("payload", {})))
+        return
+    topics = message.get("topics") or [BROADCAST_TOPIC]
+    recipients = subscribers_for(topics)
+    metrics["published"] += 1
+    if seq is not None:
+        message_json = with_seq(message_json or json.dumps(message), seq)
+        # Every process keeps the log for its clients; one writes the file
+        event_log.append(seq, message.get("topics"), message_json, persist=event_bus is None or event_bus.is_hub)
+    if recipients:
+        message_json = message_json or json.dumps(message)
+        binary_frame = None
+        batched = event_type in BATCH_EVENT_TYPES
+        for client in recipients:
+            if client.binary:
+                if binary_frame is None:
+                    binary_frame = protocol.encode(message, seq)
+                frame = binary_frame
+            else:
+                frame = message_json
+            if batched:
+                client.add_to_batch(frame, event_type)
+            else:
+                client.enqueue(frame, event_type)
+        if batched:
+            batching_clients.update(recipients)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("published", extra={"fields": {"type": event_type, "topics": topics, "recipients": len(recipients)}})
+
+
+async def on_bus_message(message_json, seq):
+    """Deliver a sequenced event from the bus to this process's subscribers"""
+    event_log.set_epoch(event_bus.epoch)
+    await publish(json.loads(message_json), message_json, seq)
+
+
+async def flush_event_log():
+    """Flush spill-file writes off the event loop, once per interval"""
+    while True:
+        await asyncio.sleep(EVENT_LOG_FLUSH_SECONDS)
+        await asyncio.to_thread(event_log.flush)
+
+
+async def serve(reuse_port=False):
+    """Run one server process"""
+    global event_bus
+    listener = setup_logging()
+    event_bus = create_bus(WS_BUS)
+    await event_bus.start(on_bus_message, last_seq=event_log.last_seq, epoch=event_log.epoch)
+    event_log.set_epoch(event_bus.epoch)
+    try:
+        async with websockets.serve(
+            handler, WS_HOST, WS_PORT, reuse_port=reuse_port,
+            subprotocols=list(protocol.SUBPROTOCOLS),
+            select_subprotocol=protocol.select_subprotocol,
+            process_request=process_request,
+        ):
+            logger.info("server_started", extra={"fields": {
+                "url": f"ws://{WS_HOST}:{WS_PORT}", "pid": os.getpid(), "bus": WS_BUS,
+                "auth": auth.auth_enabled(),
+            }})
+            if not auth.auth_enabled():
+                logger.warning("auth_disabled", extra={"fields": {"hint": "WS_AUTH_DISABLED is set - development only"}})
+            asyncio.create_task(run_batcher())
+            asyncio.create_task(monitor_loop_lag())
+            asyncio.create_task(sweep_presence())
+            asyncio.create_task(flush_event_log())
+            await report_metrics()
+            await asyncio.Future()  # Run forever
+    finally:
+        await event_bus.close()
+        event_log.close()
+        listener.stop()
+
 
+def run_worker():
+    """Entry point of one worker process"""
+    asyncio.run(serve(reuse_port=True))
 
-async def broadcast(message):
-    """Send message to all connected clients"""
-    if connected_clients:
-        message_json = json.dumps(message)
-        # Send to all clients
-        await asyncio.gather(
-            *[client.send(message_json) for client in connected_clients],
-            return_exceptions=True
-        )
-        print(f"📢 Broadcasted to {len(connected_clients)} client(s)")
 
+def main():
+    """Start the WebSocket server (WS_WORKERS processes)"""
+    if not auth.auth_enabled() and not auth.open_access_allowed():
+        # Fail closed: without a secret anyone could connect and publish
+        raise SystemExit("❌ WS_TOKEN_SECRET is not set. Set it (the same value as the app's), "
+                         "or set WS_AUTH_DISABLED=1 for local development.")
+    print(f"🚀 WebSocket Server started on ws://{WS_HOST}:{WS_PORT}")
+    print(f"   Workers: {WS_WORKERS}, bus: {WS_BUS}")
+    print("   Waiting for connections...")
+    if WS_WORKERS <= 1:
+        asyncio.run(serve())
+        return
 
-async def main():
-    """Start the WebSocket server"""
-    async with websockets.serve(handler, "localhost", 8765):
-        print("🚀 WebSocket Server started on ws://localhost:8765")
-        print("   Waiting for connections...")
-        await asyncio.Future()  # Run forever
+    workers = [multiprocessing.Process(target=run_worker, daemon=True) for _ in range(WS_WORKERS)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    main()